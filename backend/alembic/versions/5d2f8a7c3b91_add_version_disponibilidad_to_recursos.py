@@ -0,0 +1,28 @@
+"""Add version_disponibilidad to recursos
+
+Revision ID: 5d2f8a7c3b91
+Revises: 1cbe9d12746f
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2f8a7c3b91'
+down_revision: Union[str, Sequence[str], None] = '1cbe9d12746f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('recursos', sa.Column('version_disponibilidad', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('recursos', 'version_disponibilidad')
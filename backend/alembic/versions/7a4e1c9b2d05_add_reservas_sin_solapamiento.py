@@ -0,0 +1,49 @@
+"""Add reservas_sin_solapamiento exclusion constraint
+
+Revision ID: 7a4e1c9b2d05
+Revises: 5d2f8a7c3b91
+Create Date: 2026-10-18 11:03:27.541870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4e1c9b2d05'
+down_revision: Union[str, Sequence[str], None] = '5d2f8a7c3b91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Falla si ya hay reservas activas solapadas en un mismo recurso: hay que
+    cancelarlas a mano antes de migrar.
+    """
+    # btree_gist permite usar '=' sobre recurso_id dentro de un índice GiST
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.add_column('reservas', sa.Column(
+        'periodo',
+        postgresql.TSRANGE(),
+        sa.Computed("tsrange(fecha_hora_inicio, fecha_hora_fin, '[)')", persisted=True),
+        nullable=True
+    ))
+    op.create_exclude_constraint(
+        'reservas_sin_solapamiento',
+        'reservas',
+        ('recurso_id', '='),
+        ('periodo', '&&'),
+        using='gist',
+        where="estado IN ('pendiente', 'confirmada')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('reservas_sin_solapamiento', 'reservas', type_='exclude')
+    op.drop_column('reservas', 'periodo')
@@ -0,0 +1,30 @@
+"""Add serie_id to reservas
+
+Revision ID: 9c3d5e7f1a26
+Revises: 7a4e1c9b2d05
+Create Date: 2026-10-18 12:21:08.664013
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3d5e7f1a26'
+down_revision: Union[str, Sequence[str], None] = '7a4e1c9b2d05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reservas', sa.Column('serie_id', sa.String(length=36), nullable=True))
+    op.create_index(op.f('ix_reservas_serie_id'), 'reservas', ['serie_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_reservas_serie_id'), table_name='reservas')
+    op.drop_column('reservas', 'serie_id')
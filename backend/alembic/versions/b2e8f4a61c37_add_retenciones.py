@@ -0,0 +1,49 @@
+"""Add retenciones
+
+Revision ID: b2e8f4a61c37
+Revises: 9c3d5e7f1a26
+Create Date: 2026-10-18 13:40:52.190537
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e8f4a61c37'
+down_revision: Union[str, Sequence[str], None] = '9c3d5e7f1a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('retenciones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cliente_id', sa.Integer(), nullable=False),
+    sa.Column('recurso_id', sa.Integer(), nullable=False),
+    sa.Column('fecha_hora_inicio', sa.DateTime(), nullable=False),
+    sa.Column('fecha_hora_fin', sa.DateTime(), nullable=False),
+    sa.Column('duracion_minutos', sa.Integer(), nullable=False),
+    sa.Column('precio_total', sa.Float(), nullable=False),
+    sa.Column('expira_en', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['cliente_id'], ['clientes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['recurso_id'], ['recursos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_retenciones_id'), 'retenciones', ['id'], unique=False)
+    op.create_index(op.f('ix_retenciones_cliente_id'), 'retenciones', ['cliente_id'], unique=False)
+    op.create_index(op.f('ix_retenciones_expira_en'), 'retenciones', ['expira_en'], unique=False)
+    op.create_index('ix_retenciones_recurso_inicio', 'retenciones', ['recurso_id', 'fecha_hora_inicio'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_retenciones_recurso_inicio', table_name='retenciones')
+    op.drop_index(op.f('ix_retenciones_expira_en'), table_name='retenciones')
+    op.drop_index(op.f('ix_retenciones_cliente_id'), table_name='retenciones')
+    op.drop_index(op.f('ix_retenciones_id'), table_name='retenciones')
+    op.drop_table('retenciones')
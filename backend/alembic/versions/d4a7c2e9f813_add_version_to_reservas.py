@@ -0,0 +1,28 @@
+"""Add version to reservas
+
+Revision ID: d4a7c2e9f813
+Revises: b2e8f4a61c37
+Create Date: 2026-10-18 15:02:37.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7c2e9f813'
+down_revision: Union[str, Sequence[str], None] = 'b2e8f4a61c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reservas', sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('reservas', 'version')
@@ -0,0 +1,31 @@
+"""Add ix_reservas_cliente_inicio_id
+
+Revision ID: e6b1f3a8c924
+Revises: d4a7c2e9f813
+Create Date: 2026-10-18 16:20:11.503982
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b1f3a8c924'
+down_revision: Union[str, Sequence[str], None] = 'd4a7c2e9f813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_reservas_cliente_inicio_id', 'reservas', ['cliente_id', 'fecha_hora_inicio', 'id'], unique=False)
+    # El nuevo índice empieza por cliente_id: el de una sola columna sobra
+    op.drop_index(op.f('ix_reservas_cliente_id'), table_name='reservas', if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_reservas_cliente_id'), 'reservas', ['cliente_id'], unique=False)
+    op.drop_index('ix_reservas_cliente_inicio_id', table_name='reservas')
@@ -0,0 +1,31 @@
+"""Add ix_reservas_recurso_inicio_id
+
+Revision ID: f3c8d1b5a072
+Revises: e6b1f3a8c924
+Create Date: 2026-10-18 17:05:44.120873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c8d1b5a072'
+down_revision: Union[str, Sequence[str], None] = 'e6b1f3a8c924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_reservas_recurso_inicio_id', 'reservas', ['recurso_id', 'fecha_hora_inicio', 'id'], unique=False)
+    # El nuevo índice empieza por recurso_id: el de una sola columna sobra
+    op.drop_index(op.f('ix_reservas_recurso_id'), table_name='reservas', if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_reservas_recurso_id'), 'reservas', ['recurso_id'], unique=False)
+    op.drop_index('ix_reservas_recurso_inicio_id', table_name='reservas')
@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+
+
+def etag_recurso(recurso_id: int, version: int, vence: Optional[datetime] = None) -> str:
+    """
+    ETag débil derivado de la versión de disponibilidad de un recurso y del
+    próximo vencimiento de sus retenciones, que libera horarios sin cambiar
+    la versión
+    """
+    if vence is None:
+        return f'W/"recurso-{recurso_id}-v{version}"'
+    return f'W/"recurso-{recurso_id}-v{version}-r{vence:%Y%m%d%H%M%S%f}"'
+
+
+def coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """Indica si el header If-None-Match incluye el ETag (comparación débil)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+
+    def _opaco(valor: str) -> str:
+        valor = valor.strip()
+        return valor[2:] if valor.startswith('W/') else valor
+
+    return any(_opaco(candidato) == _opaco(etag) for candidato in if_none_match.split(','))
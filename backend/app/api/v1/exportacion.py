@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Iterator
+
+from sqlalchemy import Select
+
+from app.infrastructure.db.database import SessionLocal
+
+TIPOS_MEDIA = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson'
+}
+# Filas que se traen del cursor del servidor en cada viaje (y que se escriben juntas)
+FILAS_POR_LOTE = 1000
+# Una celda de texto que empieza así se interpreta como fórmula al abrir el CSV
+# en una planilla (nombres y notas los cargan los usuarios)
+PREFIJOS_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _valor_json(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no exportable: {type(valor).__name__}")
+
+
+def _celda_csv(valor):
+    if isinstance(valor, str) and valor.startswith(PREFIJOS_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def exportar_filas(consulta: Select, formato: str) -> Iterator[str]:
+    """
+    Ejecuta `consulta` con un cursor del lado del servidor y va devolviendo
+    sus filas como CSV o NDJSON de a un lote, sin materializar el resultado.
+
+    Usa su propia sesión, abierta mientras dure el streaming: no depende de
+    cuándo se cierre la sesión de la request. El encabezado CSV sale antes
+    de ejecutar la consulta. En CSV, el texto que podría tomarse como
+    fórmula se escribe con un apóstrofo adelante.
+    """
+    columnas = list(consulta.selected_columns.keys())
+
+    if formato == 'csv':
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+
+        def volcar() -> str:
+            texto = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return texto
+
+        escritor.writerow(columnas)
+        yield volcar()
+
+    session = SessionLocal()
+    try:
+        resultado = session.execute(
+            consulta.execution_options(stream_results=True, yield_per=FILAS_POR_LOTE)
+        )
+        for lote in resultado.partitions():
+            if formato == 'csv':
+                escritor.writerows([_celda_csv(valor) for valor in fila] for fila in lote)
+                yield volcar()
+            else:
+                yield ''.join(
+                    json.dumps(dict(zip(columnas, fila)), default=_valor_json, ensure_ascii=False) + '\n'
+                    for fila in lote
+                )
+    finally:
+        session.close()
@@ -0,0 +1,65 @@
+import hashlib
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.infrastructure.cache.idempotencia import ClaveEnCurso, ClaveReutilizada, idempotencia
+
+Clave = Tuple[int, str, str]
+
+
+def iniciar(
+    idempotency_key: Optional[str],
+    user_id: int,
+    operacion: str,
+    data: BaseModel,
+    *extra: Any
+) -> Tuple[Optional[Clave], Optional[JSONResponse]]:
+    """
+    Registra el inicio de una petición con Idempotency-Key.
+
+    Devuelve (clave, None) si hay que procesarla, o (clave, respuesta) con la
+    respuesta guardada si es un reintento. Sin header devuelve (None, None).
+    La clave es por usuario y operación, y se asocia a una huella del cuerpo.
+    """
+    if not idempotency_key:
+        return None, None
+
+    clave = (user_id, operacion, idempotency_key)
+    huella = hashlib.sha256(
+        (data.model_dump_json() + '|' + '|'.join(map(str, extra))).encode()
+    ).hexdigest()
+
+    try:
+        previa = idempotencia.iniciar(clave, huella)
+    except ClaveEnCurso:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Ya hay una petición en curso con esa Idempotency-Key"
+        )
+    except ClaveReutilizada:
+        raise HTTPException(
+            status_code=422,
+            detail="La Idempotency-Key ya se usó con otra petición"
+        )
+
+    if previa is None:
+        return clave, None
+    return clave, JSONResponse(
+        status_code=previa.status_code,
+        content=previa.cuerpo,
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+
+def completar(clave: Optional[Clave], status_code: int, respuesta: Any) -> None:
+    if clave is not None:
+        idempotencia.completar(clave, status_code, jsonable_encoder(respuesta))
+
+
+def liberar(clave: Optional[Clave]) -> None:
+    if clave is not None:
+        idempotencia.liberar(clave)
@@ -0,0 +1,24 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+
+# Header con el cursor de la página siguiente (no se envía en la última página)
+HEADER_CURSOR = "X-Next-Cursor"
+# Header con el total de resultados, solo cuando se pide explícitamente
+HEADER_TOTAL = "X-Total-Count"
+
+
+def codificar_cursor(fecha_hora_inicio: datetime, reserva_id: int) -> str:
+    """Cursor opaco de paginación por clave (fecha_hora_inicio, id) de la última fila"""
+    crudo = f"{fecha_hora_inicio.isoformat()}|{reserva_id}"
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverso de codificar_cursor; ValueError si el cursor no es válido"""
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        fecha, reserva_id = crudo.split('|')
+        return datetime.fromisoformat(fecha), int(reserva_id)
+    except Exception:
+        raise ValueError("Cursor inválido")
@@ -0,0 +1,62 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # opcional: sin orjson los listados usan el camino normal de FastAPI
+    orjson = None
+
+
+def _campos(objeto: Any) -> dict:
+    # Los schemas de respuesta no usan alias ni serializadores propios: los
+    # campos ya validados se pueden volcar tal cual, sin pasar por model_dump
+    if isinstance(objeto, BaseModel):
+        return objeto.__dict__
+    raise TypeError(f"Tipo no serializable: {type(objeto).__name__}")
+
+
+class RespuestaORJSON(JSONResponse):
+    """JSONResponse serializada con orjson; acepta modelos Pydantic ya validados"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_campos, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def adaptador_lista(modelo: type) -> TypeAdapter:
+    """TypeAdapter de List[modelo], armado una sola vez por tipo"""
+    return TypeAdapter(List[modelo])
+
+
+def rapidas_activas() -> bool:
+    return settings.respuestas_rapidas and orjson is not None
+
+
+def lista(modelo: type, items: Iterable, response: Optional[Response] = None, status_code: int = 200):
+    """
+    Valida `items` (modelos, dicts u objetos ORM) contra List[modelo] con el
+    adaptador cacheado; los que ya son `modelo` pasan sin volver a validarse.
+
+    Con RESPUESTAS_RAPIDAS, en lugar de devolver la lista (que FastAPI vuelve
+    a validar contra response_model antes de serializar) arma directamente una
+    RespuestaORJSON, copiando los headers que el endpoint puso en `response`
+    (ETag, X-Next-Cursor...).
+    """
+    adaptador = adaptador_lista(modelo)
+    validados = adaptador.validate_python(items, from_attributes=True)
+
+    if not rapidas_activas():
+        return validados
+
+    respuesta = RespuestaORJSON(validados, status_code=status_code)
+    if response is not None:
+        respuesta.raw_headers.extend(
+            (clave, valor) for clave, valor in response.raw_headers if clave != b'content-length'
+        )
+    return respuesta
@@ -0,0 +1,324 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+
+from app.application.schemas.bloqueo_schemas import (
+    BloqueoRecursoCreateSchema,
+    BloqueoRecursoResponse,
+    BloqueoProveedorCreateSchema,
+    BloqueoProveedorResponse
+)
+from app.infrastructure.db.database import get_session
+from app.infrastructure.db.models.bloqueo_model import BloqueoModel
+from app.infrastructure.db.models.bloqueo_recurso_model import BloqueoRecursoModel
+from app.infrastructure.db.models.recurso_model import RecursoModel
+from app.infrastructure.db.models.servicio_model import ServicioModel
+from app.infrastructure.repositories.disponibilidad_repository import SQLAlchemyDisponibilidadRepository
+from app.core.security import get_current_proveedor
+from app.domain.entities.user import User
+from app.domain.services.disponibilidad import normalizar
+from app.infrastructure.cache.invalidacion import notificar_cambio_bloqueos
+
+router = APIRouter(prefix='/bloqueos', tags=['Bloqueos'])
+
+
+def _get_proveedor(session: Session, current_user: User):
+    from app.infrastructure.repositories.proveedor_repository import SQLAlchemyProveedorRepository
+    proveedor = SQLAlchemyProveedorRepository(session).get_by_user_id(current_user.id)
+
+    if not proveedor:
+        raise HTTPException(status_code=404, detail="Perfil de proveedor no encontrado")
+
+    return proveedor
+
+
+def _recursos_del_proveedor(session: Session, proveedor_id: int) -> List[int]:
+    rows = session.query(RecursoModel.id).join(
+        ServicioModel, RecursoModel.servicio_id == ServicioModel.id
+    ).filter(
+        ServicioModel.proveedor_id == proveedor_id
+    ).all()
+    return [r.id for r in rows]
+
+
+@router.post('/recurso', response_model=BloqueoRecursoResponse, status_code=status.HTTP_201_CREATED)
+def crear_bloqueo_recurso(
+    data: BloqueoRecursoCreateSchema,
+    current_user: User = Depends(get_current_proveedor),
+    session: Session = Depends(get_session)
+):
+    """
+    Bloquea un recurso en un intervalo (mantenimiento, evento privado, clausura).
+    No se podrán crear reservas que se solapen con el bloqueo.
+    """
+    try:
+        proveedor = _get_proveedor(session, current_user)
+
+        recurso = session.query(RecursoModel).join(
+            ServicioModel, RecursoModel.servicio_id == ServicioModel.id
+        ).filter(
+            RecursoModel.id == data.recurso_id,
+            ServicioModel.proveedor_id == proveedor.id
+        ).first()
+
+        if not recurso:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Recurso no encontrado o no te pertenece"
+            )
+
+        # Se guardan en UTC naive, como las reservas
+        fecha_hora_inicio = normalizar(data.fecha_hora_inicio)
+        fecha_hora_fin = normalizar(data.fecha_hora_fin)
+
+        if fecha_hora_inicio >= fecha_hora_fin:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La fecha de inicio debe ser anterior a la de fin"
+            )
+
+        bloqueo = BloqueoRecursoModel(
+            recurso_id=data.recurso_id,
+            fecha_hora_inicio=fecha_hora_inicio,
+            fecha_hora_fin=fecha_hora_fin,
+            motivo=data.motivo,
+            tipo=data.tipo
+        )
+
+        session.add(bloqueo)
+        SQLAlchemyDisponibilidadRepository(session).incrementar_version(data.recurso_id)
+        session.commit()
+        session.refresh(bloqueo)
+
+        notificar_cambio_bloqueos([bloqueo.recurso_id], bloqueo.fecha_hora_inicio, bloqueo.fecha_hora_fin)
+
+        return BloqueoRecursoResponse.model_validate(bloqueo)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        session.rollback()
+        print(f"Error al crear bloqueo: {type(e).__name__}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al crear bloqueo"
+        )
+
+
+@router.get('/recurso/{recurso_id}', response_model=List[BloqueoRecursoResponse])
+def listar_bloqueos_recurso(
+    recurso_id: int,
+    desde: Optional[datetime] = Query(None, description="Solo bloqueos que terminan después de esta fecha"),
+    current_user: User = Depends(get_current_proveedor),
+    session: Session = Depends(get_session)
+):
+    """
+    Lista los bloqueos propios de un recurso del proveedor
+    """
+    try:
+        proveedor = _get_proveedor(session, current_user)
+
+        query = session.query(BloqueoRecursoModel).join(
+            RecursoModel, BloqueoRecursoModel.recurso_id == RecursoModel.id
+        ).join(
+            ServicioModel, RecursoModel.servicio_id == ServicioModel.id
+        ).filter(
+            BloqueoRecursoModel.recurso_id == recurso_id,
+            ServicioModel.proveedor_id == proveedor.id
+        )
+
+        if desde:
+            query = query.filter(BloqueoRecursoModel.fecha_hora_fin > normalizar(desde))
+
+        bloqueos = query.order_by(BloqueoRecursoModel.fecha_hora_inicio).all()
+
+        return [BloqueoRecursoResponse.model_validate(b) for b in bloqueos]
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al listar bloqueos"
+        )
+
+
+@router.delete('/recurso/{bloqueo_id}', status_code=status.HTTP_204_NO_CONTENT)
+def eliminar_bloqueo_recurso(
+    bloqueo_id: int,
+    current_user: User = Depends(get_current_proveedor),
+    session: Session = Depends(get_session)
+):
+    """
+    Elimina un bloqueo de recurso
+    """
+    try:
+        proveedor = _get_proveedor(session, current_user)
+
+        bloqueo = session.query(BloqueoRecursoModel).join(
+            RecursoModel, BloqueoRecursoModel.recurso_id == RecursoModel.id
+        ).join(
+            ServicioModel, RecursoModel.servicio_id == ServicioModel.id
+        ).filter(
+            BloqueoRecursoModel.id == bloqueo_id,
+            ServicioModel.proveedor_id == proveedor.id
+        ).first()
+
+        if not bloqueo:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Bloqueo no encontrado o no autorizado"
+            )
+
+        recurso_id = bloqueo.recurso_id
+        inicio, fin = bloqueo.fecha_hora_inicio, bloqueo.fecha_hora_fin
+
+        session.delete(bloqueo)
+        SQLAlchemyDisponibilidadRepository(session).incrementar_version(recurso_id)
+        session.commit()
+
+        notificar_cambio_bloqueos([recurso_id], inicio, fin)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        session.rollback()
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al eliminar bloqueo"
+        )
+
+
+@router.post('/proveedor', response_model=BloqueoProveedorResponse, status_code=status.HTTP_201_CREATED)
+def crear_bloqueo_proveedor(
+    data: BloqueoProveedorCreateSchema,
+    current_user: User = Depends(get_current_proveedor),
+    session: Session = Depends(get_session)
+):
+    """
+    Bloquea todos los recursos del proveedor en un intervalo (vacaciones, feriados)
+    """
+    try:
+        proveedor = _get_proveedor(session, current_user)
+
+        # Se guardan en UTC naive, como las reservas
+        fecha_inicio = normalizar(data.fecha_inicio)
+        fecha_fin = normalizar(data.fecha_fin)
+
+        if fecha_inicio >= fecha_fin:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La fecha de inicio debe ser anterior a la de fin"
+            )
+
+        bloqueo = BloqueoModel(
+            proveedor_id=proveedor.id,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            motivo=data.motivo
+        )
+
+        session.add(bloqueo)
+
+        recurso_ids = _recursos_del_proveedor(session, proveedor.id)
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+        for recurso_id in recurso_ids:
+            disponibilidad_repo.incrementar_version(recurso_id)
+
+        session.commit()
+        session.refresh(bloqueo)
+
+        notificar_cambio_bloqueos(recurso_ids, bloqueo.fecha_inicio, bloqueo.fecha_fin)
+
+        return BloqueoProveedorResponse.model_validate(bloqueo)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        session.rollback()
+        print(f"Error al crear bloqueo: {type(e).__name__}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al crear bloqueo"
+        )
+
+
+@router.get('/proveedor', response_model=List[BloqueoProveedorResponse])
+def listar_bloqueos_proveedor(
+    desde: Optional[datetime] = Query(None, description="Solo bloqueos que terminan después de esta fecha"),
+    current_user: User = Depends(get_current_proveedor),
+    session: Session = Depends(get_session)
+):
+    """
+    Lista los bloqueos generales del proveedor
+    """
+    try:
+        proveedor = _get_proveedor(session, current_user)
+
+        query = session.query(BloqueoModel).filter(BloqueoModel.proveedor_id == proveedor.id)
+
+        if desde:
+            query = query.filter(BloqueoModel.fecha_fin > normalizar(desde))
+
+        bloqueos = query.order_by(BloqueoModel.fecha_inicio).all()
+
+        return [BloqueoProveedorResponse.model_validate(b) for b in bloqueos]
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al listar bloqueos"
+        )
+
+
+@router.delete('/proveedor/{bloqueo_id}', status_code=status.HTTP_204_NO_CONTENT)
+def eliminar_bloqueo_proveedor(
+    bloqueo_id: int,
+    current_user: User = Depends(get_current_proveedor),
+    session: Session = Depends(get_session)
+):
+    """
+    Elimina un bloqueo general del proveedor
+    """
+    try:
+        proveedor = _get_proveedor(session, current_user)
+
+        bloqueo = session.query(BloqueoModel).filter(
+            BloqueoModel.id == bloqueo_id,
+            BloqueoModel.proveedor_id == proveedor.id
+        ).first()
+
+        if not bloqueo:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Bloqueo no encontrado o no autorizado"
+            )
+
+        inicio, fin = bloqueo.fecha_inicio, bloqueo.fecha_fin
+
+        session.delete(bloqueo)
+
+        recurso_ids = _recursos_del_proveedor(session, proveedor.id)
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+        for recurso_id in recurso_ids:
+            disponibilidad_repo.incrementar_version(recurso_id)
+
+        session.commit()
+
+        notificar_cambio_bloqueos(recurso_ids, inicio, fin)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        session.rollback()
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al eliminar bloqueo"
+        )
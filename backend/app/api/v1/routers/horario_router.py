@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import time
 
 from app.application.schemas.horario_disponible_schemas import (
@@ -9,11 +9,15 @@ from app.application.schemas.horario_disponible_schemas import (
     HorarioDisponibleResponse
 )
 from app.infrastructure.db.database import get_session
+from app.api.v1.etag import etag_recurso, coincide
+from app.api.v1 import respuestas
 from app.infrastructure.db.models.horario_disponible_model import HorarioDisponibleModel
 from app.infrastructure.db.models.recurso_model import RecursoModel
 from app.infrastructure.db.models.servicio_model import ServicioModel
+from app.infrastructure.repositories.disponibilidad_repository import SQLAlchemyDisponibilidadRepository
 from app.core.security import get_current_proveedor
 from app.domain.entities.user import User
+from app.infrastructure.cache.invalidacion import notificar_cambio_horarios
 
 router = APIRouter(prefix='/horarios', tags=['Horarios Disponibles'])
 
@@ -87,8 +91,11 @@ def crear_horario(
         )
         
         session.add(horario)
+        SQLAlchemyDisponibilidadRepository(session).incrementar_version(data.recurso_id)
         session.commit()
         session.refresh(horario)
+
+        notificar_cambio_horarios(horario.recurso_id)
         
         return HorarioDisponibleResponse.model_validate(horario)
         
@@ -174,10 +181,13 @@ def crear_horarios_masivo(
             session.add(horario)
             horarios_creados.append(horario)
         
+        SQLAlchemyDisponibilidadRepository(session).incrementar_version(data.recurso_id)
         session.commit()
         
         for horario in horarios_creados:
             session.refresh(horario)
+
+        notificar_cambio_horarios(data.recurso_id)
         
         return [HorarioDisponibleResponse.model_validate(h) for h in horarios_creados]
         
@@ -195,6 +205,8 @@ def crear_horarios_masivo(
 @router.get('/recurso/{recurso_id}', response_model=List[HorarioDisponibleResponse])
 def listar_horarios_recurso(
     recurso_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     session: Session = Depends(get_session)
 ):
     """
@@ -202,8 +214,19 @@ def listar_horarios_recurso(
     
     **Abierto para todos** - Los clientes necesitan ver esto para saber
     qué horarios están disponibles.
+
+    Soporta GET condicional (ETag / If-None-Match) según la versión del recurso.
     """
     try:
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+
+        version = disponibilidad_repo.get_version(recurso_id)
+        if version is not None:
+            etag = etag_recurso(recurso_id, version)
+            if coincide(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+            response.headers["ETag"] = etag
+
         horarios = session.query(HorarioDisponibleModel).filter(
             HorarioDisponibleModel.recurso_id == recurso_id,
             HorarioDisponibleModel.is_active == True
@@ -212,7 +235,7 @@ def listar_horarios_recurso(
             HorarioDisponibleModel.hora_inicio
         ).all()
         
-        return [HorarioDisponibleResponse.model_validate(h) for h in horarios]
+        return respuestas.lista(HorarioDisponibleResponse, horarios, response)
         
     except Exception as e:
         print(f"Error: {type(e).__name__}: {str(e)}")
@@ -254,7 +277,10 @@ def eliminar_horario(
             )
         
         horario.is_active = False
+        SQLAlchemyDisponibilidadRepository(session).incrementar_version(horario.recurso_id)
         session.commit()
+
+        notificar_cambio_horarios(horario.recurso_id)
         
     except HTTPException:
         raise
@@ -292,6 +318,12 @@ def actualizar_horario(
         
         if not horario:
             raise HTTPException(status_code=404, detail="Horario no encontrado")
+
+        if data.hora_inicio >= data.hora_fin:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La hora de inicio debe ser anterior a la hora de fin"
+            )
         
         horario.dia_semana = data.dia_semana
         horario.hora_inicio = data.hora_inicio
@@ -299,8 +331,11 @@ def actualizar_horario(
         horario.precio = data.precio
         horario.duracion_minutos = data.duracion_minutos
         
+        SQLAlchemyDisponibilidadRepository(session).incrementar_version(horario.recurso_id)
         session.commit()
         session.refresh(horario)
+
+        notificar_cambio_horarios(horario.recurso_id)
         
         return HorarioDisponibleResponse.model_validate(horario)
         
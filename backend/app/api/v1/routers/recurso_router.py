@@ -11,8 +11,10 @@ from app.application.schemas.recurso_schemas import (
     RecursoResponse
 )
 from app.infrastructure.db.database import get_session
+from app.api.v1 import respuestas
 from app.infrastructure.db.models.recurso_model import RecursoModel
 from app.infrastructure.db.models.servicio_model import ServicioModel
+from app.infrastructure.cache.invalidacion import notificar_baja_recurso
 from app.core.security import get_current_proveedor
 from app.domain.entities.user import User
 
@@ -83,7 +85,7 @@ def listar_recursos_por_servicio(
             RecursoModel.is_active == True
         ).order_by(RecursoModel.orden).all()
         
-        return [RecursoResponse.model_validate(r) for r in recursos]
+        return respuestas.lista(RecursoResponse, recursos)
         
     except Exception as e:
         print(f"Error: {type(e).__name__}: {str(e)}")
@@ -211,6 +213,7 @@ def eliminar_recurso(
         
         recurso.is_active = False
         session.commit()
+        notificar_baja_recurso(recurso_id)
         
     except HTTPException:
         raise
@@ -1,67 +1,583 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, insert, select, true, tuple_
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime, timedelta, timezone, date
+from sqlalchemy.exc import IntegrityError
+from typing import Dict, List, Optional
+import threading
+import uuid
+from time import monotonic
+from datetime import datetime, timedelta, timezone, date, time
 
 from app.application.schemas.reserva_schemas import (
     ReservaCreateSchema,
+    ReservaLoteCreateSchema,
+    ReservaSerieCreateSchema,
+    ReservaSerieResponse,
+    OcurrenciaOmitidaResponse,
+    RetencionCreateSchema,
+    RetencionResponse,
+    ConfirmarRetencionSchema,
     ReservaResponse,
     ReservaDetailResponse,
     PagoReservaSchema,
     CancelarReservaSchema,
     ConfirmarPagoSchema,
-    MarcarNoAsistioSchema
+    MarcarNoAsistioSchema,
+    TransicionLoteSchema,
+    TransicionLoteResponse,
+    ResultadoTransicionResponse,
+    MAX_RESERVAS_TRANSICION_LOTE,
+    DisponibilidadSlotResponse,
+    DisponibilidadDiaResponse,
+    RecursoDisponibilidadResponse,
+    HuecoLibreResponse,
+    OcupacionResponse,
+    ProximoLibreResponse
 )
+from app.core.config import settings
 from app.infrastructure.db.database import get_session
+from app.infrastructure.db.errors import es_solapamiento_reserva
+from app.api.v1.etag import etag_recurso, coincide
+from app.api.v1.paginacion import HEADER_CURSOR, HEADER_TOTAL, codificar_cursor, decodificar_cursor
+from app.api.v1.exportacion import TIPOS_MEDIA, exportar_filas
+from app.api.v1 import idempotencia, respuestas
 from app.infrastructure.db.models.reserva_model import ReservaModel
 from app.infrastructure.db.models.recurso_model import RecursoModel
 from app.infrastructure.db.models.servicio_model import ServicioModel
-from app.infrastructure.db.models.horario_disponible_model import HorarioDisponibleModel
 from app.infrastructure.db.models.cliente_model import ClienteModel
+from app.infrastructure.db.models.retencion_model import RetencionModel
+from app.infrastructure.repositories.disponibilidad_repository import SQLAlchemyDisponibilidadRepository
 from app.core.security import get_current_cliente, get_current_proveedor
 from app.domain.entities.user import User
+from app.domain.services.disponibilidad import (
+    Intervalo,
+    Slot,
+    calcular_slots,
+    calcular_slots_rango,
+    normalizar,
+    MAX_DIAS_RANGO
+)
+from app.domain.services.recurrencia import expandir_semanal
+from app.domain.services.ocupacion import MapaOcupacion, buscar_proximos_libres, MAX_HORIZONTE_DIAS
+from app.infrastructure.cache.indice_reservas import indice_reservas
+from app.infrastructure.cache.plantillas import plantillas_semanales
+from app.infrastructure.cache.bloqueos import bloqueos_recursos
+from app.infrastructure.cache.disponibilidad_cache import disponibilidad_cache
+from app.infrastructure.cache.recursos import recursos_activos
+from app.infrastructure.cache.invalidacion import notificar_cambio_reserva
 
 router = APIRouter(prefix='/reservas', tags=['Reservas'])
 
+RESERVA_MODIFICADA = "La reserva fue modificada por otra operación"
+
+# Cambios de estado del proveedor: acción -> (estado de origen, estado destino)
+TRANSICIONES_PROVEEDOR = {
+    'confirmar': ('pendiente', 'confirmada'),
+    'completar': ('confirmada', 'completada'),
+    'no_asistio': ('confirmada', 'no_asistio'),
+}
+
+# Cada cuántos segundos (como mínimo) un proceso barre las retenciones vencidas
+INTERVALO_BARRIDO_RETENCIONES = 30
+_ultimo_barrido_retenciones = 0.0
+_barrido_retenciones_lock = threading.Lock()
+
+
+def _slot_response(slot: Slot) -> DisponibilidadSlotResponse:
+    return DisponibilidadSlotResponse(
+        hora_inicio=slot.inicio.time(),
+        hora_fin=slot.fin.time(),
+        precio=slot.precio,
+        disponible=slot.disponible,
+        reserva_id=slot.reserva_id
+    )
+
+
+def _ocupados_recursos(
+    disponibilidad_repo: SQLAlchemyDisponibilidadRepository,
+    recurso_ids: List[int],
+    desde: datetime,
+    hasta: datetime,
+    versiones: Optional[Dict[int, Optional[int]]] = None
+) -> Dict[int, List[Intervalo]]:
+    """Reservas activas de [desde, hasta) más los bloqueos (ya fusionados) del índice en memoria"""
+    reservas = disponibilidad_repo.get_reservas_en_rango_recursos(recurso_ids, desde, hasta)
+    bloqueos = bloqueos_recursos.obtener_varias(
+        recurso_ids, desde, hasta, disponibilidad_repo.get_bloqueos_recursos, versiones
+    )
+    return {
+        recurso_id: reservas.get(recurso_id, []) + bloqueos[recurso_id].en_rango(desde, hasta)
+        for recurso_id in recurso_ids
+    }
+
+
+def _conflicto_en_indice(
+    disponibilidad_repo: SQLAlchemyDisponibilidadRepository,
+    recurso_id: int,
+    inicio: datetime,
+    fin: datetime
+) -> bool:
+    """
+    Pre-chequeo de solapamiento contra el índice en memoria. Un acierto puede
+    venir de un índice viejo (una cancelación hecha en otro proceso), así que
+    antes de rechazar se recarga el recurso desde la base una vez y se vuelve
+    a mirar. Sin acierto, la decisión queda para la verificación en la base.
+    """
+    def cargar():
+        indice_reservas.cargar(
+            recurso_id,
+            disponibilidad_repo.get_reservas_activas(recurso_id, normalizar(datetime.now(timezone.utc)))
+        )
+
+    recien_cargado = not indice_reservas.esta_cargado(recurso_id)
+    if recien_cargado:
+        cargar()
+
+    if not indice_reservas.hay_conflicto(recurso_id, inicio, fin):
+        return False
+    if recien_cargado:
+        return True
+
+    cargar()
+    return bool(indice_reservas.hay_conflicto(recurso_id, inicio, fin))
+
+
+def _version_esperada(if_match: Optional[str]) -> Optional[int]:
+    """Versión de la reserva enviada en If-Match (Ej: 3 o "3"), o None si no vino"""
+    if not if_match:
+        return None
+    try:
+        return int(if_match.strip().removeprefix('W/').strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match debe ser la versión de la reserva")
+
+
+def _reserva_rechazada(reserva_repo, reserva_id: int, user_id: int, rol: str, version: Optional[int]) -> ReservaModel:
+    """
+    El UPDATE condicional no tocó ninguna fila: solo en ese caso se lee la
+    reserva, para responder 404 o 409 (versión vieja). El llamador valida el
+    resto; si todo se cumple, otra operación la cambió en el medio (409).
+    """
+    reserva = reserva_repo.get_del_usuario(reserva_id, user_id, rol)
+
+    if not reserva:
+        raise HTTPException(status_code=404, detail="Reserva no encontrada")
+
+    if version is not None and reserva.version != version:
+        raise HTTPException(status_code=409, detail=RESERVA_MODIFICADA)
+
+    return reserva
 
-@router.get('/recurso/{recurso_id}/disponibilidad', response_model=List[dict])
+
+def _barrer_retenciones_vencidas(session: Session, disponibilidad_repo: SQLAlchemyDisponibilidadRepository) -> None:
+    """
+    Borra las retenciones vencidas, como mucho una vez cada
+    INTERVALO_BARRIDO_RETENCIONES segundos por proceso. Solo corre en las
+    escrituras de retenciones: las lecturas ya ignoran las vencidas, y el
+    ETag y la cache de grillas vencen con la próxima retención (ver
+    get_proximos_vencimientos), así que borrarlas no cambia la versión.
+    """
+    global _ultimo_barrido_retenciones
+    with _barrido_retenciones_lock:
+        if monotonic() - _ultimo_barrido_retenciones < INTERVALO_BARRIDO_RETENCIONES:
+            return
+        _ultimo_barrido_retenciones = monotonic()
+
+    vencidas = disponibilidad_repo.purgar_retenciones_vencidas(datetime.utcnow())
+    if not vencidas:
+        return
+    session.commit()
+
+    for recurso_id, intervalos in vencidas.items():
+        for intervalo in intervalos:
+            notificar_cambio_reserva(recurso_id, intervalo.inicio, intervalo.fin)
+
+
+def _filtros_reservas_proveedor(
+    proveedor_id: int,
+    recurso_id: Optional[int],
+    estado: Optional[str],
+    desde: Optional[datetime],
+    hasta: Optional[datetime]
+):
+    """
+    Subconsulta con los recursos del proveedor (o solo `recurso_id`, si es
+    suyo) y los filtros sobre sus reservas por estado y fecha de inicio
+    """
+    recursos = select(RecursoModel.id).join(
+        ServicioModel, RecursoModel.servicio_id == ServicioModel.id
+    ).where(
+        ServicioModel.proveedor_id == proveedor_id
+    )
+    if recurso_id is not None:
+        recursos = recursos.where(RecursoModel.id == recurso_id)
+    recursos = recursos.subquery('recursos_proveedor')
+
+    filtros = []
+    if estado:
+        filtros.append(ReservaModel.estado == estado)
+    if desde:
+        filtros.append(ReservaModel.fecha_hora_inicio >= normalizar(desde))
+    if hasta:
+        filtros.append(ReservaModel.fecha_hora_inicio < normalizar(hasta))
+
+    return recursos, filtros
+
+
+# Solo las columnas que muestra ReservaDetailResponse: los listados no cargan
+# entidades completas (notas_internas, motivo_cancelacion, periodo...)
+_COLUMNAS_DETALLE = (
+    ReservaModel.id,
+    ReservaModel.cliente_id,
+    ReservaModel.recurso_id,
+    ReservaModel.fecha_hora_inicio,
+    ReservaModel.fecha_hora_fin,
+    ReservaModel.duracion_minutos,
+    ReservaModel.estado,
+    ReservaModel.precio_total,
+    ReservaModel.seña,
+    ReservaModel.saldo_pendiente,
+    ReservaModel.pago_completo,
+    ReservaModel.notas_cliente,
+    ReservaModel.version,
+    ReservaModel.created_at,
+    RecursoModel.nombre.label('recurso_nombre'),
+    ServicioModel.nombre.label('servicio_nombre'),
+    ClienteModel.nombre.label('cliente_nombre')
+)
+
+_CAMPOS_DETALLE = tuple(columna.key for columna in _COLUMNAS_DETALLE)
+
+
+def _consulta_detalle(session: Session):
+    """Consulta base de los listados de reservas, con los nombres legibles ya unidos"""
+    return session.query(*_COLUMNAS_DETALLE).join(
+        RecursoModel, ReservaModel.recurso_id == RecursoModel.id
+    ).join(
+        ServicioModel, RecursoModel.servicio_id == ServicioModel.id
+    ).join(
+        ClienteModel, ReservaModel.cliente_id == ClienteModel.id
+    )
+
+
+def _detalles(filas) -> List[ReservaDetailResponse]:
+    # Dicts armados con zip sobre las tuplas: validarlos es bastante más
+    # rápido que leer cada fila por atributo
+    return respuestas.adaptador_lista(ReservaDetailResponse).validate_python(
+        [dict(zip(_CAMPOS_DETALLE, fila)) for fila in filas]
+    )
+
+
+def _ocupados(
+    disponibilidad_repo: SQLAlchemyDisponibilidadRepository,
+    recurso_id: int,
+    desde: datetime,
+    hasta: datetime,
+    version: Optional[int] = None
+) -> List[Intervalo]:
+    return _ocupados_recursos(disponibilidad_repo, [recurso_id], desde, hasta, {recurso_id: version})[recurso_id]
+
+
+@router.get('/recurso/{recurso_id}/disponibilidad', response_model=List[DisponibilidadSlotResponse])
 def get_reservas_recurso_fecha(
     recurso_id: int,
+    response: Response,
     fecha: str = Query(..., description="Fecha en formato YYYY-MM-DD"),
+    if_none_match: Optional[str] = Header(None),
     session: Session = Depends(get_session)
 ):
     """
-    Obtiene las reservas ocupadas de un recurso para una fecha específica.
+    Obtiene la grilla de slots de un recurso para una fecha específica,
+    con su precio y si están libres u ocupados (por reservas o bloqueos).
     Público para que los clientes puedan ver la disponibilidad.
+
+    Responde con un ETag según la versión del recurso y el próximo
+    vencimiento de sus retenciones; si el cliente envía If-None-Match con ese
+    ETag se responde 304 sin recalcular nada. La grilla cacheada solo se usa
+    si se calculó con esa misma versión y el mismo próximo vencimiento.
     """
     try:
-        # Parsear fecha
-        fecha_obj = datetime.strptime(fecha, "%Y-%m-%d")
-        fecha_inicio = fecha_obj.replace(hour=0, minute=0, second=0, tzinfo=timezone.utc)
-        fecha_fin = fecha_inicio + timedelta(days=1)
-        
-        # Buscar reservas confirmadas o pendientes
-        reservas = session.query(ReservaModel).filter(
-            ReservaModel.recurso_id == recurso_id,
-            ReservaModel.estado.in_(['pendiente', 'confirmada']),
-            ReservaModel.fecha_hora_inicio >= fecha_inicio,
-            ReservaModel.fecha_hora_inicio < fecha_fin
-        ).all()
-        
-        return [
-            {
-                "hora_inicio": r.fecha_hora_inicio.strftime("%H:%M"),
-                "hora_fin": r.fecha_hora_fin.strftime("%H:%M"),
-                "estado": r.estado
-            }
-            for r in reservas
-        ]
-        
+        fecha_obj = datetime.strptime(fecha, "%Y-%m-%d").date()
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Formato de fecha inválido. Use YYYY-MM-DD"
         )
+
+    try:
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+
+        version = disponibilidad_repo.get_version(recurso_id)
+        vence = disponibilidad_repo.get_proximos_vencimientos([recurso_id]).get(recurso_id)
+        if version is not None:
+            etag = etag_recurso(recurso_id, version, vence)
+            if coincide(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+            response.headers["ETag"] = etag
+
+        slots = disponibilidad_cache.obtener(recurso_id, fecha_obj, version, vence)
+
+        if slots is None:
+            generacion = disponibilidad_cache.generacion(recurso_id)
+            fecha_inicio = datetime.combine(fecha_obj, time.min)
+            fecha_fin = fecha_inicio + timedelta(days=1)
+
+            plantilla = plantillas_semanales.obtener(recurso_id, disponibilidad_repo.get_franjas_semana, version)
+            ocupados = _ocupados(disponibilidad_repo, recurso_id, fecha_inicio, fecha_fin, version)
+
+            slots = calcular_slots(fecha_obj, plantilla, ocupados)
+            disponibilidad_cache.guardar(recurso_id, fecha_obj, slots, generacion, version, vence)
+
+        return respuestas.lista(DisponibilidadSlotResponse, [_slot_response(s) for s in slots], response)
+        
+    except Exception as e:
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al obtener disponibilidad"
+        )
+
+
+@router.get('/recurso/{recurso_id}/disponibilidad/rango', response_model=List[DisponibilidadDiaResponse])
+def get_disponibilidad_recurso_rango(
+    recurso_id: int,
+    desde: date = Query(..., description="Fecha inicial en formato YYYY-MM-DD"),
+    hasta: date = Query(..., description="Fecha final (incluida) en formato YYYY-MM-DD"),
+    session: Session = Depends(get_session)
+):
+    """
+    Obtiene la grilla de slots de un recurso para cada día de un rango
+    (semana/mes) con una sola consulta de reservas y bloqueos.
+
+    El rango admite como máximo 31 días.
+    """
+    if hasta < desde:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha 'hasta' debe ser posterior o igual a 'desde'"
+        )
+
+    if (hasta - desde).days + 1 > MAX_DIAS_RANGO:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El rango no puede superar los {MAX_DIAS_RANGO} días"
+        )
+
+    try:
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+        version = disponibilidad_repo.get_version(recurso_id)
+        vence = disponibilidad_repo.get_proximos_vencimientos([recurso_id]).get(recurso_id)
+
+        dias = {}
+        for i in range((hasta - desde).days + 1):
+            dia = desde + timedelta(days=i)
+            dias[dia] = disponibilidad_cache.obtener(recurso_id, dia, version, vence)
+
+        faltantes = [dia for dia, slots in dias.items() if slots is None]
+        if faltantes:
+            generacion = disponibilidad_cache.generacion(recurso_id)
+            fecha_inicio = datetime.combine(faltantes[0], time.min)
+            fecha_fin = datetime.combine(faltantes[-1], time.min) + timedelta(days=1)
+
+            plantilla = plantillas_semanales.obtener(recurso_id, disponibilidad_repo.get_franjas_semana, version)
+            ocupados = _ocupados(disponibilidad_repo, recurso_id, fecha_inicio, fecha_fin, version)
+
+            # Solo se recalculan los días que faltan, de a tramos consecutivos
+            # (una sola consulta cubre desde el primero hasta el último)
+            tramos = []
+            for dia in faltantes:
+                if tramos and dia - tramos[-1][1] == timedelta(days=1):
+                    tramos[-1][1] = dia
+                else:
+                    tramos.append([dia, dia])
+
+            for inicio_tramo, fin_tramo in tramos:
+                calculados = calcular_slots_rango(inicio_tramo, fin_tramo, plantilla, ocupados)
+                for dia, slots in calculados.items():
+                    dias[dia] = slots
+                    disponibilidad_cache.guardar(recurso_id, dia, slots, generacion, version, vence)
+
+        return respuestas.lista(DisponibilidadDiaResponse, [
+            DisponibilidadDiaResponse(
+                fecha=dia,
+                slots=[_slot_response(s) for s in slots]
+            )
+            for dia, slots in dias.items()
+        ])
+
+    except Exception as e:
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al obtener disponibilidad"
+        )
+
+
+@router.get('/recurso/{recurso_id}/disponibilidad/libres', response_model=List[HuecoLibreResponse])
+def get_huecos_libres_recurso(
+    recurso_id: int,
+    fecha: date = Query(..., description="Fecha en formato YYYY-MM-DD"),
+    duracion_minutos: int = Query(..., gt=0, le=24 * 60),
+    desde_hora: Optional[time] = Query(None, description="Solo huecos que empiezan a partir de esta hora"),
+    quantum_minutos: int = Query(15, gt=0, le=60, description="Resolución de los inicios"),
+    session: Session = Depends(get_session)
+):
+    """
+    Lista los inicios posibles de un hueco libre de `duracion_minutos` en una
+    fecha, dentro de las franjas horarias y sin reservas ni bloqueos, con su
+    precio. Se calcula con el mapa de ocupación (operaciones de bits) y todos
+    los precios salen de una sola llamada a la plantilla.
+    """
+    try:
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+
+        fecha_inicio = datetime.combine(fecha, time.min)
+        fecha_fin = fecha_inicio + timedelta(days=1)
+
+        plantilla = plantillas_semanales.obtener(recurso_id, disponibilidad_repo.get_franjas_semana)
+        ocupados = _ocupados(disponibilidad_repo, recurso_id, fecha_inicio, fecha_fin)
+        mapa = MapaOcupacion.construir(fecha, fecha, plantilla, ocupados, quantum_minutos)
+
+        despues_de = datetime.combine(fecha, desde_hora) if desde_hora else None
+        duracion = timedelta(minutes=duracion_minutos)
+
+        inicios = mapa.huecos_libres(duracion_minutos, despues_de)
+        precios = plantilla.precios_entre(inicios, duracion_minutos)
+
+        return respuestas.lista(HuecoLibreResponse, [
+            HuecoLibreResponse(fecha_hora_inicio=inicio, fecha_hora_fin=inicio + duracion, precio=precio)
+            for inicio, precio in zip(inicios, precios)
+        ])
+
+    except Exception as e:
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al obtener huecos libres"
+        )
+
+
+@router.get('/recurso/{recurso_id}/ocupacion', response_model=OcupacionResponse)
+def get_ocupacion_recurso(
+    recurso_id: int,
+    desde: date = Query(..., description="Fecha inicial en formato YYYY-MM-DD"),
+    hasta: date = Query(..., description="Fecha final (incluida) en formato YYYY-MM-DD"),
+    session: Session = Depends(get_session)
+):
+    """
+    Resume cuántos minutos abiertos, ocupados y libres tiene un recurso en un
+    rango de fechas (máximo 31 días).
+    """
+    if hasta < desde:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha 'hasta' debe ser posterior o igual a 'desde'"
+        )
+
+    if (hasta - desde).days + 1 > MAX_DIAS_RANGO:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El rango no puede superar los {MAX_DIAS_RANGO} días"
+        )
+
+    try:
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+
+        fecha_inicio = datetime.combine(desde, time.min)
+        fecha_fin = datetime.combine(hasta, time.min) + timedelta(days=1)
+
+        plantilla = plantillas_semanales.obtener(recurso_id, disponibilidad_repo.get_franjas_semana)
+        ocupados = _ocupados(disponibilidad_repo, recurso_id, fecha_inicio, fecha_fin)
+        mapa = MapaOcupacion.construir(desde, hasta, plantilla, ocupados)
+
+        minutos_abiertos = mapa.minutos_abiertos()
+        minutos_libres = mapa.minutos_libres()
+
+        return OcupacionResponse(
+            recurso_id=recurso_id,
+            desde=desde,
+            hasta=hasta,
+            minutos_abiertos=minutos_abiertos,
+            minutos_ocupados=minutos_abiertos - minutos_libres,
+            minutos_libres=minutos_libres,
+            horas_libres=round(minutos_libres / 60, 2)
+        )
+
+    except Exception as e:
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al obtener ocupación"
+        )
+
+
+@router.get('/servicio/{servicio_id}/disponibilidad', response_model=List[RecursoDisponibilidadResponse])
+def get_disponibilidad_servicio(
+    servicio_id: int,
+    fecha: date = Query(..., description="Fecha en formato YYYY-MM-DD"),
+    session: Session = Depends(get_session)
+):
+    """
+    Obtiene la grilla de slots de todos los recursos activos de un servicio
+    para una fecha. Las reservas de todos los recursos se leen en una sola
+    consulta y se agrupan en memoria.
+    """
+    try:
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+
+        recursos = session.query(
+            RecursoModel.id,
+            RecursoModel.nombre,
+            RecursoModel.version_disponibilidad
+        ).filter(
+            RecursoModel.servicio_id == servicio_id,
+            RecursoModel.is_active == True
+        ).order_by(RecursoModel.orden, RecursoModel.id).all()
+
+        if not recursos:
+            return []
+
+        versiones = {r.id: r.version_disponibilidad for r in recursos}
+        vencimientos = disponibilidad_repo.get_proximos_vencimientos(list(versiones))
+        slots = {
+            r.id: disponibilidad_cache.obtener(r.id, fecha, versiones[r.id], vencimientos.get(r.id))
+            for r in recursos
+        }
+        faltantes = [recurso_id for recurso_id, s in slots.items() if s is None]
+
+        if faltantes:
+            generaciones = {recurso_id: disponibilidad_cache.generacion(recurso_id) for recurso_id in faltantes}
+            fecha_inicio = datetime.combine(fecha, time.min)
+            fecha_fin = fecha_inicio + timedelta(days=1)
+
+            plantillas = plantillas_semanales.obtener_varias(
+                faltantes,
+                disponibilidad_repo.get_franjas_semana_recursos,
+                versiones
+            )
+            ocupados = _ocupados_recursos(disponibilidad_repo, faltantes, fecha_inicio, fecha_fin, versiones)
+
+            for recurso_id in faltantes:
+                slots[recurso_id] = calcular_slots(fecha, plantillas[recurso_id], ocupados.get(recurso_id, []))
+                disponibilidad_cache.guardar(
+                    recurso_id,
+                    fecha,
+                    slots[recurso_id],
+                    generaciones[recurso_id],
+                    versiones[recurso_id],
+                    vencimientos.get(recurso_id)
+                )
+
+        return respuestas.lista(RecursoDisponibilidadResponse, [
+            RecursoDisponibilidadResponse(
+                recurso_id=r.id,
+                recurso_nombre=r.nombre,
+                slots=[_slot_response(s) for s in slots[r.id]]
+            )
+            for r in recursos
+        ])
+
     except Exception as e:
         print(f"Error: {type(e).__name__}: {str(e)}")
         raise HTTPException(
@@ -70,158 +586,759 @@ def get_reservas_recurso_fecha(
         )
 
 
+@router.get('/proximos-libres', response_model=List[ProximoLibreResponse])
+def get_proximos_libres(
+    duracion_minutos: int = Query(..., gt=0, le=24 * 60),
+    servicio_id: Optional[int] = Query(None, description="Buscar en todos los recursos del servicio"),
+    recurso_ids: Optional[List[int]] = Query(None, description="O en una lista de recursos"),
+    desde: Optional[datetime] = Query(None, description="Buscar a partir de este momento (por defecto, ahora)"),
+    cantidad: int = Query(5, gt=0, le=50),
+    session: Session = Depends(get_session)
+):
+    """
+    Devuelve los próximos `cantidad` horarios libres de `duracion_minutos`
+    entre los recursos de un servicio (o una lista de recursos).
+
+    La búsqueda avanza por tandas de días y se detiene apenas encuentra
+    suficientes resultados (como máximo 62 días hacia adelante).
+    """
+    if servicio_id is None and not recurso_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Indique servicio_id o recurso_ids"
+        )
+
+    try:
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+
+        query = session.query(RecursoModel.id, RecursoModel.nombre).filter(RecursoModel.is_active == True)
+        if servicio_id is not None:
+            query = query.filter(RecursoModel.servicio_id == servicio_id)
+        if recurso_ids:
+            query = query.filter(RecursoModel.id.in_(recurso_ids))
+        recursos = {r.id: r.nombre for r in query.all()}
+
+        if not recursos:
+            return []
+
+        ahora = normalizar(datetime.now(timezone.utc))
+        inicio_busqueda = max(normalizar(desde), ahora) if desde else ahora
+
+        plantillas = plantillas_semanales.obtener_varias(
+            list(recursos),
+            disponibilidad_repo.get_franjas_semana_recursos
+        )
+        huecos = buscar_proximos_libres(
+            plantillas,
+            lambda inicio, fin: _ocupados_recursos(disponibilidad_repo, list(recursos), inicio, fin),
+            inicio_busqueda,
+            duracion_minutos,
+            cantidad,
+            MAX_HORIZONTE_DIAS
+        )
+
+        duracion = timedelta(minutes=duracion_minutos)
+        return respuestas.lista(ProximoLibreResponse, [
+            ProximoLibreResponse(
+                recurso_id=recurso_id,
+                recurso_nombre=recursos[recurso_id],
+                fecha_hora_inicio=inicio,
+                fecha_hora_fin=inicio + duracion,
+                precio=plantillas[recurso_id].precio_entre(inicio, inicio + duracion)
+            )
+            for inicio, recurso_id in huecos
+        ])
+
+    except Exception as e:
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al buscar horarios libres"
+        )
+
+
 @router.post('/', response_model=ReservaResponse, status_code=status.HTTP_201_CREATED)
 def crear_reserva(
     data: ReservaCreateSchema,
+    idempotency_key: Optional[str] = Header(None),
     current_user: User = Depends(get_current_cliente),
     session: Session = Depends(get_session)
 ):
-    """Crea una nueva reserva con opción de seña"""
+    """
+    Crea una nueva reserva con opción de seña.
+
+    Con el header Idempotency-Key, los reintentos devuelven la respuesta
+    de la primera petición sin volver a crear la reserva.
+    """
+    clave, repetida = idempotencia.iniciar(idempotency_key, current_user.id, 'crear_reserva', data)
+    if repetida:
+        return repetida
+
     try:
-        from app.infrastructure.repositories.cliente_repository import SQLAlchemyClienteRepository
-        cliente_repo = SQLAlchemyClienteRepository(session)
-        cliente = cliente_repo.get_by_user_id(current_user.id)
-        
-        if not cliente:
-            raise HTTPException(status_code=404, detail="Perfil de cliente no encontrado")
-        
-        recurso = session.query(RecursoModel).filter(
-            RecursoModel.id == data.recurso_id,
-            RecursoModel.is_active == True
-        ).first()
-        
-        if not recurso:
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+
+        fecha_inicio = normalizar(data.fecha_hora_inicio)
+        fecha_hora_fin = fecha_inicio + timedelta(minutes=data.duracion_minutos)
+
+        # Todo lo que se puede validar en memoria va antes de tocar la base:
+        # recurso, reservas conocidas, bloqueos, precio y horario salen de los
+        # índices/caches. El recurso va primero: un id inexistente no debe
+        # llegar a cargar índices ni plantillas
+        if not recursos_activos.esta_activo(data.recurso_id, disponibilidad_repo.recurso_activo):
             raise HTTPException(status_code=404, detail="Recurso no disponible")
-        
-        fecha_hora_fin = data.fecha_hora_inicio + timedelta(minutes=data.duracion_minutos)
-        
-        # Verificar disponibilidad
-        reservas_existentes = session.query(ReservaModel).filter(
-            ReservaModel.recurso_id == data.recurso_id,
-            ReservaModel.estado.in_(['pendiente', 'confirmada']),
-            ReservaModel.fecha_hora_inicio < fecha_hora_fin,
-            ReservaModel.fecha_hora_fin > data.fecha_hora_inicio
-        ).count()
-        
-        if reservas_existentes > 0:
-            raise HTTPException(status_code=400, detail="El horario ya está reservado")
-        
-        # Buscar precio
-        fecha_inicio = data.fecha_hora_inicio
-        if fecha_inicio.tzinfo is None:
-            fecha_inicio = fecha_inicio.replace(tzinfo=timezone.utc)
-        
-        dia_semana = fecha_inicio.weekday()
-        hora = fecha_inicio.time()
-        
-        horario = session.query(HorarioDisponibleModel).filter(
-            HorarioDisponibleModel.recurso_id == data.recurso_id,
-            HorarioDisponibleModel.dia_semana == dia_semana,
-            HorarioDisponibleModel.hora_inicio <= hora,
-            HorarioDisponibleModel.hora_fin > hora,
-            HorarioDisponibleModel.is_active == True
-        ).first()
-        
-        if not horario:
+
+        if _conflicto_en_indice(disponibilidad_repo, data.recurso_id, fecha_inicio, fecha_hora_fin):
+            raise HTTPException(status_code=409, detail="El horario ya está reservado")
+
+        bloqueos = bloqueos_recursos.obtener(
+            data.recurso_id, fecha_inicio, fecha_hora_fin, disponibilidad_repo.get_bloqueos_recursos
+        )
+        if bloqueos.bloquea(fecha_inicio, fecha_hora_fin):
+            raise HTTPException(status_code=400, detail="El recurso está bloqueado en ese horario")
+
+        plantilla = plantillas_semanales.obtener(data.recurso_id, disponibilidad_repo.get_franjas_semana)
+
+        if plantilla.precio_en(fecha_inicio) is None:
             raise HTTPException(status_code=400, detail="No hay horario disponible")
+
+        # Prorrateado entre las franjas que cruza la reserva
+        precio_total = plantilla.precio_entre(fecha_inicio, fecha_hora_fin)
+
+        if precio_total is None:
+            raise HTTPException(status_code=400, detail="La reserva excede el horario disponible")
         
-        precio_total = horario.precio
         seña = data.seña or 0
         
         if seña > precio_total:
             raise HTTPException(status_code=400, detail="La seña no puede ser mayor al precio total")
         
         saldo_pendiente = precio_total - seña
-        pago_completo = saldo_pendiente == 0
+
+        # Serializar las reservas del mismo recurso si así está configurado
+        disponibilidad_repo.bloquear_recurso(data.recurso_id, settings.reserva_lock_mode)
+
+        # Cliente, recurso, solapamiento (autoritativo), INSERT y versión en un solo round trip
+        from app.infrastructure.repositories.reserva_repository import SQLAlchemyReservaRepository
+        try:
+            fila = SQLAlchemyReservaRepository(session).crear_si_disponible(current_user.id, {
+                'recurso_id': data.recurso_id,
+                'fecha_hora_inicio': fecha_inicio,
+                'fecha_hora_fin': fecha_hora_fin,
+                'duracion_minutos': data.duracion_minutos,
+                'precio_total': precio_total,
+                'seña': seña if seña > 0 else None,
+                'saldo_pendiente': saldo_pendiente,
+                'metodo_pago': data.metodo_pago,
+                'pago_completo': saldo_pendiente == 0,
+                'pago_confirmado': False,
+                'notas_cliente': data.notas_cliente
+            })
+
+            if fila['cliente_encontrado'] is None:
+                raise HTTPException(status_code=404, detail="Perfil de cliente no encontrado")
+
+            if not fila['recurso_activo']:
+                raise HTTPException(status_code=404, detail="Recurso no disponible")
+
+            if fila['hay_solapamiento']:
+                raise HTTPException(status_code=409, detail="El horario ya está reservado")
+
+            if fila['hay_retencion']:
+                raise HTTPException(status_code=409, detail="El horario está retenido por otro cliente")
+
+            session.commit()
+        except IntegrityError as e:
+            session.rollback()
+            if not es_solapamiento_reserva(e):
+                raise
+            # Otra reserva concurrente ganó el horario: el índice en memoria quedó viejo
+            indice_reservas.invalidar(data.recurso_id)
+            raise HTTPException(status_code=409, detail="El horario ya está reservado")
+
+        indice_reservas.agregar(
+            data.recurso_id,
+            Intervalo(fila['fecha_hora_inicio'], fila['fecha_hora_fin'], fila['id'])
+        )
+        notificar_cambio_reserva(data.recurso_id, fila['fecha_hora_inicio'], fila['fecha_hora_fin'])
+        
+        respuesta = ReservaResponse.model_validate(fila)
+        idempotencia.completar(clave, status.HTTP_201_CREATED, respuesta)
+        return respuesta
         
-        reserva = ReservaModel(
+    except HTTPException:
+        idempotencia.liberar(clave)
+        raise
+    except Exception as e:
+        idempotencia.liberar(clave)
+        session.rollback()
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.post('/lote', response_model=List[ReservaResponse], status_code=status.HTTP_201_CREATED)
+def crear_reservas_lote(
+    data: ReservaLoteCreateSchema,
+    idempotency_key: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_cliente),
+    session: Session = Depends(get_session)
+):
+    """
+    Crea varias reservas en una sola transacción: o se crean todas o ninguna.
+    Sirve para reservar horas consecutivas o varias canchas a la vez.
+
+    El solapamiento de todo el lote se verifica con una sola consulta, los
+    precios salen de las plantillas en memoria y las filas se insertan con un
+    único INSERT de varias filas.
+    """
+    clave, repetida = idempotencia.iniciar(idempotency_key, current_user.id, 'crear_reservas_lote', data)
+    if repetida:
+        return repetida
+
+    try:
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+
+        items = [
+            (i + 1, item, normalizar(item.fecha_hora_inicio), normalizar(item.fecha_hora_inicio) + timedelta(minutes=item.duracion_minutos))
+            for i, item in enumerate(data.reservas)
+        ]
+        recurso_ids = sorted({item.recurso_id for _, item, _, _ in items})
+
+        # Las reservas del lote no pueden pisarse entre sí
+        por_recurso = sorted(items, key=lambda x: (x[1].recurso_id, x[2]))
+        for anterior, actual in zip(por_recurso, por_recurso[1:]):
+            if anterior[1].recurso_id == actual[1].recurso_id and actual[2] < anterior[3]:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Las reservas {anterior[0]} y {actual[0]} del lote se superponen"
+                )
+
+        from app.infrastructure.repositories.cliente_repository import SQLAlchemyClienteRepository
+        cliente = SQLAlchemyClienteRepository(session).get_by_user_id(current_user.id)
+
+        if not cliente:
+            raise HTTPException(status_code=404, detail="Perfil de cliente no encontrado")
+
+        activos = {
+            r.id for r in session.query(RecursoModel.id).filter(
+                RecursoModel.id.in_(recurso_ids),
+                RecursoModel.is_active == True
+            )
+        }
+        for n, item, _, _ in items:
+            if item.recurso_id not in activos:
+                raise HTTPException(status_code=404, detail=f"Reserva {n}: Recurso no disponible")
+
+        # En orden de id para que dos lotes cruzados no se bloqueen mutuamente
+        for recurso_id in recurso_ids:
+            disponibilidad_repo.bloquear_recurso(recurso_id, settings.reserva_lock_mode)
+
+        # Verificar disponibilidad de todo el lote en una sola consulta (autoritativo):
+        # reservas activas y retenciones vigentes de otros clientes
+        conflictos = disponibilidad_repo.get_conflictos(
+            [(item.recurso_id, inicio, fin) for _, item, inicio, fin in items],
+            excluir_cliente_id=cliente.id
+        )
+
+        for n, item, inicio, fin in items:
+            if any(c.inicio < fin and c.fin > inicio for c in conflictos.get(item.recurso_id, [])):
+                raise HTTPException(status_code=409, detail=f"Reserva {n}: El horario ya está reservado")
+
+        plantillas = plantillas_semanales.obtener_varias(recurso_ids, disponibilidad_repo.get_franjas_semana_recursos)
+        bloqueos = bloqueos_recursos.obtener_varias(
+            recurso_ids,
+            min(inicio for _, _, inicio, _ in items),
+            max(fin for _, _, _, fin in items),
+            disponibilidad_repo.get_bloqueos_recursos
+        )
+
+        filas = []
+        for n, item, inicio, fin in items:
+            if bloqueos[item.recurso_id].bloquea(inicio, fin):
+                raise HTTPException(status_code=400, detail=f"Reserva {n}: El recurso está bloqueado en ese horario")
+
+            plantilla = plantillas[item.recurso_id]
+
+            if plantilla.precio_en(inicio) is None:
+                raise HTTPException(status_code=400, detail=f"Reserva {n}: No hay horario disponible")
+
+            precio_total = plantilla.precio_entre(inicio, fin)
+
+            if precio_total is None:
+                raise HTTPException(status_code=400, detail=f"Reserva {n}: La reserva excede el horario disponible")
+
+            seña = item.seña or 0
+
+            if seña > precio_total:
+                raise HTTPException(status_code=400, detail=f"Reserva {n}: La seña no puede ser mayor al precio total")
+
+            saldo_pendiente = precio_total - seña
+            filas.append({
+                'cliente_id': cliente.id,
+                'recurso_id': item.recurso_id,
+                'fecha_hora_inicio': inicio,
+                'fecha_hora_fin': fin,
+                'duracion_minutos': item.duracion_minutos,
+                'estado': 'pendiente',
+                'precio_total': precio_total,
+                'seña': seña if seña > 0 else None,
+                'saldo_pendiente': saldo_pendiente,
+                'metodo_pago': item.metodo_pago,
+                'pago_completo': saldo_pendiente == 0,
+                'pago_confirmado': False,
+                'notas_cliente': item.notas_cliente
+            })
+
+        # La restricción de exclusión salta en el INSERT, no en el commit
+        try:
+            reservas = session.scalars(insert(ReservaModel).returning(ReservaModel), filas).all()
+            for recurso_id in recurso_ids:
+                disponibilidad_repo.incrementar_version(recurso_id)
+
+            session.commit()
+        except IntegrityError as e:
+            session.rollback()
+            if not es_solapamiento_reserva(e):
+                raise
+            for recurso_id in recurso_ids:
+                indice_reservas.invalidar(recurso_id)
+            raise HTTPException(status_code=409, detail="Alguno de los horarios ya está reservado")
+
+        for reserva in reservas:
+            indice_reservas.agregar(
+                reserva.recurso_id,
+                Intervalo(reserva.fecha_hora_inicio, reserva.fecha_hora_fin, reserva.id)
+            )
+            notificar_cambio_reserva(reserva.recurso_id, reserva.fecha_hora_inicio, reserva.fecha_hora_fin)
+
+        respuesta = [ReservaResponse.model_validate(r) for r in reservas]
+        idempotencia.completar(clave, status.HTTP_201_CREATED, respuesta)
+        return respuesta
+
+    except HTTPException:
+        idempotencia.liberar(clave)
+        raise
+    except Exception as e:
+        idempotencia.liberar(clave)
+        session.rollback()
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error al crear las reservas")
+
+
+@router.post('/serie', response_model=ReservaSerieResponse, status_code=status.HTTP_201_CREATED)
+def crear_reserva_serie(
+    data: ReservaSerieCreateSchema,
+    idempotency_key: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_cliente),
+    session: Session = Depends(get_session)
+):
+    """
+    Reserva el mismo horario todas las semanas (Ej: la liga de los martes 20:00).
+
+    La regla se expande en ocurrencias (hasta 52); los conflictos de todas se
+    buscan con una sola consulta y las libres se insertan juntas con un mismo
+    `serie_id`. Las ocurrencias ocupadas, bloqueadas o fuera de horario se
+    informan en `omitidas` en lugar de hacer fallar la serie.
+    """
+    clave, repetida = idempotencia.iniciar(idempotency_key, current_user.id, 'crear_reserva_serie', data)
+    if repetida:
+        return repetida
+
+    try:
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+
+        from app.infrastructure.repositories.cliente_repository import SQLAlchemyClienteRepository
+        cliente = SQLAlchemyClienteRepository(session).get_by_user_id(current_user.id)
+
+        if not cliente:
+            raise HTTPException(status_code=404, detail="Perfil de cliente no encontrado")
+
+        recurso = session.query(RecursoModel.id).filter(
+            RecursoModel.id == data.recurso_id,
+            RecursoModel.is_active == True
+        ).first()
+
+        if not recurso:
+            raise HTTPException(status_code=404, detail="Recurso no disponible")
+
+        ahora = normalizar(datetime.now(timezone.utc))
+        duracion = timedelta(minutes=data.duracion_minutos)
+        ocurrencias = [
+            (inicio, inicio + duracion)
+            for inicio in expandir_semanal(data.dia_semana, data.hora_inicio, data.desde, data.cantidad, data.hasta)
+            if inicio > ahora
+        ]
+
+        if not ocurrencias:
+            raise HTTPException(status_code=400, detail="La serie no tiene fechas futuras")
+
+        disponibilidad_repo.bloquear_recurso(data.recurso_id, settings.reserva_lock_mode)
+
+        # Conflictos (reservas y retenciones de otros clientes) de todas las ocurrencias en una sola consulta
+        conflictos = disponibilidad_repo.get_conflictos(
+            [(data.recurso_id, inicio, fin) for inicio, fin in ocurrencias],
+            excluir_cliente_id=cliente.id
+        ).get(data.recurso_id, [])
+
+        plantilla = plantillas_semanales.obtener(data.recurso_id, disponibilidad_repo.get_franjas_semana)
+        bloqueos = bloqueos_recursos.obtener(
+            data.recurso_id,
+            ocurrencias[0][0],
+            ocurrencias[-1][1],
+            disponibilidad_repo.get_bloqueos_recursos
+        )
+
+        serie_id = uuid.uuid4().hex
+        filas = []
+        omitidas = []
+        # Todas las ocurrencias se tarifan en una sola llamada
+        precios = plantilla.precios_entre([inicio for inicio, _ in ocurrencias], data.duracion_minutos)
+
+        for (inicio, fin), precio_total in zip(ocurrencias, precios):
+            if any(c.inicio < fin and c.fin > inicio for c in conflictos):
+                motivo = "El horario ya está reservado"
+            elif bloqueos.bloquea(inicio, fin):
+                motivo = "El recurso está bloqueado en ese horario"
+            elif plantilla.precio_en(inicio) is None:
+                motivo = "No hay horario disponible"
+            elif precio_total is None:
+                motivo = "La reserva excede el horario disponible"
+            else:
+                motivo = None
+
+            if motivo:
+                omitidas.append(OcurrenciaOmitidaResponse(fecha_hora_inicio=inicio, motivo=motivo))
+                continue
+
+            filas.append({
+                'cliente_id': cliente.id,
+                'recurso_id': data.recurso_id,
+                'serie_id': serie_id,
+                'fecha_hora_inicio': inicio,
+                'fecha_hora_fin': fin,
+                'duracion_minutos': data.duracion_minutos,
+                'estado': 'pendiente',
+                'precio_total': precio_total,
+                'saldo_pendiente': precio_total,
+                'metodo_pago': data.metodo_pago,
+                'pago_completo': False,
+                'pago_confirmado': False,
+                'notas_cliente': data.notas_cliente
+            })
+
+        if not filas:
+            raise HTTPException(status_code=400, detail="Ninguna fecha de la serie está disponible")
+
+        # La restricción de exclusión salta en el INSERT, no en el commit
+        try:
+            reservas = session.scalars(insert(ReservaModel).returning(ReservaModel), filas).all()
+            disponibilidad_repo.incrementar_version(data.recurso_id)
+
+            session.commit()
+        except IntegrityError as e:
+            session.rollback()
+            if not es_solapamiento_reserva(e):
+                raise
+            indice_reservas.invalidar(data.recurso_id)
+            raise HTTPException(status_code=409, detail="Alguno de los horarios ya está reservado")
+
+        for reserva in reservas:
+            indice_reservas.agregar(
+                reserva.recurso_id,
+                Intervalo(reserva.fecha_hora_inicio, reserva.fecha_hora_fin, reserva.id)
+            )
+            notificar_cambio_reserva(reserva.recurso_id, reserva.fecha_hora_inicio, reserva.fecha_hora_fin)
+
+        respuesta = ReservaSerieResponse(
+            serie_id=serie_id,
+            creadas=[ReservaResponse.model_validate(r) for r in reservas],
+            omitidas=omitidas
+        )
+        idempotencia.completar(clave, status.HTTP_201_CREATED, respuesta)
+        return respuesta
+
+    except HTTPException:
+        idempotencia.liberar(clave)
+        raise
+    except Exception as e:
+        idempotencia.liberar(clave)
+        session.rollback()
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error al crear la serie de reservas")
+
+
+@router.post('/retenciones', response_model=RetencionResponse, status_code=status.HTTP_201_CREATED)
+def crear_retencion(
+    data: RetencionCreateSchema,
+    current_user: User = Depends(get_current_cliente),
+    session: Session = Depends(get_session)
+):
+    """
+    Retiene un horario por unos minutos (RETENCION_MINUTOS) mientras el
+    cliente completa el pago. Mientras esté vigente, el horario figura como
+    ocupado para los demás; si no se confirma, vence solo.
+    """
+    try:
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+        _barrer_retenciones_vencidas(session, disponibilidad_repo)
+
+        fecha_inicio = normalizar(data.fecha_hora_inicio)
+        fecha_hora_fin = fecha_inicio + timedelta(minutes=data.duracion_minutos)
+
+        recurso = session.query(RecursoModel.id).filter(
+            RecursoModel.id == data.recurso_id,
+            RecursoModel.is_active == True
+        ).first()
+
+        if not recurso:
+            raise HTTPException(status_code=404, detail="Recurso no disponible")
+
+        if _conflicto_en_indice(disponibilidad_repo, data.recurso_id, fecha_inicio, fecha_hora_fin):
+            raise HTTPException(status_code=409, detail="El horario ya está reservado")
+
+        bloqueos = bloqueos_recursos.obtener(
+            data.recurso_id, fecha_inicio, fecha_hora_fin, disponibilidad_repo.get_bloqueos_recursos
+        )
+        if bloqueos.bloquea(fecha_inicio, fecha_hora_fin):
+            raise HTTPException(status_code=400, detail="El recurso está bloqueado en ese horario")
+
+        plantilla = plantillas_semanales.obtener(data.recurso_id, disponibilidad_repo.get_franjas_semana)
+
+        if plantilla.precio_en(fecha_inicio) is None:
+            raise HTTPException(status_code=400, detail="No hay horario disponible")
+
+        # Prorrateado entre las franjas que cruza la reserva
+        precio_total = plantilla.precio_entre(fecha_inicio, fecha_hora_fin)
+
+        if precio_total is None:
+            raise HTTPException(status_code=400, detail="La reserva excede el horario disponible")
+
+        from app.infrastructure.repositories.cliente_repository import SQLAlchemyClienteRepository
+        cliente = SQLAlchemyClienteRepository(session).get_by_user_id(current_user.id)
+
+        if not cliente:
+            raise HTTPException(status_code=404, detail="Perfil de cliente no encontrado")
+
+        # Las retenciones no tienen restricción de exclusión (las vencidas siguen
+        # en la tabla hasta el barrido): sin lock configurado se toma igual el
+        # de la fila del recurso, si no dos retenciones simultáneas pasarían
+        # ambas la verificación
+        modo_lock = settings.reserva_lock_mode if settings.reserva_lock_mode != 'none' else 'for_update'
+        disponibilidad_repo.bloquear_recurso(data.recurso_id, modo_lock)
+
+        # Reservas y retenciones vigentes (también las propias: no se retiene dos veces)
+        if disponibilidad_repo.get_conflictos([(data.recurso_id, fecha_inicio, fecha_hora_fin)]):
+            raise HTTPException(status_code=409, detail="El horario ya está reservado")
+
+        retencion = RetencionModel(
             cliente_id=cliente.id,
             recurso_id=data.recurso_id,
             fecha_hora_inicio=fecha_inicio,
             fecha_hora_fin=fecha_hora_fin,
             duracion_minutos=data.duracion_minutos,
             precio_total=precio_total,
-            seña=seña if seña > 0 else None,
-            saldo_pendiente=saldo_pendiente,
-            metodo_pago=data.metodo_pago,
-            pago_completo=pago_completo,
-            pago_confirmado=False,
-            notas_cliente=data.notas_cliente
+            expira_en=datetime.utcnow() + timedelta(minutes=settings.retencion_minutos)
         )
-        
-        session.add(reserva)
+
+        session.add(retencion)
+        disponibilidad_repo.incrementar_version(data.recurso_id)
         session.commit()
-        session.refresh(reserva)
-        
-        return ReservaResponse.model_validate(reserva)
-        
+        session.refresh(retencion)
+
+        notificar_cambio_reserva(retencion.recurso_id, retencion.fecha_hora_inicio, retencion.fecha_hora_fin)
+
+        return RetencionResponse.model_validate(retencion)
+
     except HTTPException:
         raise
     except Exception as e:
         session.rollback()
         print(f"Error: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error al retener el horario")
+
+
+@router.post('/retenciones/{retencion_id}/confirmar', response_model=ReservaResponse, status_code=status.HTTP_201_CREATED)
+def confirmar_retencion(
+    retencion_id: int,
+    data: ConfirmarRetencionSchema,
+    idempotency_key: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_cliente),
+    session: Session = Depends(get_session)
+):
+    """
+    Convierte una retención vigente en reserva con el precio retenido.
+    No vuelve a verificar disponibilidad: el horario ya estaba retenido.
+    """
+    clave, repetida = idempotencia.iniciar(idempotency_key, current_user.id, 'confirmar_retencion', data, retencion_id)
+    if repetida:
+        return repetida
+
+    try:
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+        _barrer_retenciones_vencidas(session, disponibilidad_repo)
+
+        seña = data.seña or 0
+
+        from app.infrastructure.repositories.reserva_repository import SQLAlchemyReservaRepository
+        try:
+            fila = SQLAlchemyReservaRepository(session).confirmar_retencion(retencion_id, current_user.id, {
+                'seña': seña if seña > 0 else None,
+                'metodo_pago': data.metodo_pago,
+                'pago_confirmado': False,
+                'notas_cliente': data.notas_cliente
+            })
+
+            if fila['precio_retencion'] is None:
+                session.rollback()
+                raise HTTPException(status_code=404, detail="La retención no existe o ya venció")
+
+            if fila['id'] is None:
+                session.rollback()
+                raise HTTPException(status_code=400, detail="La seña no puede ser mayor al precio total")
+
+            session.commit()
+        except IntegrityError as e:
+            session.rollback()
+            if not es_solapamiento_reserva(e):
+                raise
+            raise HTTPException(status_code=409, detail="El horario ya está reservado")
+
+        indice_reservas.agregar(
+            fila['recurso_id'],
+            Intervalo(fila['fecha_hora_inicio'], fila['fecha_hora_fin'], fila['id'])
+        )
+        notificar_cambio_reserva(fila['recurso_id'], fila['fecha_hora_inicio'], fila['fecha_hora_fin'])
+
+        respuesta = ReservaResponse.model_validate(fila)
+        idempotencia.completar(clave, status.HTTP_201_CREATED, respuesta)
+        return respuesta
+
+    except HTTPException:
+        idempotencia.liberar(clave)
+        raise
+    except Exception as e:
+        idempotencia.liberar(clave)
+        session.rollback()
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error al confirmar la retención")
+
+
+@router.delete('/retenciones/{retencion_id}', status_code=status.HTTP_204_NO_CONTENT)
+def liberar_retencion(
+    retencion_id: int,
+    current_user: User = Depends(get_current_cliente),
+    session: Session = Depends(get_session)
+):
+    """
+    Libera una retención propia antes de que venza (Ej: el cliente abandonó el pago)
+    """
+    try:
+        retencion = session.query(RetencionModel).join(
+            ClienteModel, RetencionModel.cliente_id == ClienteModel.id
+        ).filter(
+            RetencionModel.id == retencion_id,
+            ClienteModel.user_id == current_user.id
+        ).first()
+
+        if not retencion:
+            raise HTTPException(status_code=404, detail="Retención no encontrada")
+
+        recurso_id = retencion.recurso_id
+        inicio, fin = retencion.fecha_hora_inicio, retencion.fecha_hora_fin
+
+        session.delete(retencion)
+        SQLAlchemyDisponibilidadRepository(session).incrementar_version(recurso_id)
+        session.commit()
+
+        notificar_cambio_reserva(recurso_id, inicio, fin)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        session.rollback()
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error al liberar la retención")
 
 
 @router.get('/mis-reservas', response_model=List[ReservaDetailResponse])
 def listar_mis_reservas(
+    response: Response,
     estado: str = None,
+    cuando: Optional[str] = Query(
+        None,
+        pattern="^(proximas|pasadas)$",
+        description="proximas (empiezan desde ahora, las más cercanas primero) o pasadas"
+    ),
+    desde: Optional[datetime] = Query(None, description="Solo reservas que empiezan desde esta fecha"),
+    hasta: Optional[datetime] = Query(None, description="Solo reservas que empiezan antes de esta fecha"),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
+    limite: int = Query(50, gt=0, le=200),
     current_user: User = Depends(get_current_cliente),
     session: Session = Depends(get_session)
 ):
-    """Lista las reservas del cliente autenticado"""
+    """
+    Lista las reservas del cliente autenticado, paginadas por clave
+    (fecha_hora_inicio, id): cada página es un rango del índice
+    (cliente_id, fecha_hora_inicio, id), así que cuesta lo mismo sin importar
+    el largo del historial.
+
+    Si hay más resultados, el header X-Next-Cursor trae el cursor para pedir
+    la página siguiente con los mismos filtros.
+    """
+    try:
+        posicion = decodificar_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
     try:
         from app.infrastructure.repositories.cliente_repository import SQLAlchemyClienteRepository
         cliente_repo = SQLAlchemyClienteRepository(session)
         cliente = cliente_repo.get_by_user_id(current_user.id)
+
+        if not cliente:
+            raise HTTPException(status_code=404, detail="Perfil de cliente no encontrado")
         
-        query = session.query(
-            ReservaModel,
-            RecursoModel.nombre.label('recurso_nombre'),
-            ServicioModel.nombre.label('servicio_nombre'),
-            ClienteModel.nombre.label('cliente_nombre')
-        ).join(
-            RecursoModel, ReservaModel.recurso_id == RecursoModel.id
-        ).join(
-            ServicioModel, RecursoModel.servicio_id == ServicioModel.id
-        ).join(
-            ClienteModel, ReservaModel.cliente_id == ClienteModel.id
-        ).filter(
+        query = _consulta_detalle(session).filter(
             ReservaModel.cliente_id == cliente.id
         )
         
         if estado:
             query = query.filter(ReservaModel.estado == estado)
+
+        ahora = normalizar(datetime.now(timezone.utc))
+        if cuando == 'proximas':
+            query = query.filter(ReservaModel.fecha_hora_inicio >= ahora)
+        elif cuando == 'pasadas':
+            query = query.filter(ReservaModel.fecha_hora_inicio < ahora)
+
+        if desde:
+            query = query.filter(ReservaModel.fecha_hora_inicio >= normalizar(desde))
+        if hasta:
+            query = query.filter(ReservaModel.fecha_hora_inicio < normalizar(hasta))
+
+        # Las próximas van de la más cercana en adelante; el resto, de la más nueva hacia atrás
+        ascendente = cuando == 'proximas'
+        clave = tuple_(ReservaModel.fecha_hora_inicio, ReservaModel.id)
+        if posicion:
+            query = query.filter(clave > tuple_(*posicion) if ascendente else clave < tuple_(*posicion))
+
+        if ascendente:
+            query = query.order_by(ReservaModel.fecha_hora_inicio, ReservaModel.id)
+        else:
+            query = query.order_by(ReservaModel.fecha_hora_inicio.desc(), ReservaModel.id.desc())
+
+        # Una fila de más para saber si hay página siguiente
+        resultados = query.limit(limite + 1).all()
+        if len(resultados) > limite:
+            resultados = resultados[:limite]
+            ultima = resultados[-1]
+            response.headers[HEADER_CURSOR] = codificar_cursor(ultima.fecha_hora_inicio, ultima.id)
         
-        resultados = query.order_by(ReservaModel.fecha_hora_inicio.desc()).all()
-        
-        return [
-            ReservaDetailResponse(
-                id=r.ReservaModel.id,
-                cliente_id=r.ReservaModel.cliente_id,
-                recurso_id=r.ReservaModel.recurso_id,
-                fecha_hora_inicio=r.ReservaModel.fecha_hora_inicio,
-                fecha_hora_fin=r.ReservaModel.fecha_hora_fin,
-                duracion_minutos=r.ReservaModel.duracion_minutos,
-                estado=r.ReservaModel.estado,
-                precio_total=r.ReservaModel.precio_total,
-                seña=r.ReservaModel.seña,
-                saldo_pendiente=r.ReservaModel.saldo_pendiente,
-                pago_completo=r.ReservaModel.pago_completo,
-                pago_confirmado=r.ReservaModel.pago_confirmado,
-                metodo_pago=r.ReservaModel.metodo_pago,
-                notas_cliente=r.ReservaModel.notas_cliente,
-                notas_pago=r.ReservaModel.notas_pago,
-                created_at=r.ReservaModel.created_at,
-                recurso_nombre=r.recurso_nombre,
-                servicio_nombre=r.servicio_nombre,
-                cliente_nombre=f"{r.cliente_nombre}"
-            )
-            for r in resultados
-        ]
+        return respuestas.lista(ReservaDetailResponse, _detalles(resultados), response)
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error: {type(e).__name__}: {str(e)}")
         raise HTTPException(
@@ -234,45 +1351,63 @@ def listar_mis_reservas(
 def registrar_pago_adicional(
     reserva_id: int,
     data: PagoReservaSchema,
+    idempotency_key: Optional[str] = Header(None),
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_cliente),
     session: Session = Depends(get_session)
 ):
-    """Registra un pago adicional (para completar el saldo)"""
+    """
+    Registra un pago adicional (para completar el saldo).
+    Acepta Idempotency-Key para que un reintento no sume el monto dos veces.
+    Con If-Match (versión de la reserva) responde 409 si la reserva cambió.
+    """
+    version = _version_esperada(if_match)
+    clave, repetida = idempotencia.iniciar(idempotency_key, current_user.id, 'registrar_pago', data, reserva_id)
+    if repetida:
+        return repetida
+
     try:
-        from app.infrastructure.repositories.cliente_repository import SQLAlchemyClienteRepository
-        cliente_repo = SQLAlchemyClienteRepository(session)
-        cliente = cliente_repo.get_by_user_id(current_user.id)
-        
-        reserva = session.query(ReservaModel).filter(
-            ReservaModel.id == reserva_id,
-            ReservaModel.cliente_id == cliente.id
-        ).first()
-        
-        if not reserva:
-            raise HTTPException(status_code=404, detail="Reserva no encontrada")
-        
-        if reserva.estado == 'cancelada':
-            raise HTTPException(status_code=400, detail="No se puede pagar una reserva cancelada")
-        
-        seña_actual = reserva.seña or 0
-        seña_nueva = seña_actual + data.monto
-        
-        if seña_nueva > reserva.precio_total:
-            raise HTTPException(status_code=400, detail="El monto total supera el precio")
-        
-        reserva.seña = seña_nueva
-        reserva.saldo_pendiente = reserva.precio_total - seña_nueva
-        reserva.pago_completo = reserva.saldo_pendiente == 0
-        reserva.metodo_pago = data.metodo_pago
-        
+        from app.infrastructure.repositories.reserva_repository import SQLAlchemyReservaRepository
+        reserva_repo = SQLAlchemyReservaRepository(session)
+
+        # La suma se hace en la base, así dos pagos simultáneos no se pisan
+        seña_nueva = func.coalesce(ReservaModel.seña, 0) + data.monto
+        fila = reserva_repo.actualizar_si(
+            reserva_id,
+            current_user.id,
+            'cliente',
+            [ReservaModel.estado != 'cancelada', seña_nueva <= ReservaModel.precio_total],
+            {
+                'seña': seña_nueva,
+                'saldo_pendiente': ReservaModel.precio_total - seña_nueva,
+                'pago_completo': ReservaModel.precio_total - seña_nueva == 0,
+                'metodo_pago': data.metodo_pago
+            },
+            version
+        )
+
+        if fila is None:
+            reserva = _reserva_rechazada(reserva_repo, reserva_id, current_user.id, 'cliente', version)
+
+            if reserva.estado == 'cancelada':
+                raise HTTPException(status_code=400, detail="No se puede pagar una reserva cancelada")
+
+            if (reserva.seña or 0) + data.monto > reserva.precio_total:
+                raise HTTPException(status_code=400, detail="El monto total supera el precio")
+
+            raise HTTPException(status_code=409, detail=RESERVA_MODIFICADA)
+
         session.commit()
-        session.refresh(reserva)
-        
-        return ReservaResponse.model_validate(reserva)
+
+        respuesta = ReservaResponse.model_validate(fila)
+        idempotencia.completar(clave, status.HTTP_200_OK, respuesta)
+        return respuesta
         
     except HTTPException:
+        idempotencia.liberar(clave)
         raise
     except Exception as e:
+        idempotencia.liberar(clave)
         session.rollback()
         raise HTTPException(status_code=500, detail="Error al registrar pago")
 
@@ -281,37 +1416,48 @@ def registrar_pago_adicional(
 def cancelar_reserva(
     reserva_id: int,
     data: CancelarReservaSchema,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_cliente),
     session: Session = Depends(get_session)
 ):
     """Cancela una reserva (solo el cliente dueño)"""
+    version = _version_esperada(if_match)
+
     try:
-        from app.infrastructure.repositories.cliente_repository import SQLAlchemyClienteRepository
-        cliente_repo = SQLAlchemyClienteRepository(session)
-        cliente = cliente_repo.get_by_user_id(current_user.id)
-        
-        reserva = session.query(ReservaModel).filter(
-            ReservaModel.id == reserva_id,
-            ReservaModel.cliente_id == cliente.id
-        ).first()
-        
-        if not reserva:
-            raise HTTPException(status_code=404, detail="Reserva no encontrada")
-        
-        if reserva.estado in ['cancelada', 'completada']:
-            raise HTTPException(
-                status_code=400,
-                detail=f"No se puede cancelar una reserva {reserva.estado}"
-            )
-        
-        reserva.estado = 'cancelada'
-        reserva.motivo_cancelacion = data.motivo
-        reserva.fecha_cancelacion = datetime.now(timezone.utc)
-        
+        from app.infrastructure.repositories.reserva_repository import SQLAlchemyReservaRepository
+        reserva_repo = SQLAlchemyReservaRepository(session)
+
+        fila = reserva_repo.actualizar_si(
+            reserva_id,
+            current_user.id,
+            'cliente',
+            [ReservaModel.estado.notin_(['cancelada', 'completada'])],
+            {
+                'estado': 'cancelada',
+                'motivo_cancelacion': data.motivo,
+                'fecha_cancelacion': normalizar(datetime.now(timezone.utc))
+            },
+            version,
+            incrementar_version_recurso=True
+        )
+
+        if fila is None:
+            reserva = _reserva_rechazada(reserva_repo, reserva_id, current_user.id, 'cliente', version)
+
+            if reserva.estado in ['cancelada', 'completada']:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"No se puede cancelar una reserva {reserva.estado}"
+                )
+
+            raise HTTPException(status_code=409, detail=RESERVA_MODIFICADA)
+
         session.commit()
-        session.refresh(reserva)
+
+        indice_reservas.quitar(fila['recurso_id'], fila['id'])
+        notificar_cambio_reserva(fila['recurso_id'], fila['fecha_hora_inicio'], fila['fecha_hora_fin'])
         
-        return ReservaResponse.model_validate(reserva)
+        return ReservaResponse.model_validate(fila)
         
     except HTTPException:
         raise
@@ -324,64 +1470,161 @@ def cancelar_reserva(
 
 @router.get('/proveedor/todas', response_model=List[ReservaDetailResponse])
 def listar_reservas_proveedor(
+    response: Response,
     estado: str = None,
+    recurso_id: Optional[int] = Query(None, description="Solo las reservas de este recurso"),
+    desde: Optional[datetime] = Query(None, description="Solo reservas que empiezan desde esta fecha"),
+    hasta: Optional[datetime] = Query(None, description="Solo reservas que empiezan antes de esta fecha"),
+    orden: str = Query("desc", pattern="^(asc|desc)$", description="Por fecha de inicio"),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
+    limite: int = Query(50, gt=0, le=200),
+    con_total: bool = Query(False, description="Contar el total de resultados (header X-Total-Count)"),
     current_user: User = Depends(get_current_proveedor),
     session: Session = Depends(get_session)
 ):
-    """Lista todas las reservas del proveedor"""
+    """
+    Lista las reservas del proveedor de a una página, paginadas por clave
+    (fecha_hora_inicio, id). Si hay más resultados, el header X-Next-Cursor
+    trae el cursor de la página siguiente.
+
+    En lugar de juntar y ordenar todas las reservas del proveedor, cada
+    recurso aporta a lo sumo `limite` + 1 filas leídas en orden del índice
+    (recurso_id, fecha_hora_inicio, id) y solo se ordenan esas. El total
+    (un COUNT aparte) se calcula únicamente con `con_total`.
+    """
+    try:
+        posicion = decodificar_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
     try:
         from app.infrastructure.repositories.proveedor_repository import SQLAlchemyProveedorRepository
         proveedor_repo = SQLAlchemyProveedorRepository(session)
         proveedor = proveedor_repo.get_by_user_id(current_user.id)
+
+        if not proveedor:
+            raise HTTPException(status_code=404, detail="Perfil de proveedor no encontrado")
+
+        recursos, filtros = _filtros_reservas_proveedor(proveedor.id, recurso_id, estado, desde, hasta)
+
+        if con_total:
+            response.headers[HEADER_TOTAL] = str(session.scalar(
+                select(func.count()).select_from(ReservaModel).where(
+                    ReservaModel.recurso_id.in_(select(recursos.c.id)),
+                    *filtros
+                )
+            ))
+
+        ascendente = orden == 'asc'
+        clave = tuple_(ReservaModel.fecha_hora_inicio, ReservaModel.id)
+        if posicion:
+            filtros.append(clave > tuple_(*posicion) if ascendente else clave < tuple_(*posicion))
+
+        if ascendente:
+            orden_reservas = [ReservaModel.fecha_hora_inicio, ReservaModel.id]
+        else:
+            orden_reservas = [ReservaModel.fecha_hora_inicio.desc(), ReservaModel.id.desc()]
+
+        # Top-N de cada recurso (LATERAL sobre el índice) y después top-N del conjunto
+        por_recurso = select(
+            ReservaModel.id,
+            ReservaModel.fecha_hora_inicio
+        ).where(
+            ReservaModel.recurso_id == recursos.c.id,
+            *filtros
+        ).order_by(*orden_reservas).limit(limite + 1).lateral('por_recurso')
+
+        pagina = select(por_recurso.c.id).select_from(
+            recursos.join(por_recurso, true())
+        ).order_by(
+            *([por_recurso.c.fecha_hora_inicio, por_recurso.c.id] if ascendente
+              else [por_recurso.c.fecha_hora_inicio.desc(), por_recurso.c.id.desc()])
+        ).limit(limite + 1)
+
+        resultados = _consulta_detalle(session).filter(
+            ReservaModel.id.in_(pagina)
+        ).order_by(*orden_reservas).all()
+
+        if len(resultados) > limite:
+            resultados = resultados[:limite]
+            ultima = resultados[-1]
+            response.headers[HEADER_CURSOR] = codificar_cursor(ultima.fecha_hora_inicio, ultima.id)
+        
+        return respuestas.lista(ReservaDetailResponse, _detalles(resultados), response)
         
-        query = session.query(
-            ReservaModel,
-            RecursoModel.nombre.label('recurso_nombre'),
-            ServicioModel.nombre.label('servicio_nombre'),
-            ClienteModel.nombre.label('cliente_nombre')
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error al listar reservas")
+
+
+@router.get('/proveedor/exportar')
+def exportar_reservas_proveedor(
+    formato: str = Query("csv", pattern="^(csv|ndjson)$"),
+    estado: str = None,
+    recurso_id: Optional[int] = Query(None, description="Solo las reservas de este recurso"),
+    desde: Optional[datetime] = Query(None, description="Solo reservas que empiezan desde esta fecha"),
+    hasta: Optional[datetime] = Query(None, description="Solo reservas que empiezan antes de esta fecha"),
+    current_user: User = Depends(get_current_proveedor),
+    session: Session = Depends(get_session)
+):
+    """
+    Exporta las reservas del proveedor (Ej: para contabilidad) como CSV o
+    NDJSON, en orden de fecha de inicio. Las filas se leen con un cursor del
+    lado del servidor y se envían a medida que llegan: la memoria no crece
+    con el tamaño de la exportación.
+    """
+    try:
+        from app.infrastructure.repositories.proveedor_repository import SQLAlchemyProveedorRepository
+        proveedor_repo = SQLAlchemyProveedorRepository(session)
+        proveedor = proveedor_repo.get_by_user_id(current_user.id)
+
+        if not proveedor:
+            raise HTTPException(status_code=404, detail="Perfil de proveedor no encontrado")
+
+        recursos, filtros = _filtros_reservas_proveedor(proveedor.id, recurso_id, estado, desde, hasta)
+
+        consulta = select(
+            ReservaModel.id,
+            ReservaModel.fecha_hora_inicio,
+            ReservaModel.fecha_hora_fin,
+            ReservaModel.duracion_minutos,
+            ReservaModel.estado,
+            RecursoModel.nombre.label('recurso'),
+            ServicioModel.nombre.label('servicio'),
+            ClienteModel.nombre.label('cliente'),
+            ReservaModel.precio_total,
+            ReservaModel.seña,
+            ReservaModel.saldo_pendiente,
+            ReservaModel.metodo_pago,
+            ReservaModel.pago_completo,
+            ReservaModel.pago_confirmado,
+            ReservaModel.notas_pago,
+            ReservaModel.created_at
         ).join(
             RecursoModel, ReservaModel.recurso_id == RecursoModel.id
         ).join(
             ServicioModel, RecursoModel.servicio_id == ServicioModel.id
         ).join(
             ClienteModel, ReservaModel.cliente_id == ClienteModel.id
-        ).filter(
-            ServicioModel.proveedor_id == proveedor.id
+        ).where(
+            ReservaModel.recurso_id.in_(select(recursos.c.id)),
+            *filtros
+        ).order_by(ReservaModel.fecha_hora_inicio, ReservaModel.id)
+
+        nombre_archivo = f"reservas_{datetime.utcnow():%Y%m%d}.{formato}"
+        return StreamingResponse(
+            exportar_filas(consulta, formato),
+            media_type=TIPOS_MEDIA[formato],
+            headers={'Content-Disposition': f'attachment; filename="{nombre_archivo}"'}
         )
-        
-        if estado:
-            query = query.filter(ReservaModel.estado == estado)
-        
-        resultados = query.order_by(ReservaModel.fecha_hora_inicio.desc()).all()
-        
-        return [
-            ReservaDetailResponse(
-                id=r.ReservaModel.id,
-                cliente_id=r.ReservaModel.cliente_id,
-                recurso_id=r.ReservaModel.recurso_id,
-                fecha_hora_inicio=r.ReservaModel.fecha_hora_inicio,
-                fecha_hora_fin=r.ReservaModel.fecha_hora_fin,
-                duracion_minutos=r.ReservaModel.duracion_minutos,
-                estado=r.ReservaModel.estado,
-                precio_total=r.ReservaModel.precio_total,
-                seña=r.ReservaModel.seña,
-                saldo_pendiente=r.ReservaModel.saldo_pendiente,
-                pago_completo=r.ReservaModel.pago_completo,
-                pago_confirmado=r.ReservaModel.pago_confirmado,
-                metodo_pago=r.ReservaModel.metodo_pago,
-                notas_cliente=r.ReservaModel.notas_cliente,
-                notas_pago=r.ReservaModel.notas_pago,
-                created_at=r.ReservaModel.created_at,
-                recurso_nombre=r.recurso_nombre,
-                servicio_nombre=r.servicio_nombre,
-                cliente_nombre=r.cliente_nombre
-            )
-            for r in resultados
-        ]
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error: {type(e).__name__}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al listar reservas")
+        raise HTTPException(status_code=500, detail="Error al exportar reservas")
 
 
 @router.get('/proveedor/recurso/{recurso_id}', response_model=List[ReservaDetailResponse])
@@ -408,18 +1651,7 @@ def listar_reservas_por_recurso(
         if not recurso:
             raise HTTPException(status_code=404, detail="Recurso no encontrado")
         
-        query = session.query(
-            ReservaModel,
-            RecursoModel.nombre.label('recurso_nombre'),
-            ServicioModel.nombre.label('servicio_nombre'),
-            ClienteModel.nombre.label('cliente_nombre')
-        ).join(
-            RecursoModel, ReservaModel.recurso_id == RecursoModel.id
-        ).join(
-            ServicioModel, RecursoModel.servicio_id == ServicioModel.id
-        ).join(
-            ClienteModel, ReservaModel.cliente_id == ClienteModel.id
-        ).filter(
+        query = _consulta_detalle(session).filter(
             ReservaModel.recurso_id == recurso_id
         )
         
@@ -438,30 +1670,7 @@ def listar_reservas_por_recurso(
         
         resultados = query.order_by(ReservaModel.fecha_hora_inicio).all()
         
-        return [
-            ReservaDetailResponse(
-                id=r.ReservaModel.id,
-                cliente_id=r.ReservaModel.cliente_id,
-                recurso_id=r.ReservaModel.recurso_id,
-                fecha_hora_inicio=r.ReservaModel.fecha_hora_inicio,
-                fecha_hora_fin=r.ReservaModel.fecha_hora_fin,
-                duracion_minutos=r.ReservaModel.duracion_minutos,
-                estado=r.ReservaModel.estado,
-                precio_total=r.ReservaModel.precio_total,
-                seña=r.ReservaModel.seña,
-                saldo_pendiente=r.ReservaModel.saldo_pendiente,
-                pago_completo=r.ReservaModel.pago_completo,
-                pago_confirmado=r.ReservaModel.pago_confirmado,
-                metodo_pago=r.ReservaModel.metodo_pago,
-                notas_cliente=r.ReservaModel.notas_cliente,
-                notas_pago=r.ReservaModel.notas_pago,
-                created_at=r.ReservaModel.created_at,
-                recurso_nombre=r.recurso_nombre,
-                servicio_nombre=r.servicio_nombre,
-                cliente_nombre=r.cliente_nombre
-            )
-            for r in resultados
-        ]
+        return respuestas.lista(ReservaDetailResponse, _detalles(resultados))
         
     except HTTPException:
         raise
@@ -473,35 +1682,40 @@ def listar_reservas_por_recurso(
 @router.patch('/proveedor/{reserva_id}/confirmar', response_model=ReservaResponse)
 def confirmar_reserva_proveedor(
     reserva_id: int,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_proveedor),
     session: Session = Depends(get_session)
 ):
     """Confirma una reserva"""
+    version = _version_esperada(if_match)
+
     try:
-        from app.infrastructure.repositories.proveedor_repository import SQLAlchemyProveedorRepository
-        proveedor_repo = SQLAlchemyProveedorRepository(session)
-        proveedor = proveedor_repo.get_by_user_id(current_user.id)
-        
-        reserva = session.query(ReservaModel).join(
-            RecursoModel, ReservaModel.recurso_id == RecursoModel.id
-        ).join(
-            ServicioModel, RecursoModel.servicio_id == ServicioModel.id
-        ).filter(
-            ReservaModel.id == reserva_id,
-            ServicioModel.proveedor_id == proveedor.id
-        ).first()
-        
-        if not reserva:
-            raise HTTPException(status_code=404, detail="Reserva no encontrada")
-        
-        if reserva.estado != 'pendiente':
-            raise HTTPException(status_code=400, detail="Solo se pueden confirmar reservas pendientes")
-        
-        reserva.estado = 'confirmada'
+        from app.infrastructure.repositories.reserva_repository import SQLAlchemyReservaRepository
+        reserva_repo = SQLAlchemyReservaRepository(session)
+
+        fila = reserva_repo.actualizar_si(
+            reserva_id,
+            current_user.id,
+            'proveedor',
+            [ReservaModel.estado == 'pendiente'],
+            {'estado': 'confirmada'},
+            version,
+            incrementar_version_recurso=True
+        )
+
+        if fila is None:
+            reserva = _reserva_rechazada(reserva_repo, reserva_id, current_user.id, 'proveedor', version)
+
+            if reserva.estado != 'pendiente':
+                raise HTTPException(status_code=400, detail="Solo se pueden confirmar reservas pendientes")
+
+            raise HTTPException(status_code=409, detail=RESERVA_MODIFICADA)
+
         session.commit()
-        session.refresh(reserva)
+
+        notificar_cambio_reserva(fila['recurso_id'], fila['fecha_hora_inicio'], fila['fecha_hora_fin'])
         
-        return ReservaResponse.model_validate(reserva)
+        return ReservaResponse.model_validate(fila)
     except HTTPException:
         raise
     except Exception as e:
@@ -512,40 +1726,46 @@ def confirmar_reserva_proveedor(
 @router.patch('/proveedor/{reserva_id}/completar', response_model=ReservaResponse)
 def completar_reserva_proveedor(
     reserva_id: int,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_proveedor),
     session: Session = Depends(get_session)
 ):
     """Marca una reserva como completada"""
+    version = _version_esperada(if_match)
+
     try:
-        from app.infrastructure.repositories.proveedor_repository import SQLAlchemyProveedorRepository
-        proveedor_repo = SQLAlchemyProveedorRepository(session)
-        proveedor = proveedor_repo.get_by_user_id(current_user.id)
-        
-        reserva = session.query(ReservaModel).join(
-            RecursoModel, ReservaModel.recurso_id == RecursoModel.id
-        ).join(
-            ServicioModel, RecursoModel.servicio_id == ServicioModel.id
-        ).filter(
-            ReservaModel.id == reserva_id,
-            ServicioModel.proveedor_id == proveedor.id
-        ).first()
-        
-        if not reserva:
-            raise HTTPException(status_code=404, detail="Reserva no encontrada")
-        
-        if reserva.estado != 'confirmada':
-            raise HTTPException(status_code=400, detail="Solo se pueden completar reservas confirmadas")
-        
-        # Verificar que la fecha ya pasó
-        now = datetime.now(timezone.utc)
-        if reserva.fecha_hora_fin > now:
-            raise HTTPException(status_code=400, detail="La reserva aún no ha finalizado")
-        
-        reserva.estado = 'completada'
+        from app.infrastructure.repositories.reserva_repository import SQLAlchemyReservaRepository
+        reserva_repo = SQLAlchemyReservaRepository(session)
+
+        # Solo reservas confirmadas que ya terminaron
+        ahora = normalizar(datetime.now(timezone.utc))
+        fila = reserva_repo.actualizar_si(
+            reserva_id,
+            current_user.id,
+            'proveedor',
+            [ReservaModel.estado == 'confirmada', ReservaModel.fecha_hora_fin <= ahora],
+            {'estado': 'completada'},
+            version,
+            incrementar_version_recurso=True
+        )
+
+        if fila is None:
+            reserva = _reserva_rechazada(reserva_repo, reserva_id, current_user.id, 'proveedor', version)
+
+            if reserva.estado != 'confirmada':
+                raise HTTPException(status_code=400, detail="Solo se pueden completar reservas confirmadas")
+
+            if reserva.fecha_hora_fin > ahora:
+                raise HTTPException(status_code=400, detail="La reserva aún no ha finalizado")
+
+            raise HTTPException(status_code=409, detail=RESERVA_MODIFICADA)
+
         session.commit()
-        session.refresh(reserva)
+
+        indice_reservas.quitar(fila['recurso_id'], fila['id'])
+        notificar_cambio_reserva(fila['recurso_id'], fila['fecha_hora_inicio'], fila['fecha_hora_fin'])
         
-        return ReservaResponse.model_validate(reserva)
+        return ReservaResponse.model_validate(fila)
     except HTTPException:
         raise
     except Exception as e:
@@ -557,42 +1777,49 @@ def completar_reserva_proveedor(
 def marcar_no_asistio(
     reserva_id: int,
     data: MarcarNoAsistioSchema,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_proveedor),
     session: Session = Depends(get_session)
 ):
     """Marca que el cliente no asistió a la reserva"""
+    version = _version_esperada(if_match)
+
     try:
-        from app.infrastructure.repositories.proveedor_repository import SQLAlchemyProveedorRepository
-        proveedor_repo = SQLAlchemyProveedorRepository(session)
-        proveedor = proveedor_repo.get_by_user_id(current_user.id)
-        
-        reserva = session.query(ReservaModel).join(
-            RecursoModel, ReservaModel.recurso_id == RecursoModel.id
-        ).join(
-            ServicioModel, RecursoModel.servicio_id == ServicioModel.id
-        ).filter(
-            ReservaModel.id == reserva_id,
-            ServicioModel.proveedor_id == proveedor.id
-        ).first()
-        
-        if not reserva:
-            raise HTTPException(status_code=404, detail="Reserva no encontrada")
-        
-        if reserva.estado != 'confirmada':
-            raise HTTPException(status_code=400, detail="Solo reservas confirmadas")
-        
-        now = datetime.now(timezone.utc)
-        if reserva.fecha_hora_inicio > now:
-            raise HTTPException(status_code=400, detail="La reserva aún no ha pasado")
-        
-        reserva.estado = 'no_asistio'
+        from app.infrastructure.repositories.reserva_repository import SQLAlchemyReservaRepository
+        reserva_repo = SQLAlchemyReservaRepository(session)
+
+        ahora = normalizar(datetime.now(timezone.utc))
+        valores = {'estado': 'no_asistio'}
         if data.notas:
-            reserva.notas_internas = data.notas
-        
+            valores['notas_internas'] = data.notas
+
+        fila = reserva_repo.actualizar_si(
+            reserva_id,
+            current_user.id,
+            'proveedor',
+            [ReservaModel.estado == 'confirmada', ReservaModel.fecha_hora_inicio <= ahora],
+            valores,
+            version,
+            incrementar_version_recurso=True
+        )
+
+        if fila is None:
+            reserva = _reserva_rechazada(reserva_repo, reserva_id, current_user.id, 'proveedor', version)
+
+            if reserva.estado != 'confirmada':
+                raise HTTPException(status_code=400, detail="Solo reservas confirmadas")
+
+            if reserva.fecha_hora_inicio > ahora:
+                raise HTTPException(status_code=400, detail="La reserva aún no ha pasado")
+
+            raise HTTPException(status_code=409, detail=RESERVA_MODIFICADA)
+
         session.commit()
-        session.refresh(reserva)
+
+        indice_reservas.quitar(fila['recurso_id'], fila['id'])
+        notificar_cambio_reserva(fila['recurso_id'], fila['fecha_hora_inicio'], fila['fecha_hora_fin'])
         
-        return ReservaResponse.model_validate(reserva)
+        return ReservaResponse.model_validate(fila)
         
     except HTTPException:
         raise
@@ -605,37 +1832,146 @@ def marcar_no_asistio(
 def confirmar_pago_reserva(
     reserva_id: int,
     data: ConfirmarPagoSchema,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_proveedor),
     session: Session = Depends(get_session)
 ):
     """El proveedor confirma que recibió el pago"""
+    version = _version_esperada(if_match)
+
     try:
-        from app.infrastructure.repositories.proveedor_repository import SQLAlchemyProveedorRepository
-        proveedor_repo = SQLAlchemyProveedorRepository(session)
-        proveedor = proveedor_repo.get_by_user_id(current_user.id)
-        
-        reserva = session.query(ReservaModel).join(
-            RecursoModel, ReservaModel.recurso_id == RecursoModel.id
-        ).join(
-            ServicioModel, RecursoModel.servicio_id == ServicioModel.id
-        ).filter(
-            ReservaModel.id == reserva_id,
-            ServicioModel.proveedor_id == proveedor.id
-        ).first()
-        
-        if not reserva:
-            raise HTTPException(status_code=404, detail="Reserva no encontrada")
-        
-        reserva.pago_confirmado = data.pago_confirmado
-        reserva.notas_pago = data.notas_pago
-        
+        from app.infrastructure.repositories.reserva_repository import SQLAlchemyReservaRepository
+        reserva_repo = SQLAlchemyReservaRepository(session)
+
+        fila = reserva_repo.actualizar_si(
+            reserva_id,
+            current_user.id,
+            'proveedor',
+            [],
+            {'pago_confirmado': data.pago_confirmado, 'notas_pago': data.notas_pago},
+            version
+        )
+
+        if fila is None:
+            _reserva_rechazada(reserva_repo, reserva_id, current_user.id, 'proveedor', version)
+            raise HTTPException(status_code=409, detail=RESERVA_MODIFICADA)
+
         session.commit()
-        session.refresh(reserva)
         
-        return ReservaResponse.model_validate(reserva)
+        return ReservaResponse.model_validate(fila)
         
     except HTTPException:
         raise
     except Exception as e:
         session.rollback()
-        raise HTTPException(status_code=500, detail="Error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Error")
+
+
+def _motivo_rechazo_transicion(accion: str, fila: Dict, ahora: datetime) -> str:
+    """Por qué una reserva pedida no cambió de estado (según cómo estaba antes del UPDATE)"""
+    if fila['estado_previo'] is None:
+        return "Reserva no encontrada"
+
+    if fila['estado_previo'] != TRANSICIONES_PROVEEDOR[accion][0]:
+        if accion == 'confirmar':
+            return "Solo se pueden confirmar reservas pendientes"
+        if accion == 'completar':
+            return "Solo se pueden completar reservas confirmadas"
+        return "Solo reservas confirmadas"
+
+    if accion == 'completar' and fila['fecha_hora_fin'] > ahora:
+        return "La reserva aún no ha finalizado"
+
+    if accion == 'no_asistio' and fila['fecha_hora_inicio'] > ahora:
+        return "La reserva aún no ha pasado"
+
+    return RESERVA_MODIFICADA
+
+
+@router.patch('/proveedor/lote', response_model=TransicionLoteResponse)
+def transicionar_reservas_lote(
+    data: TransicionLoteSchema,
+    current_user: User = Depends(get_current_proveedor),
+    session: Session = Depends(get_session)
+):
+    """
+    Confirma, completa o marca como no asistidas muchas reservas a la vez
+    (Ej: el cierre del día). Se eligen por ids o por filtro (recurso, estado,
+    inicio desde, fin hasta) y se actualizan con un único UPDATE ... RETURNING
+    que verifica pertenencia y transición válida.
+
+    Con ids se informa el resultado de cada una; con filtro, las que cambiaron
+    (como mucho MAX_RESERVAS_TRANSICION_LOTE por llamada).
+    """
+    try:
+        from app.infrastructure.repositories.reserva_repository import SQLAlchemyReservaRepository
+
+        origen, destino = TRANSICIONES_PROVEEDOR[data.accion]
+        ahora = normalizar(datetime.now(timezone.utc))
+
+        condiciones = [ReservaModel.estado == origen]
+        if data.accion == 'completar':
+            condiciones.append(ReservaModel.fecha_hora_fin <= ahora)
+        if data.accion == 'no_asistio':
+            condiciones.append(ReservaModel.fecha_hora_inicio <= ahora)
+
+        valores = {'estado': destino}
+        if data.accion == 'no_asistio' and data.notas:
+            valores['notas_internas'] = data.notas
+
+        filtros = None
+        reserva_ids = None
+        if data.reserva_ids is not None:
+            reserva_ids = list(dict.fromkeys(data.reserva_ids))
+        else:
+            filtros = []
+            if data.filtro.recurso_id is not None:
+                filtros.append(ReservaModel.recurso_id == data.filtro.recurso_id)
+            if data.filtro.estado is not None:
+                filtros.append(ReservaModel.estado == data.filtro.estado)
+            if data.filtro.inicio_desde is not None:
+                filtros.append(ReservaModel.fecha_hora_inicio >= normalizar(data.filtro.inicio_desde))
+            if data.filtro.fin_hasta is not None:
+                filtros.append(ReservaModel.fecha_hora_fin <= normalizar(data.filtro.fin_hasta))
+
+        filas = SQLAlchemyReservaRepository(session).transicionar_lote(
+            current_user.id,
+            condiciones,
+            valores,
+            reserva_ids=reserva_ids,
+            filtros=filtros,
+            limite=MAX_RESERVAS_TRANSICION_LOTE
+        )
+
+        session.commit()
+
+        actualizadas = [f for f in filas if f['actualizada']]
+        for fila in actualizadas:
+            if destino != 'confirmada':
+                indice_reservas.quitar(fila['recurso_id'], fila['id'])
+            notificar_cambio_reserva(fila['recurso_id'], fila['fecha_hora_inicio'], fila['fecha_hora_fin'])
+
+        if reserva_ids is not None:
+            por_id = {f['id']: f for f in filas}
+            filas = [por_id[reserva_id] for reserva_id in reserva_ids]
+
+        return TransicionLoteResponse(
+            actualizadas=len(actualizadas),
+            resultados=[
+                ResultadoTransicionResponse(
+                    reserva_id=f['id'],
+                    actualizada=f['actualizada'],
+                    estado=f['estado'] if f['actualizada'] else f['estado_previo'],
+                    version=f['version'],
+                    motivo=None if f['actualizada'] else _motivo_rechazo_transicion(data.accion, f, ahora)
+                )
+                for f in filas
+            ]
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        session.rollback()
+        print(f"Error: {type(e).__name__}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error al actualizar las reservas")
@@ -10,6 +10,7 @@ from app.application.schemas.servicio_schemas import (
 )
 from app.application.schemas.recurso_schemas import RecursoResponse
 from app.infrastructure.db.database import get_session
+from app.api.v1 import respuestas
 from app.infrastructure.db.models.servicio_model import ServicioModel
 from app.infrastructure.db.models.recurso_model import RecursoModel
 from app.infrastructure.db.models.proveedor_model import ProveedorModel
@@ -99,7 +100,7 @@ def listar_mis_servicios(
                 recursos=[RecursoResponse.model_validate(r) for r in recursos]
             ))
         
-        return resultado
+        return respuestas.lista(ServicioWithRecursosResponse, resultado)
         
     except HTTPException:
         raise
@@ -128,7 +129,7 @@ def listar_proveedores(session: Session = Depends(get_session)):
             ServicioModel.is_active == True
         ).distinct().all()
         
-        return [
+        return respuestas.lista(dict, [
             {
                 "id": p.id,
                 "nombre": f"{p.nombre} {p.apellido}",
@@ -136,7 +137,7 @@ def listar_proveedores(session: Session = Depends(get_session)):
                 "biografia": p.biografia
             }
             for p in proveedores
-        ]
+        ])
         
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -155,7 +156,7 @@ def listar_servicios_proveedor(
             ServicioModel.is_active == True
         ).all()
         
-        return [ServicioResponse.model_validate(s) for s in servicios]
+        return respuestas.lista(ServicioResponse, servicios)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail="Error")
@@ -179,7 +180,7 @@ def buscar_servicios(
         
         servicios = query.all()
         
-        return [ServicioResponse.model_validate(s) for s in servicios]
+        return respuestas.lista(ServicioResponse, servicios)
         
     except Exception as e:
         print(f"Error: {type(e).__name__}: {str(e)}")
@@ -0,0 +1,46 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class BloqueoRecursoCreateSchema(BaseModel):
+    """Schema para bloquear un recurso (mantenimiento, evento privado, clausura)"""
+    recurso_id: int = Field(..., gt=0)
+    fecha_hora_inicio: datetime
+    fecha_hora_fin: datetime
+    motivo: Optional[str] = None
+    tipo: str = Field(default='mantenimiento', max_length=50)
+
+
+class BloqueoRecursoResponse(BaseModel):
+    """Schema de respuesta de bloqueo de recurso"""
+    id: int
+    recurso_id: int
+    fecha_hora_inicio: datetime
+    fecha_hora_fin: datetime
+    motivo: Optional[str]
+    tipo: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class BloqueoProveedorCreateSchema(BaseModel):
+    """Schema para bloquear todos los recursos del proveedor (vacaciones, feriados)"""
+    fecha_inicio: datetime
+    fecha_fin: datetime
+    motivo: Optional[str] = None
+
+
+class BloqueoProveedorResponse(BaseModel):
+    """Schema de respuesta de bloqueo del proveedor"""
+    id: int
+    proveedor_id: int
+    fecha_inicio: datetime
+    fecha_fin: datetime
+    motivo: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, field_validator
-from datetime import datetime, timezone, time
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from datetime import datetime, timezone, time, date
+from typing import Optional, List
 
 
 class ReservaCreateSchema(BaseModel):
@@ -9,6 +9,12 @@ class ReservaCreateSchema(BaseModel):
     fecha_hora_inicio: datetime
     duracion_minutos: int = Field(..., gt=0)
     notas_cliente: Optional[str] = None
+    seña: Optional[float] = Field(None, ge=0, description="Seña/adelanto pagado al reservar")
+    metodo_pago: Optional[str] = Field(
+        None,
+        pattern="^(efectivo|tarjeta|transferencia)$",
+        description="Método de pago: efectivo, tarjeta o transferencia"
+    )
     
     @field_validator('fecha_hora_inicio')
     @classmethod
@@ -26,6 +32,70 @@ class ReservaCreateSchema(BaseModel):
         
         return v
 
+# Máximo de reservas en un mismo lote
+MAX_RESERVAS_LOTE = 20
+
+
+class ReservaLoteCreateSchema(BaseModel):
+    """Schema para crear varias reservas a la vez (todas o ninguna)"""
+    reservas: List[ReservaCreateSchema] = Field(..., min_length=1, max_length=MAX_RESERVAS_LOTE)
+
+
+class ReservaSerieCreateSchema(BaseModel):
+    """Schema para reservar el mismo horario todas las semanas"""
+    recurso_id: int = Field(..., gt=0)
+    dia_semana: int = Field(..., ge=0, le=6, description="0=Lunes, 6=Domingo")
+    hora_inicio: time
+    duracion_minutos: int = Field(..., gt=0)
+    desde: date
+    cantidad: Optional[int] = Field(None, gt=0, le=52, description="Cantidad de semanas")
+    hasta: Optional[date] = Field(None, description="Última fecha posible (incluida)")
+    notas_cliente: Optional[str] = None
+    metodo_pago: Optional[str] = Field(
+        None,
+        pattern="^(efectivo|tarjeta|transferencia)$",
+        description="Método de pago: efectivo, tarjeta o transferencia"
+    )
+
+    @model_validator(mode='after')
+    def validate_fin_serie(self) -> 'ReservaSerieCreateSchema':
+        """La serie necesita una cantidad o una fecha final"""
+        if self.cantidad is None and self.hasta is None:
+            raise ValueError('Indique la cantidad de semanas o la fecha hasta')
+        if self.hasta is not None and self.hasta < self.desde:
+            raise ValueError("La fecha 'hasta' debe ser posterior o igual a 'desde'")
+        return self
+
+
+class RetencionCreateSchema(BaseModel):
+    """Schema para retener un horario mientras se completa el pago"""
+    recurso_id: int = Field(..., gt=0)
+    fecha_hora_inicio: datetime
+    duracion_minutos: int = Field(..., gt=0)
+
+    @field_validator('fecha_hora_inicio')
+    @classmethod
+    def validate_fecha_futura(cls, v: datetime) -> datetime:
+        """Valida que la fecha sea futura"""
+        if v.tzinfo is None:
+            v = v.replace(tzinfo=timezone.utc)
+
+        if v <= datetime.now(timezone.utc):
+            raise ValueError('La fecha de reserva debe ser futura')
+
+        return v
+
+
+class ConfirmarRetencionSchema(BaseModel):
+    """Schema para convertir una retención en reserva"""
+    notas_cliente: Optional[str] = None
+    seña: Optional[float] = Field(None, ge=0, description="Seña/adelanto pagado al reservar")
+    metodo_pago: Optional[str] = Field(
+        None,
+        pattern="^(efectivo|tarjeta|transferencia)$",
+        description="Método de pago: efectivo, tarjeta o transferencia"
+    )
+
 
 class ReservaResponse(BaseModel):
     """Schema de respuesta de reserva"""
@@ -41,6 +111,9 @@ class ReservaResponse(BaseModel):
     saldo_pendiente: Optional[float]
     pago_completo: bool
     notas_cliente: Optional[str]
+    serie_id: Optional[str] = None
+    # Para enviar en If-Match al modificarla
+    version: int
     created_at: datetime
 
     class Config:
@@ -62,6 +135,7 @@ class ReservaDetailResponse(BaseModel):
     saldo_pendiente: Optional[float]
     pago_completo: bool
     notas_cliente: Optional[str]
+    version: int
     created_at: datetime
     
     # Datos relacionados (nombres legibles)
@@ -96,6 +170,48 @@ class CancelarReservaSchema(BaseModel):
     )
 
 
+class ConfirmarPagoSchema(BaseModel):
+    """Schema para que el proveedor confirme un pago"""
+    pago_confirmado: bool
+    notas_pago: Optional[str] = None
+
+
+class MarcarNoAsistioSchema(BaseModel):
+    """Schema para marcar que el cliente no asistió"""
+    notas: Optional[str] = None
+
+
+# Máximo de reservas que cambia de estado una sola operación masiva
+MAX_RESERVAS_TRANSICION_LOTE = 200
+
+
+class FiltroReservasProveedorSchema(BaseModel):
+    """Selección por filtro (Ej: todas las confirmadas del recurso 3 que terminan antes de las 23:00)"""
+    recurso_id: Optional[int] = Field(None, gt=0)
+    estado: Optional[str] = Field(None, pattern="^(pendiente|confirmada)$")
+    inicio_desde: Optional[datetime] = None
+    fin_hasta: Optional[datetime] = None
+
+
+class TransicionLoteSchema(BaseModel):
+    """Schema para cambiar de estado muchas reservas del proveedor a la vez"""
+    accion: str = Field(
+        ...,
+        pattern="^(confirmar|completar|no_asistio)$",
+        description="confirmar, completar o no_asistio"
+    )
+    reserva_ids: Optional[List[int]] = Field(None, min_length=1, max_length=MAX_RESERVAS_TRANSICION_LOTE)
+    filtro: Optional[FiltroReservasProveedorSchema] = None
+    notas: Optional[str] = Field(None, description="Notas internas (solo para no_asistio)")
+
+    @model_validator(mode='after')
+    def validate_seleccion(self) -> 'TransicionLoteSchema':
+        """Se indican los ids o un filtro, no ambos"""
+        if (self.reserva_ids is None) == (self.filtro is None):
+            raise ValueError('Indique reserva_ids o filtro (uno de los dos)')
+        return self
+
+
 class DisponibilidadQuerySchema(BaseModel):
     """Schema para consultar disponibilidad"""
     recurso_id: int = Field(..., gt=0)
@@ -111,4 +227,87 @@ class DisponibilidadSlotResponse(BaseModel):
     reserva_id: Optional[int] = None  # Si está ocupado, ID de la reserva
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class DisponibilidadDiaResponse(BaseModel):
+    """Grilla de slots de un día dentro de una consulta por rango"""
+    fecha: date
+    slots: List[DisponibilidadSlotResponse]
+
+
+class RecursoDisponibilidadResponse(BaseModel):
+    """Grilla de slots de un recurso dentro de la disponibilidad de un servicio"""
+    recurso_id: int
+    recurso_nombre: str
+    slots: List[DisponibilidadSlotResponse]
+
+
+class HuecoLibreResponse(BaseModel):
+    """Hueco libre de una duración dada"""
+    fecha_hora_inicio: datetime
+    fecha_hora_fin: datetime
+    precio: Optional[float]
+
+
+class OcupacionResponse(BaseModel):
+    """Resumen de ocupación de un recurso en un rango de fechas"""
+    recurso_id: int
+    desde: date
+    hasta: date
+    minutos_abiertos: int
+    minutos_ocupados: int
+    minutos_libres: int
+    horas_libres: float
+
+
+class ProximoLibreResponse(BaseModel):
+    """Próximo hueco libre de un recurso"""
+    recurso_id: int
+    recurso_nombre: str
+    fecha_hora_inicio: datetime
+    fecha_hora_fin: datetime
+    precio: Optional[float]
+
+
+class OcurrenciaOmitidaResponse(BaseModel):
+    """Ocurrencia de una serie que no se pudo reservar"""
+    fecha_hora_inicio: datetime
+    motivo: str
+
+
+class ReservaSerieResponse(BaseModel):
+    """Resultado de crear una serie de reservas"""
+    serie_id: str
+    creadas: List[ReservaResponse]
+    omitidas: List[OcurrenciaOmitidaResponse]
+
+
+class RetencionResponse(BaseModel):
+    """Schema de respuesta de una retención"""
+    id: int
+    recurso_id: int
+    fecha_hora_inicio: datetime
+    fecha_hora_fin: datetime
+    duracion_minutos: int
+    precio_total: float
+    expira_en: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ResultadoTransicionResponse(BaseModel):
+    """Resultado del cambio de estado de una reserva dentro de una operación masiva"""
+    reserva_id: int
+    actualizada: bool
+    # Estado nuevo, o el que tenía si no cambió (None si no existe)
+    estado: Optional[str] = None
+    version: Optional[int] = None
+    motivo: Optional[str] = None
+
+
+class TransicionLoteResponse(BaseModel):
+    """Resultado de una operación masiva de cambio de estado"""
+    actualizadas: int
+    resultados: List[ResultadoTransicionResponse]
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
 import os
+from typing import Literal
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,6 +13,19 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
 
+    # Lock por recurso durante la verificación e inserción de una reserva:
+    # none (confía en la restricción de exclusión), advisory o for_update.
+    # Aun con none, las altas del mismo recurso se serializan hasta el commit
+    # en el UPDATE de recursos.version_disponibilidad; el lock solo adelanta
+    # esa espera a antes de la verificación
+    reserva_lock_mode: Literal["none", "advisory", "for_update"] = Field("none", validation_alias="RESERVA_LOCK_MODE")
+
+    # Minutos que un horario queda retenido mientras el cliente completa el pago
+    retencion_minutos: int = Field(10, validation_alias="RETENCION_MINUTOS")
+
+    # Listados serializados con orjson y validados una sola vez (requiere orjson)
+    respuestas_rapidas: bool = Field(False, validation_alias="RESPUESTAS_RAPIDAS")
+
     api_v1: str = "/api/v1"
     project_name: str = "Turnero"
 
@@ -0,0 +1,102 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+
+from app.domain.services.disponibilidad import Franja, Intervalo
+
+
+class DisponibilidadRepository(ABC):
+    """
+    Interface de lectura para calcular la disponibilidad de recursos
+    """
+
+    @abstractmethod
+    def get_franjas_semana(self, recurso_id: int) -> Dict[int, List[Franja]]:
+        """Obtiene las franjas activas de un recurso agrupadas por día de la semana"""
+        pass
+
+    @abstractmethod
+    def get_franjas_semana_recursos(self, recurso_ids: List[int]) -> Dict[int, Dict[int, List[Franja]]]:
+        """Obtiene las franjas activas de varios recursos, agrupadas por recurso y día"""
+        pass
+
+    @abstractmethod
+    def get_reservas_en_rango(self, recurso_id: int, desde: datetime, hasta: datetime) -> List[Intervalo]:
+        """Obtiene las reservas activas y retenciones vigentes que se solapan con [desde, hasta)"""
+        pass
+
+    @abstractmethod
+    def get_reservas_en_rango_recursos(
+        self,
+        recurso_ids: List[int],
+        desde: datetime,
+        hasta: datetime
+    ) -> Dict[int, List[Intervalo]]:
+        """Obtiene las reservas activas y retenciones vigentes de varios recursos, agrupadas por recurso"""
+        pass
+
+    @abstractmethod
+    def get_conflictos(
+        self,
+        rangos: List[Tuple[int, datetime, datetime]],
+        excluir_cliente_id: Optional[int] = None
+    ) -> Dict[int, List[Intervalo]]:
+        """
+        Reservas activas y retenciones vigentes que se solapan con alguno de los
+        rangos (recurso_id, inicio, fin), en una sola consulta. Las retenciones
+        de `excluir_cliente_id` no cuentan como conflicto.
+        """
+        pass
+
+    @abstractmethod
+    def get_bloqueos_recursos(
+        self,
+        recurso_ids: List[int],
+        desde: datetime,
+        hasta: datetime
+    ) -> Dict[int, List[Intervalo]]:
+        """Obtiene los bloqueos de varios recursos que se solapan con [desde, hasta), incluidos los de su proveedor"""
+        pass
+
+    @abstractmethod
+    def get_reservas_activas(self, recurso_id: int, desde: datetime) -> List[Intervalo]:
+        """Obtiene las reservas pendientes/confirmadas de un recurso que terminan después de `desde`"""
+        pass
+
+    @abstractmethod
+    def recurso_activo(self, recurso_id: int) -> bool:
+        """Indica si el recurso existe y está activo"""
+        pass
+
+    @abstractmethod
+    def get_version(self, recurso_id: int) -> Optional[int]:
+        """Obtiene la versión de disponibilidad de un recurso (None si no existe)"""
+        pass
+
+    @abstractmethod
+    def get_proximos_vencimientos(self, recurso_ids: List[int]) -> Dict[int, datetime]:
+        """
+        Próximo vencimiento de las retenciones vigentes de cada recurso (los
+        recursos sin retenciones vigentes no aparecen). Cuando una retención
+        vence deja de ocupar el horario sin que cambie la versión.
+        """
+        pass
+
+    @abstractmethod
+    def incrementar_version(self, recurso_id: int) -> None:
+        """
+        Incrementa la versión de disponibilidad dentro de la transacción actual.
+        Bloquea la fila del recurso hasta el commit: las escrituras que cambian
+        la disponibilidad de un mismo recurso quedan serializadas.
+        """
+        pass
+
+    @abstractmethod
+    def bloquear_recurso(self, recurso_id: int, modo: str) -> None:
+        """Toma un lock del recurso hasta el fin de la transacción ('none', 'advisory' o 'for_update')"""
+        pass
+
+    @abstractmethod
+    def purgar_retenciones_vencidas(self, ahora: datetime) -> Dict[int, List[Intervalo]]:
+        """Borra las retenciones vencidas y devuelve sus intervalos agrupados por recurso"""
+        pass
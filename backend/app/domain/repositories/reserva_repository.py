@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 
 from app.domain.entities.reserva import Reserva
@@ -38,4 +38,61 @@ class ReservaRepository(ABC):
     @abstractmethod
     def delete(self, reserva_id: int) -> None:
         """Elimina una reserva"""
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def crear_si_disponible(self, user_id: int, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Valida (cliente, recurso activo, solapamiento) e inserta la reserva en
+        una sola sentencia. Devuelve la fila insertada (id None si no se insertó)
+        junto con `cliente_encontrado`, `recurso_activo`, `hay_solapamiento` y
+        `hay_retencion`.
+        """
+        pass
+
+    @abstractmethod
+    def confirmar_retencion(self, retencion_id: int, user_id: int, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convierte una retención vigente del usuario en reserva, sin volver a
+        verificar disponibilidad. Devuelve la fila insertada y `precio_retencion`.
+        """
+        pass
+
+    @abstractmethod
+    def get_del_usuario(self, reserva_id: int, user_id: int, rol: str) -> Optional[Any]:
+        """Obtiene una reserva si pertenece al usuario ('cliente' o 'proveedor')"""
+        pass
+
+    @abstractmethod
+    def actualizar_si(
+        self,
+        reserva_id: int,
+        user_id: int,
+        rol: str,
+        condiciones: List[Any],
+        valores: Dict[str, Any],
+        version: Optional[int] = None,
+        incrementar_version_recurso: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Actualiza la reserva del usuario ('cliente' o 'proveedor') solo si se
+        cumplen las condiciones (y la versión, si se indica), incrementando su
+        versión. Devuelve la fila actualizada o None.
+        """
+        pass
+
+    @abstractmethod
+    def transicionar_lote(
+        self,
+        user_id: int,
+        condiciones: List[Any],
+        valores: Dict[str, Any],
+        reserva_ids: Optional[List[int]] = None,
+        filtros: Optional[List[Any]] = None,
+        limite: int = 200
+    ) -> List[Dict[str, Any]]:
+        """
+        Aplica el mismo cambio de estado a muchas reservas del proveedor del
+        usuario (por ids o por filtro) y devuelve el resultado de cada una
+        """
+        pass
@@ -0,0 +1,34 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Iterable, List
+
+from app.domain.services.disponibilidad import Intervalo, fusionar_intervalos, normalizar
+
+
+class BloqueosRecurso:
+    """
+    Bloqueos de un recurso (los propios y los de su proveedor) fusionados en
+    bloques disjuntos ordenados por inicio.
+
+    Como los bloques no se pisan, los fines también quedan ordenados: ver si
+    un intervalo está bloqueado o recortar los bloques de una ventana son dos
+    búsquedas binarias, sin importar cuán largo sea cada bloqueo.
+    """
+
+    def __init__(self, intervalos: Iterable[Intervalo]):
+        self.bloques: List[Intervalo] = fusionar_intervalos(intervalos)
+        self._inicios = [b.inicio for b in self.bloques]
+
+    def bloquea(self, inicio: datetime, fin: datetime) -> bool:
+        """Indica si [inicio, fin) se solapa con algún bloqueo"""
+        inicio, fin = normalizar(inicio), normalizar(fin)
+        pos = bisect_left(self._inicios, fin) - 1
+        return pos >= 0 and self.bloques[pos].fin > inicio
+
+    def en_rango(self, desde: datetime, hasta: datetime) -> List[Intervalo]:
+        """Bloques que se solapan con [desde, hasta)"""
+        desde, hasta = normalizar(desde), normalizar(hasta)
+        primero = bisect_right(self._inicios, desde) - 1
+        if primero < 0 or self.bloques[primero].fin <= desde:
+            primero += 1
+        return self.bloques[primero:bisect_left(self._inicios, hasta)]
@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from app.domain.services.plantilla_semanal import PlantillaSemanal
+
+# Máximo de días que se pueden consultar en una sola llamada de rango
+MAX_DIAS_RANGO = 31
+
+
+@dataclass(frozen=True)
+class Franja:
+    """
+    Franja horaria con precio de un recurso (Ej: Lunes 10:00-22:00 = $5000)
+    """
+    hora_inicio: time
+    hora_fin: time
+    precio: float
+    duracion_minutos: int
+
+
+@dataclass(frozen=True)
+class Intervalo:
+    """
+    Intervalo ocupado de un recurso (reserva activa o bloqueo)
+    """
+    inicio: datetime
+    fin: datetime
+    reserva_id: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Slot:
+    """
+    Slot reservable generado a partir de una franja
+    """
+    inicio: datetime
+    fin: datetime
+    precio: float
+    disponible: bool
+    reserva_id: Optional[int] = None
+
+
+def normalizar(dt: datetime) -> datetime:
+    """Lleva un datetime a UTC naive (así se guardan en la base)"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def fusionar_intervalos(intervalos: Iterable[Intervalo]) -> List[Intervalo]:
+    """
+    Ordena y fusiona los intervalos solapados en bloques disjuntos.
+    Cada bloque conserva el reserva_id del primer intervalo que lo tenga.
+    """
+    ordenados = sorted(
+        (Intervalo(normalizar(i.inicio), normalizar(i.fin), i.reserva_id) for i in intervalos),
+        key=lambda i: i.inicio
+    )
+
+    bloques: List[Intervalo] = []
+    for intervalo in ordenados:
+        if intervalo.fin <= intervalo.inicio:
+            continue
+        if bloques and intervalo.inicio < bloques[-1].fin:
+            ultimo = bloques[-1]
+            bloques[-1] = Intervalo(
+                inicio=ultimo.inicio,
+                fin=max(ultimo.fin, intervalo.fin),
+                reserva_id=ultimo.reserva_id if ultimo.reserva_id is not None else intervalo.reserva_id
+            )
+        else:
+            bloques.append(intervalo)
+    return bloques
+
+
+def marcar_ocupados(slots: Iterable[Slot], ocupados: Iterable[Intervalo]) -> List[Slot]:
+    """
+    Cruza los slots con los intervalos ocupados en un único barrido ordenado.
+
+    Los intervalos se fusionan en bloques disjuntos, así que tanto los inicios
+    como los fines quedan ordenados y alcanza con un puntero que solo avanza:
+    O((n + m) log(n + m)) por el ordenamiento, lineal el barrido.
+    """
+    bloques = fusionar_intervalos(ocupados)
+    resultado = []
+    k = 0
+
+    for slot in sorted(slots, key=lambda s: (s.inicio, s.fin)):
+        # Descartar los bloques que terminan antes de que empiece el slot
+        while k < len(bloques) and bloques[k].fin <= slot.inicio:
+            k += 1
+
+        if k < len(bloques) and bloques[k].inicio < slot.fin:
+            resultado.append(Slot(
+                inicio=slot.inicio,
+                fin=slot.fin,
+                precio=slot.precio,
+                disponible=False,
+                reserva_id=bloques[k].reserva_id
+            ))
+        else:
+            resultado.append(slot)
+
+    return resultado
+
+
+def calcular_slots(fecha: date, plantilla: "PlantillaSemanal", ocupados: Iterable[Intervalo]) -> List[Slot]:
+    """
+    Genera la grilla de slots de un día con su precio y si están libres
+    """
+    return marcar_ocupados(plantilla.slots_del_dia(fecha), ocupados)
+
+
+def calcular_slots_rango(
+    desde: date,
+    hasta: date,
+    plantilla: "PlantillaSemanal",
+    ocupados: Iterable[Intervalo]
+) -> Dict[date, List[Slot]]:
+    """
+    Genera la grilla de slots de cada día de [desde, hasta] (ambos incluidos).
+    Todos los días se cruzan con los intervalos ocupados en un único barrido.
+    """
+    dias = [desde + timedelta(days=i) for i in range((hasta - desde).days + 1)]
+
+    candidatos = []
+    for dia in dias:
+        candidatos.extend(plantilla.slots_del_dia(dia))
+
+    resultado: Dict[date, List[Slot]] = {dia: [] for dia in dias}
+    for slot in marcar_ocupados(candidatos, ocupados):
+        resultado[slot.inicio.date()].append(slot)
+    return resultado
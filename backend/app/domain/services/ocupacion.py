@@ -0,0 +1,188 @@
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.domain.services.disponibilidad import Intervalo, normalizar
+from app.domain.services.plantilla_semanal import PlantillaSemanal
+
+# Días que se cargan por tanda al buscar los próximos huecos libres
+DIAS_POR_TANDA = 7
+# Hasta cuántos días hacia adelante se busca
+MAX_HORIZONTE_DIAS = 62
+
+
+class MapaOcupacion:
+    """
+    Mapa de ocupación de un recurso sobre una ventana de tiempo, con un bit
+    por cuanto de `quantum_minutos`.
+
+    Los bitmaps son enteros de Python, así que marcar un intervalo o buscar
+    huecos son operaciones de bits sobre toda la ventana (sin recorrer
+    reservas ni cuantos uno por uno).
+
+    - `abierto`: cuantos completamente dentro de una franja horaria
+    - `ocupado`: cuantos que tocan una reserva o un bloqueo (redondeo hacia afuera)
+    - `grilla`: cuantos donde empieza un slot de la plantilla
+    """
+
+    def __init__(self, desde: datetime, hasta: datetime, quantum_minutos: int = 15):
+        if quantum_minutos <= 0:
+            raise ValueError("El cuanto debe ser positivo")
+        self.desde = normalizar(desde)
+        self.quantum = timedelta(minutes=quantum_minutos)
+        self.quantum_minutos = quantum_minutos
+        self.cuantos = -(-int((normalizar(hasta) - self.desde) / timedelta(minutes=1)) // quantum_minutos)
+        self.abierto = 0
+        self.ocupado = 0
+        self.grilla = 0
+
+    @classmethod
+    def construir(
+        cls,
+        desde: date,
+        hasta: date,
+        plantilla: PlantillaSemanal,
+        ocupados: Iterable[Intervalo],
+        quantum_minutos: int = 15
+    ) -> "MapaOcupacion":
+        """Construye el mapa de [desde, hasta] (días incluidos) a partir de la plantilla y los ocupados"""
+        inicio = datetime(desde.year, desde.month, desde.day)
+        mapa = cls(inicio, inicio + timedelta(days=(hasta - desde).days + 1), quantum_minutos)
+
+        dia = desde
+        while dia <= hasta:
+            for franja in plantilla.franjas_por_dia.get(dia.weekday(), []):
+                mapa.abrir(datetime.combine(dia, franja.hora_inicio), datetime.combine(dia, franja.hora_fin))
+            for slot in plantilla.slots_del_dia(dia):
+                mapa.marcar_inicio_grilla(slot.inicio)
+            dia += timedelta(days=1)
+
+        for intervalo in ocupados:
+            mapa.ocupar(intervalo.inicio, intervalo.fin)
+        return mapa
+
+    def _indice(self, dt: datetime, redondear_arriba: bool) -> int:
+        minutos = (normalizar(dt) - self.desde) / timedelta(minutes=1)
+        q = self.quantum_minutos
+        indice = int(-(-minutos // q)) if redondear_arriba else int(minutos // q)
+        return min(max(indice, 0), self.cuantos)
+
+    @staticmethod
+    def _mascara(a: int, b: int) -> int:
+        return ((1 << (b - a)) - 1) << a if b > a else 0
+
+    def abrir(self, inicio: datetime, fin: datetime) -> None:
+        self.abierto |= self._mascara(self._indice(inicio, True), self._indice(fin, False))
+
+    def ocupar(self, inicio: datetime, fin: datetime) -> None:
+        self.ocupado |= self._mascara(self._indice(inicio, False), self._indice(fin, True))
+
+    def marcar_inicio_grilla(self, inicio: datetime) -> None:
+        """Marca un inicio de slot de la grilla (solo si cae justo en un cuanto)"""
+        minutos = (normalizar(inicio) - self.desde) / timedelta(minutes=1)
+        if minutos % self.quantum_minutos == 0 and 0 <= minutos < self.cuantos * self.quantum_minutos:
+            self.grilla |= 1 << int(minutos // self.quantum_minutos)
+
+    @property
+    def libres(self) -> int:
+        return self.abierto & ~self.ocupado
+
+    def esta_libre(self, inicio: datetime, fin: datetime) -> bool:
+        """Indica si [inicio, fin) está abierto y sin ocupar"""
+        mascara = self._mascara(self._indice(inicio, False), self._indice(fin, True))
+        return mascara != 0 and self.libres & mascara == mascara
+
+    def inicios_libres(self, duracion_minutos: int) -> int:
+        """
+        Bitmap de los cuantos donde empieza un hueco libre de `duracion_minutos`.
+        El bit i queda en 1 si los cuantos i .. i+k-1 están libres; se calcula
+        con O(log k) AND/shift duplicando el largo del tramo en cada paso.
+        """
+        k = -(-duracion_minutos // self.quantum_minutos)
+        tramo = self.libres
+        largo = 1
+        while largo < k:
+            paso = min(largo, k - largo)
+            tramo &= tramo >> paso
+            largo += paso
+        return tramo
+
+    def huecos_libres(
+        self,
+        duracion_minutos: int,
+        despues_de: Optional[datetime] = None,
+        en_grilla: bool = False
+    ) -> List[datetime]:
+        """
+        Inicios posibles de un hueco libre de la duración dada, en orden.
+        Con `en_grilla` solo se consideran los inicios de slot de la plantilla.
+        """
+        inicios = self.inicios_libres(duracion_minutos)
+        if en_grilla:
+            inicios &= self.grilla
+        if despues_de is not None:
+            inicios &= ~((1 << self._indice(despues_de, True)) - 1)
+
+        resultado = []
+        while inicios:
+            bit = inicios & -inicios
+            resultado.append(self.desde + self.quantum * (bit.bit_length() - 1))
+            inicios ^= bit
+        return resultado
+
+    def primer_hueco_libre(self, duracion_minutos: int, despues_de: Optional[datetime] = None) -> Optional[datetime]:
+        """Primer inicio libre de la duración dada a partir de `despues_de`"""
+        inicios = self.inicios_libres(duracion_minutos)
+        if despues_de is not None:
+            inicios &= ~((1 << self._indice(despues_de, True)) - 1)
+        if not inicios:
+            return None
+        return self.desde + self.quantum * ((inicios & -inicios).bit_length() - 1)
+
+    def minutos_abiertos(self) -> int:
+        return self.abierto.bit_count() * self.quantum_minutos
+
+    def minutos_libres(self) -> int:
+        return self.libres.bit_count() * self.quantum_minutos
+
+
+def buscar_proximos_libres(
+    plantillas: Dict[int, PlantillaSemanal],
+    cargar_ocupados: Callable[[datetime, datetime], Dict[int, List[Intervalo]]],
+    desde: datetime,
+    duracion_minutos: int,
+    cantidad: int,
+    horizonte_dias: int = MAX_HORIZONTE_DIAS,
+    quantum_minutos: int = 15
+) -> List[Tuple[datetime, int]]:
+    """
+    Busca los `cantidad` primeros huecos libres (inicio, recurso_id) de
+    `duracion_minutos` que empiezan en un slot de la grilla, a partir de `desde`.
+
+    Avanza en tandas de DIAS_POR_TANDA días: por cada tanda se llama una sola
+    vez a `cargar_ocupados(inicio, fin)` para todos los recursos y se corta
+    apenas se juntan suficientes resultados.
+    """
+    desde = normalizar(desde)
+    limite = desde.date() + timedelta(days=horizonte_dias)
+    resultados: List[Tuple[datetime, int]] = []
+
+    dia = desde.date()
+    while len(resultados) < cantidad and dia <= limite:
+        fin_tanda = min(dia + timedelta(days=DIAS_POR_TANDA - 1), limite)
+        ocupados = cargar_ocupados(
+            datetime(dia.year, dia.month, dia.day),
+            datetime(fin_tanda.year, fin_tanda.month, fin_tanda.day) + timedelta(days=1)
+        )
+
+        candidatos = []
+        for recurso_id, plantilla in plantillas.items():
+            mapa = MapaOcupacion.construir(dia, fin_tanda, plantilla, ocupados.get(recurso_id, []), quantum_minutos)
+            huecos = mapa.huecos_libres(duracion_minutos, despues_de=desde, en_grilla=True)
+            candidatos.extend((inicio, recurso_id) for inicio in huecos[:cantidad])
+
+        # Todo lo de esta tanda es anterior a la siguiente
+        candidatos.sort()
+        resultados.extend(candidatos[:cantidad - len(resultados)])
+        dia = fin_tanda + timedelta(days=1)
+
+    return resultados
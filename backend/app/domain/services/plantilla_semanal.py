@@ -0,0 +1,160 @@
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.domain.services.disponibilidad import Franja, Slot, normalizar
+
+MINUTOS_DIA = 24 * 60
+MINUTOS_SEMANA = 7 * MINUTOS_DIA
+
+
+def minuto_de_semana(dt: datetime) -> int:
+    """Minuto de la semana (0 = Lunes 00:00) de un datetime"""
+    dt = normalizar(dt)
+    return dt.weekday() * MINUTOS_DIA + dt.hour * 60 + dt.minute
+
+
+class PlantillaSemanal:
+    """
+    Horarios activos de un recurso compilados a una estructura por minuto
+    de la semana.
+
+    - `_banda[m]` es el índice (+1) en `_precios` de la franja que cubre el
+      minuto m, o 0 si el recurso está cerrado. Buscar un precio es indexar.
+    - `_slots[dia]` tiene los límites (minuto inicio, minuto fin, precio) de
+      los slots de cada día, ya expandidos según `duracion_minutos`.
+    - `_abierto` es un bitmap (un bit por minuto) de los minutos cubiertos
+      por alguna franja, para validar intervalos completos con una máscara.
+    - `_acumulado[m]` es la suma de la tarifa por minuto (precio de la franja
+      / su `duracion_minutos`) de los minutos 0 .. m-1. El precio de cualquier
+      intervalo, aunque cruce varias franjas, es una resta.
+
+    Si dos franjas se pisan, gana la que empieza antes. Las franjas con
+    hora_fin <= hora_inicio se ignoran.
+    """
+
+    def __init__(self, franjas_por_dia: Dict[int, List[Franja]]):
+        self.franjas_por_dia = {dia: list(franjas) for dia, franjas in franjas_por_dia.items()}
+        self._precios: List[float] = []
+        self._tarifas: List[float] = []
+        self._banda = array('H', bytes(2 * MINUTOS_SEMANA))
+        self._slots: Dict[int, List[Tuple[int, int, float]]] = {}
+        self._abierto = 0
+
+        for dia, franjas in self.franjas_por_dia.items():
+            slots = []
+            for franja in sorted(franjas, key=lambda f: (f.hora_inicio, f.hora_fin)):
+                inicio = franja.hora_inicio.hour * 60 + franja.hora_inicio.minute
+                fin = franja.hora_fin.hour * 60 + franja.hora_fin.minute
+                if fin <= inicio:
+                    # Franja invertida o vacía (datos viejos): no abre ningún minuto
+                    continue
+
+                self._precios.append(franja.precio)
+                self._tarifas.append(franja.precio / franja.duracion_minutos)
+                banda = len(self._precios)
+                base = dia * MINUTOS_DIA
+                self._abierto |= ((1 << (fin - inicio)) - 1) << (base + inicio)
+                for m in range(base + inicio, base + fin):
+                    if self._banda[m] == 0:
+                        self._banda[m] = banda
+
+                m = inicio
+                while m + franja.duracion_minutos <= fin:
+                    slots.append((m, m + franja.duracion_minutos))
+                    m += franja.duracion_minutos
+
+            slots.sort()
+            self._slots[dia] = slots
+
+        self._acumulado = array('d', bytes(8 * (MINUTOS_SEMANA + 1)))
+        total = 0.0
+        for m in range(MINUTOS_SEMANA):
+            banda = self._banda[m]
+            if banda:
+                total += self._tarifas[banda - 1]
+            self._acumulado[m + 1] = total
+
+        # El precio de cada slot sale de la misma tabla (si las franjas se pisan
+        # puede no ser el precio de la franja que lo generó)
+        self._slots = {
+            dia: [(inicio, fin, self._tarifa(dia * MINUTOS_DIA + inicio, fin - inicio)) for inicio, fin in slots]
+            for dia, slots in self._slots.items()
+        }
+
+    def _tarifa(self, desde: int, largo: int) -> float:
+        """Suma de la tarifa por minuto de [desde, desde + largo) en minutos de la semana (puede dar la vuelta)"""
+        hasta = desde + largo
+        if hasta <= MINUTOS_SEMANA:
+            total = self._acumulado[hasta] - self._acumulado[desde]
+        else:
+            total = self._acumulado[MINUTOS_SEMANA] - self._acumulado[desde] + self._acumulado[hasta - MINUTOS_SEMANA]
+        return round(total, 2)
+
+    def precio_en(self, dt: datetime) -> Optional[float]:
+        """Precio de la franja que contiene al instante dado, o None si está cerrado"""
+        banda = self._banda[minuto_de_semana(dt)]
+        return self._precios[banda - 1] if banda else None
+
+    def precio_entre(self, inicio: datetime, fin: datetime) -> Optional[float]:
+        """
+        Precio de [inicio, fin) prorrateado por minuto entre las franjas que
+        cruza (Ej: 18:00-20:00 cobra una hora a $5000 y otra a $8000).
+        None si algún minuto del intervalo está cerrado.
+        """
+        if not self.abierto_entre(inicio, fin):
+            return None
+        largo = int((normalizar(fin) - normalizar(inicio)) / timedelta(minutes=1))
+        return self._tarifa(minuto_de_semana(inicio), largo)
+
+    def precios_entre(self, inicios: Sequence[datetime], duracion_minutos: int) -> List[Optional[float]]:
+        """
+        Precio de muchos intervalos de la misma duración en una sola llamada
+        (None para los que no caen completos dentro del horario).
+
+        Los minutos donde puede empezar un intervalo abierto se calculan una
+        sola vez como bitmap (AND/shift duplicando el largo, como en
+        MapaOcupacion); después cada inicio es un test de bit y una resta.
+        """
+        if duracion_minutos <= 0 or duracion_minutos > MINUTOS_SEMANA:
+            return [None] * len(inicios)
+
+        # Dos semanas seguidas para que los intervalos puedan dar la vuelta
+        tramo = self._abierto | (self._abierto << MINUTOS_SEMANA)
+        largo = 1
+        while largo < duracion_minutos:
+            paso = min(largo, duracion_minutos - largo)
+            tramo &= tramo >> paso
+            largo += paso
+
+        precios: List[Optional[float]] = []
+        for inicio in inicios:
+            m = minuto_de_semana(inicio)
+            precios.append(self._tarifa(m, duracion_minutos) if (tramo >> m) & 1 else None)
+        return precios
+
+    def abierto_entre(self, inicio: datetime, fin: datetime) -> bool:
+        """Indica si todo [inicio, fin) cae dentro de franjas horarias (contiguas)"""
+        desde = minuto_de_semana(inicio)
+        largo = int((normalizar(fin) - normalizar(inicio)) / timedelta(minutes=1))
+        if largo <= 0 or largo > MINUTOS_SEMANA:
+            return False
+
+        # Rotar el bitmap para que el intervalo no cruce el fin de la semana
+        semana = (1 << MINUTOS_SEMANA) - 1
+        rotado = ((self._abierto >> desde) | (self._abierto << (MINUTOS_SEMANA - desde))) & semana
+        mascara = (1 << largo) - 1
+        return rotado & mascara == mascara
+
+    def slots_del_dia(self, fecha: date) -> List[Slot]:
+        """Slots (todos libres) de una fecha según la plantilla"""
+        medianoche = datetime(fecha.year, fecha.month, fecha.day)
+        return [
+            Slot(
+                inicio=medianoche + timedelta(minutes=inicio),
+                fin=medianoche + timedelta(minutes=fin),
+                precio=precio,
+                disponible=True
+            )
+            for inicio, fin, precio in self._slots.get(fecha.weekday(), [])
+        ]
@@ -0,0 +1,27 @@
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+
+# Máximo de ocurrencias que genera una serie
+MAX_OCURRENCIAS_SERIE = 52
+
+
+def expandir_semanal(
+    dia_semana: int,
+    hora_inicio: time,
+    desde: date,
+    cantidad: Optional[int] = None,
+    hasta: Optional[date] = None
+) -> List[datetime]:
+    """
+    Inicios de una regla semanal (Ej: martes 20:00) a partir de `desde`.
+    Termina al llegar a `cantidad` ocurrencias o al pasar `hasta` (incluido),
+    lo que ocurra primero, y nunca genera más de MAX_OCURRENCIAS_SERIE.
+    """
+    limite = min(cantidad or MAX_OCURRENCIAS_SERIE, MAX_OCURRENCIAS_SERIE)
+    dia = desde + timedelta(days=(dia_semana - desde.weekday()) % 7)
+
+    inicios = []
+    while len(inicios) < limite and (hasta is None or dia <= hasta):
+        inicios.append(datetime.combine(dia, hora_inicio))
+        dia += timedelta(weeks=1)
+    return inicios
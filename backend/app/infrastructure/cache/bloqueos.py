@@ -0,0 +1,111 @@
+import threading
+import time as _time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.domain.services.bloqueos import BloqueosRecurso
+from app.domain.services.disponibilidad import Intervalo, normalizar
+from app.domain.services.ocupacion import MAX_HORIZONTE_DIAS
+
+CargarBloqueos = Callable[[List[int], datetime, datetime], Dict[int, List[Intervalo]]]
+
+
+class BloqueosCache:
+    """
+    Cache en memoria de los bloqueos fusionados de cada recurso.
+
+    Se invalida explícitamente cuando /bloqueos modifica un recurso o su
+    proveedor. El TTL solo cubre los cambios hechos desde otros procesos.
+    Como en PlantillasCache, una carga que empezó antes de una invalidación
+    no guarda su resultado y cada entrada recuerda la version_disponibilidad
+    con la que se cargó.
+
+    Cada entrada recuerda también la ventana [desde, hasta) que se cargó y
+    solo sirve para consultas dentro de esa ventana. Para que las consultas
+    habituales acierten, una ventana que toca el horizonte de reservas (de
+    ayer a MAX_HORIZONTE_DIAS) se amplía a todo el horizonte al cargarla.
+    """
+
+    def __init__(self, ttl_segundos: float = 120.0, horizonte_dias: int = MAX_HORIZONTE_DIAS):
+        self._ttl = ttl_segundos
+        self._horizonte_dias = horizonte_dias
+        self._lock = threading.Lock()
+        self._bloqueos: Dict[int, Tuple[float, Optional[int], datetime, datetime, BloqueosRecurso]] = {}
+        self._generaciones: Dict[int, int] = {}
+
+    def obtener(
+        self,
+        recurso_id: int,
+        desde: datetime,
+        hasta: datetime,
+        cargar: CargarBloqueos,
+        version: Optional[int] = None
+    ) -> BloqueosRecurso:
+        """Devuelve los bloqueos del recurso que tocan [desde, hasta), cargándolos con `cargar` si hace falta"""
+        return self.obtener_varias([recurso_id], desde, hasta, cargar, {recurso_id: version})[recurso_id]
+
+    def obtener_varias(
+        self,
+        recurso_ids: List[int],
+        desde: datetime,
+        hasta: datetime,
+        cargar: CargarBloqueos,
+        versiones: Optional[Dict[int, Optional[int]]] = None
+    ) -> Dict[int, BloqueosRecurso]:
+        """
+        Devuelve los bloqueos de varios recursos que tocan [desde, hasta),
+        cargando los faltantes en una sola llamada. Con `versiones` también
+        se recargan las entradas que se cargaron con otra
+        version_disponibilidad.
+        """
+        ahora = _time.monotonic()
+        desde, hasta = normalizar(desde), normalizar(hasta)
+        versiones = versiones or {}
+        resultado: Dict[int, BloqueosRecurso] = {}
+        faltantes = []
+
+        with self._lock:
+            for recurso_id in recurso_ids:
+                entrada = self._bloqueos.get(recurso_id)
+                version = versiones.get(recurso_id)
+                if (
+                    entrada is not None
+                    and ahora - entrada[0] <= self._ttl
+                    and (version is None or entrada[1] == version)
+                    and entrada[2] <= desde
+                    and hasta <= entrada[3]
+                ):
+                    resultado[recurso_id] = entrada[4]
+                else:
+                    faltantes.append(recurso_id)
+            generaciones = {recurso_id: self._generaciones.get(recurso_id, 0) for recurso_id in faltantes}
+
+        if faltantes:
+            carga_desde, carga_hasta = self._ventana_de_carga(desde, hasta)
+            intervalos = cargar(faltantes, carga_desde, carga_hasta)
+            with self._lock:
+                for recurso_id in faltantes:
+                    bloqueos = BloqueosRecurso(intervalos.get(recurso_id, []))
+                    if self._generaciones.get(recurso_id, 0) == generaciones[recurso_id]:
+                        self._bloqueos[recurso_id] = (
+                            ahora, versiones.get(recurso_id), carga_desde, carga_hasta, bloqueos
+                        )
+                    resultado[recurso_id] = bloqueos
+
+        return resultado
+
+    def invalidar(self, recurso_id: int) -> None:
+        with self._lock:
+            self._generaciones[recurso_id] = self._generaciones.get(recurso_id, 0) + 1
+            self._bloqueos.pop(recurso_id, None)
+
+    def _ventana_de_carga(self, desde: datetime, hasta: datetime) -> Tuple[datetime, datetime]:
+        hoy = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        horizonte_desde = hoy - timedelta(days=1)
+        horizonte_hasta = hoy + timedelta(days=self._horizonte_dias + 1)
+        if desde < horizonte_hasta and hasta > horizonte_desde:
+            return min(desde, horizonte_desde), max(hasta, horizonte_hasta)
+        return desde, hasta
+
+
+bloqueos_recursos = BloqueosCache()
@@ -0,0 +1,117 @@
+import threading
+import time as _time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.domain.services.disponibilidad import Slot, normalizar
+
+
+class DisponibilidadCache:
+    """
+    Cache LRU con TTL de la grilla de slots calculada por (recurso_id, fecha).
+
+    Se invalida exactamente cuando cambia algo que afecta a esa fecha: una
+    reserva que la toca (alta, cancelación o cambio de estado) o los
+    horarios/bloqueos del recurso. Cada recurso tiene un número de
+    generación que se incrementa al invalidar, así un cálculo que empezó
+    antes de una escritura no puede guardar un resultado viejo.
+
+    Las invalidaciones solo llegan al proceso que hizo la escritura: cada
+    entrada guarda además la version_disponibilidad del recurso con la que
+    se calculó, y `obtener` con la versión recién leída de la base descarta
+    las entradas de otra versión (escrituras hechas por otros procesos).
+
+    Una retención que vence libera su horario sin cambiar la versión, así que
+    la entrada guarda también el próximo vencimiento de las retenciones del
+    recurso (`vence`) y solo sirve mientras siga siendo el mismo.
+    """
+
+    def __init__(self, max_entradas: int = 4096, ttl_segundos: float = 60.0):
+        self._max = max_entradas
+        self._ttl = ttl_segundos
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[Tuple[int, date], Tuple[float, Optional[int], Optional[datetime], Tuple[Slot, ...]]]" = OrderedDict()
+        self._fechas: Dict[int, Set[date]] = {}
+        self._generaciones: Dict[int, int] = {}
+
+    def generacion(self, recurso_id: int) -> int:
+        with self._lock:
+            return self._generaciones.get(recurso_id, 0)
+
+    def obtener(
+        self,
+        recurso_id: int,
+        fecha: date,
+        version: Optional[int] = None,
+        vence: Optional[datetime] = None
+    ) -> Optional[List[Slot]]:
+        """
+        Devuelve la grilla guardada; con `version`, solo si se calculó con esa
+        versión y ese próximo vencimiento de retenciones
+        """
+        clave = (recurso_id, fecha)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            if (
+                _time.monotonic() - entrada[0] > self._ttl
+                or (version is not None and (entrada[1], entrada[2]) != (version, vence))
+            ):
+                self._quitar(clave)
+                return None
+            self._entradas.move_to_end(clave)
+            return list(entrada[3])
+
+    def guardar(
+        self,
+        recurso_id: int,
+        fecha: date,
+        slots: List[Slot],
+        generacion: int,
+        version: Optional[int] = None,
+        vence: Optional[datetime] = None
+    ) -> None:
+        """
+        Guarda la grilla (calculada con `version`, válida hasta `vence`) si no
+        hubo invalidaciones desde `generacion`
+        """
+        clave = (recurso_id, fecha)
+        with self._lock:
+            if self._generaciones.get(recurso_id, 0) != generacion:
+                return
+            self._entradas[clave] = (_time.monotonic(), version, vence, tuple(slots))
+            self._entradas.move_to_end(clave)
+            self._fechas.setdefault(recurso_id, set()).add(fecha)
+            while len(self._entradas) > self._max:
+                self._quitar(next(iter(self._entradas)))
+
+    def invalidar_intervalo(self, recurso_id: int, inicio: datetime, fin: datetime) -> None:
+        """Invalida las fechas que toca [inicio, fin) de un recurso"""
+        inicio, fin = normalizar(inicio), normalizar(fin)
+        dia = inicio.date()
+        ultimo = (fin - timedelta(microseconds=1)).date() if fin > inicio else dia
+        with self._lock:
+            self._generaciones[recurso_id] = self._generaciones.get(recurso_id, 0) + 1
+            while dia <= ultimo:
+                self._quitar((recurso_id, dia))
+                dia += timedelta(days=1)
+
+    def invalidar_recurso(self, recurso_id: int) -> None:
+        """Invalida todas las fechas de un recurso"""
+        with self._lock:
+            self._generaciones[recurso_id] = self._generaciones.get(recurso_id, 0) + 1
+            for fecha in list(self._fechas.get(recurso_id, ())):
+                self._quitar((recurso_id, fecha))
+
+    def _quitar(self, clave: Tuple[int, date]) -> None:
+        if self._entradas.pop(clave, None) is not None:
+            fechas = self._fechas.get(clave[0])
+            if fechas is not None:
+                fechas.discard(clave[1])
+                if not fechas:
+                    del self._fechas[clave[0]]
+
+
+disponibilidad_cache = DisponibilidadCache()
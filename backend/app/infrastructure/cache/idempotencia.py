@@ -0,0 +1,78 @@
+import threading
+import time as _time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional
+
+
+class ClaveEnCurso(Exception):
+    """Ya hay una petición con esa clave procesándose"""
+
+
+class ClaveReutilizada(Exception):
+    """La clave ya se usó con otro cuerpo de petición"""
+
+
+@dataclass
+class RespuestaGuardada:
+    huella: str
+    creada_en: float
+    status_code: Optional[int] = None  # None mientras la petición original está en curso
+    cuerpo: Any = None
+
+
+class IdempotenciaStore:
+    """
+    Guarda en memoria la primera respuesta exitosa de cada Idempotency-Key
+    durante `ttl_segundos`, para devolverla tal cual en los reintentos.
+
+    Acotado a `max_entradas` (se descartan las más viejas). Las peticiones
+    que fallan liberan la clave para que el cliente pueda reintentar.
+    """
+
+    def __init__(self, max_entradas: int = 10000, ttl_segundos: float = 24 * 3600.0):
+        self._max = max_entradas
+        self._ttl = ttl_segundos
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[Hashable, RespuestaGuardada]" = OrderedDict()
+
+    def iniciar(self, clave: Hashable, huella: str) -> Optional[RespuestaGuardada]:
+        """
+        Devuelve la respuesta guardada si la clave ya se completó. Si no, la
+        marca como en curso y devuelve None.
+        """
+        ahora = _time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and ahora - entrada.creada_en > self._ttl:
+                del self._entradas[clave]
+                entrada = None
+
+            if entrada is not None:
+                if entrada.huella != huella:
+                    raise ClaveReutilizada()
+                if entrada.status_code is None:
+                    raise ClaveEnCurso()
+                return entrada
+
+            self._entradas[clave] = RespuestaGuardada(huella=huella, creada_en=ahora)
+            while len(self._entradas) > self._max:
+                self._entradas.popitem(last=False)
+            return None
+
+    def completar(self, clave: Hashable, status_code: int, cuerpo: Any) -> None:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                entrada.status_code = status_code
+                entrada.cuerpo = cuerpo
+
+    def liberar(self, clave: Hashable) -> None:
+        """Olvida una clave en curso (la petición original falló)"""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada.status_code is None:
+                del self._entradas[clave]
+
+
+idempotencia = IdempotenciaStore()
@@ -0,0 +1,101 @@
+import threading
+import time as _time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from app.domain.services.disponibilidad import Intervalo, normalizar
+
+
+@dataclass
+class _IndiceRecurso:
+    cargado_en: float
+    inicios: List[datetime] = field(default_factory=list)
+    intervalos: List[Intervalo] = field(default_factory=list)
+
+
+class IndiceReservas:
+    """
+    Índice en memoria de las reservas activas (pendientes/confirmadas) futuras
+    de cada recurso, como arrays ordenados por inicio.
+
+    Sirve para rechazar conflictos obvios sin ir a la base; la verificación
+    autoritativa sigue siendo la consulta de solapamiento en la base. Las
+    reservas activas de un recurso no se solapan entre sí, así que alcanza
+    con mirar el último intervalo que empieza antes del fin pedido.
+
+    Cada recurso se recarga pasados `ttl_segundos`, para no arrastrar
+    cambios hechos por otros procesos.
+    """
+
+    def __init__(self, ttl_segundos: float = 60.0):
+        self._ttl = ttl_segundos
+        self._lock = threading.Lock()
+        self._recursos: Dict[int, _IndiceRecurso] = {}
+
+    def _vigente(self, recurso_id: int) -> Optional[_IndiceRecurso]:
+        indice = self._recursos.get(recurso_id)
+        if indice is None or _time.monotonic() - indice.cargado_en > self._ttl:
+            return None
+        return indice
+
+    def esta_cargado(self, recurso_id: int) -> bool:
+        with self._lock:
+            return self._vigente(recurso_id) is not None
+
+    def cargar(self, recurso_id: int, intervalos: Iterable[Intervalo]) -> None:
+        """Reemplaza el índice de un recurso con las reservas dadas"""
+        ordenados = sorted(
+            (Intervalo(normalizar(i.inicio), normalizar(i.fin), i.reserva_id) for i in intervalos),
+            key=lambda i: i.inicio
+        )
+        with self._lock:
+            self._recursos[recurso_id] = _IndiceRecurso(
+                cargado_en=_time.monotonic(),
+                inicios=[i.inicio for i in ordenados],
+                intervalos=ordenados
+            )
+
+    def hay_conflicto(self, recurso_id: int, inicio: datetime, fin: datetime) -> Optional[bool]:
+        """
+        Indica si [inicio, fin) se solapa con una reserva del índice.
+        Devuelve None si el recurso no está cargado (hay que ir a la base).
+        """
+        inicio, fin = normalizar(inicio), normalizar(fin)
+        with self._lock:
+            indice = self._vigente(recurso_id)
+            if indice is None:
+                return None
+            pos = bisect_left(indice.inicios, fin) - 1
+            return pos >= 0 and indice.intervalos[pos].fin > inicio
+
+    def agregar(self, recurso_id: int, intervalo: Intervalo) -> None:
+        """Agrega una reserva nueva si el recurso ya está indexado"""
+        intervalo = Intervalo(normalizar(intervalo.inicio), normalizar(intervalo.fin), intervalo.reserva_id)
+        with self._lock:
+            indice = self._recursos.get(recurso_id)
+            if indice is None:
+                return
+            pos = bisect_left(indice.inicios, intervalo.inicio)
+            indice.inicios.insert(pos, intervalo.inicio)
+            indice.intervalos.insert(pos, intervalo)
+
+    def quitar(self, recurso_id: int, reserva_id: int) -> None:
+        """Quita una reserva que dejó de estar activa (cancelada, completada, etc.)"""
+        with self._lock:
+            indice = self._recursos.get(recurso_id)
+            if indice is None:
+                return
+            for pos, intervalo in enumerate(indice.intervalos):
+                if intervalo.reserva_id == reserva_id:
+                    del indice.inicios[pos]
+                    del indice.intervalos[pos]
+                    return
+
+    def invalidar(self, recurso_id: int) -> None:
+        with self._lock:
+            self._recursos.pop(recurso_id, None)
+
+
+indice_reservas = IndiceReservas()
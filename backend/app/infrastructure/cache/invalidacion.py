@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Iterable
+
+from app.infrastructure.cache.bloqueos import bloqueos_recursos
+from app.infrastructure.cache.disponibilidad_cache import disponibilidad_cache
+from app.infrastructure.cache.plantillas import plantillas_semanales
+from app.infrastructure.cache.recursos import recursos_activos
+
+
+def notificar_cambio_reserva(recurso_id: int, inicio: datetime, fin: datetime) -> None:
+    """Una reserva de [inicio, fin) se creó, se canceló o cambió de estado"""
+    disponibilidad_cache.invalidar_intervalo(recurso_id, inicio, fin)
+
+
+def notificar_cambio_horarios(recurso_id: int) -> None:
+    """Cambiaron los horarios disponibles de un recurso"""
+    plantillas_semanales.invalidar(recurso_id)
+    disponibilidad_cache.invalidar_recurso(recurso_id)
+
+
+def notificar_baja_recurso(recurso_id: int) -> None:
+    """Un recurso se dio de baja"""
+    recursos_activos.invalidar(recurso_id)
+
+
+def notificar_cambio_bloqueos(recurso_ids: Iterable[int], inicio: datetime, fin: datetime) -> None:
+    """Se creó o se quitó un bloqueo de [inicio, fin) que afecta a estos recursos"""
+    for recurso_id in recurso_ids:
+        bloqueos_recursos.invalidar(recurso_id)
+        disponibilidad_cache.invalidar_intervalo(recurso_id, inicio, fin)
@@ -0,0 +1,86 @@
+import threading
+import time as _time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.domain.services.disponibilidad import Franja
+from app.domain.services.plantilla_semanal import PlantillaSemanal
+
+
+class PlantillasCache:
+    """
+    Cache en memoria de las plantillas semanales compiladas de cada recurso.
+
+    Se invalida explícitamente cuando /horarios modifica un recurso. El TTL
+    solo cubre los cambios hechos desde otros procesos. Como en
+    DisponibilidadCache, cada recurso tiene un número de generación: una
+    carga que empezó antes de una invalidación no guarda su resultado, y
+    cada entrada recuerda la version_disponibilidad con la que se cargó.
+    """
+
+    def __init__(self, ttl_segundos: float = 600.0):
+        self._ttl = ttl_segundos
+        self._lock = threading.Lock()
+        self._plantillas: Dict[int, Tuple[float, Optional[int], PlantillaSemanal]] = {}
+        self._generaciones: Dict[int, int] = {}
+
+    def obtener(
+        self,
+        recurso_id: int,
+        cargar: Callable[[int], Dict[int, List[Franja]]],
+        version: Optional[int] = None
+    ) -> PlantillaSemanal:
+        """Devuelve la plantilla del recurso, compilándola con `cargar` si hace falta"""
+        return self.obtener_varias(
+            [recurso_id],
+            lambda ids: {recurso_id: cargar(recurso_id)},
+            {recurso_id: version}
+        )[recurso_id]
+
+    def obtener_varias(
+        self,
+        recurso_ids: List[int],
+        cargar: Callable[[List[int]], Dict[int, Dict[int, List[Franja]]]],
+        versiones: Optional[Dict[int, Optional[int]]] = None
+    ) -> Dict[int, PlantillaSemanal]:
+        """
+        Devuelve las plantillas de varios recursos cargando los faltantes en
+        una sola llamada. Con `versiones` (version_disponibilidad recién leída
+        de cada recurso) también se recargan las entradas de otra versión.
+        """
+        ahora = _time.monotonic()
+        versiones = versiones or {}
+        resultado: Dict[int, PlantillaSemanal] = {}
+        faltantes = []
+
+        with self._lock:
+            for recurso_id in recurso_ids:
+                entrada = self._plantillas.get(recurso_id)
+                version = versiones.get(recurso_id)
+                if (
+                    entrada is not None
+                    and ahora - entrada[0] <= self._ttl
+                    and (version is None or entrada[1] == version)
+                ):
+                    resultado[recurso_id] = entrada[2]
+                else:
+                    faltantes.append(recurso_id)
+            generaciones = {recurso_id: self._generaciones.get(recurso_id, 0) for recurso_id in faltantes}
+
+        if faltantes:
+            franjas = cargar(faltantes)
+            with self._lock:
+                for recurso_id in faltantes:
+                    plantilla = PlantillaSemanal(franjas.get(recurso_id, {}))
+                    if self._generaciones.get(recurso_id, 0) == generaciones[recurso_id]:
+                        self._plantillas[recurso_id] = (ahora, versiones.get(recurso_id), plantilla)
+                    resultado[recurso_id] = plantilla
+
+        return resultado
+
+    def invalidar(self, recurso_id: int) -> None:
+        with self._lock:
+            self._generaciones[recurso_id] = self._generaciones.get(recurso_id, 0) + 1
+            self._plantillas.pop(recurso_id, None)
+
+
+plantillas_semanales = PlantillasCache()
@@ -0,0 +1,47 @@
+import threading
+import time as _time
+from typing import Callable, Dict
+
+
+class RecursosActivosCache:
+    """
+    Cache en memoria de los recursos que existen y están activos.
+
+    Solo se guardan los activos: un id inexistente o dado de baja se vuelve
+    a consultar cada vez y no ocupa lugar. Se invalida explícitamente
+    cuando /recursos da de baja un recurso; el TTL cubre los cambios hechos
+    desde otros procesos (la inserción igual vuelve a verificar el recurso
+    en la base). Como en PlantillasCache, una carga que empezó antes de una
+    invalidación no guarda su resultado.
+    """
+
+    def __init__(self, ttl_segundos: float = 60.0):
+        self._ttl = ttl_segundos
+        self._lock = threading.Lock()
+        self._activos: Dict[int, float] = {}
+        self._generaciones: Dict[int, int] = {}
+
+    def esta_activo(self, recurso_id: int, cargar: Callable[[int], bool]) -> bool:
+        """Indica si el recurso existe y está activo, consultando con `cargar` si hace falta"""
+        ahora = _time.monotonic()
+        with self._lock:
+            cargado_en = self._activos.get(recurso_id)
+            if cargado_en is not None and ahora - cargado_en <= self._ttl:
+                return True
+            generacion = self._generaciones.get(recurso_id, 0)
+
+        activo = cargar(recurso_id)
+        with self._lock:
+            if not activo:
+                self._activos.pop(recurso_id, None)
+            elif self._generaciones.get(recurso_id, 0) == generacion:
+                self._activos[recurso_id] = ahora
+        return activo
+
+    def invalidar(self, recurso_id: int) -> None:
+        with self._lock:
+            self._generaciones[recurso_id] = self._generaciones.get(recurso_id, 0) + 1
+            self._activos.pop(recurso_id, None)
+
+
+recursos_activos = RecursosActivosCache()
@@ -0,0 +1,12 @@
+from sqlalchemy.exc import IntegrityError
+
+# SQLSTATE de PostgreSQL para violación de una restricción EXCLUDE
+EXCLUSION_VIOLATION = '23P01'
+
+
+def es_solapamiento_reserva(error: IntegrityError) -> bool:
+    """Indica si el error viene de la restricción `reservas_sin_solapamiento`"""
+    origen = error.orig
+    if getattr(origen, 'pgcode', None) == EXCLUSION_VIOLATION:
+        return True
+    return 'reservas_sin_solapamiento' in str(origen)
@@ -8,6 +8,7 @@ from app.infrastructure.db.models.horario_disponible_model import HorarioDisponi
 from app.infrastructure.db.models.reserva_model import ReservaModel
 from app.infrastructure.db.models.bloqueo_model import BloqueoModel
 from app.infrastructure.db.models.bloqueo_recurso_model import BloqueoRecursoModel
+from app.infrastructure.db.models.retencion_model import RetencionModel
 
 __all__ = [
     "UserModel",
@@ -20,4 +21,5 @@ __all__ = [
     "ReservaModel",
     "BloqueoModel",
     "BloqueoRecursoModel",
+    "RetencionModel",
 ]
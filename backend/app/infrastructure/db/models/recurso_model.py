@@ -26,6 +26,9 @@ class RecursoModel(Base):
     is_active = Column(Boolean, default=True)
     orden = Column(Integer, default=0)  # Para ordenar en listados
     
+    # Se incrementa con cada cambio de reservas/horarios/bloqueos (ETag de disponibilidad)
+    version_disponibilidad = Column(Integer, nullable=False, default=0, server_default='0')
+    
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
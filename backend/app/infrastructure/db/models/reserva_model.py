@@ -1,23 +1,50 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Text, Float, Boolean
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Text, Float, Boolean, Computed, DDL, Index, event, text
+from sqlalchemy.dialects.postgresql import TSRANGE, ExcludeConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.infrastructure.db.base import Base
 
+# Para create_all: la restricción de no solapamiento usa '=' sobre enteros en GiST
+event.listen(
+    Base.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS btree_gist').execute_if(dialect='postgresql')
+)
+
 
 class ReservaModel(Base):
     """
     Reserva de un recurso específico
     """
     __tablename__ = 'reservas'
+    __table_args__ = (
+        # Dos reservas activas del mismo recurso no pueden solaparse (requiere btree_gist)
+        ExcludeConstraint(
+            ('recurso_id', '='),
+            ('periodo', '&&'),
+            name='reservas_sin_solapamiento',
+            using='gist',
+            where=text("estado IN ('pendiente', 'confirmada')")
+        ),
+        # Historial del cliente paginado por clave (fecha_hora_inicio, id)
+        Index('ix_reservas_cliente_inicio_id', 'cliente_id', 'fecha_hora_inicio', 'id'),
+        # Reservas de un recurso en orden (feed del proveedor, disponibilidad)
+        Index('ix_reservas_recurso_inicio_id', 'recurso_id', 'fecha_hora_inicio', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    cliente_id = Column(Integer, ForeignKey('clientes.id', ondelete='CASCADE'), nullable=False, index=True)
-    recurso_id = Column(Integer, ForeignKey('recursos.id', ondelete='RESTRICT'), nullable=False, index=True)
+    cliente_id = Column(Integer, ForeignKey('clientes.id', ondelete='CASCADE'), nullable=False)
+    recurso_id = Column(Integer, ForeignKey('recursos.id', ondelete='RESTRICT'), nullable=False)
     
     # Fecha y hora de la reserva
     fecha_hora_inicio = Column(DateTime, nullable=False, index=True)
     fecha_hora_fin = Column(DateTime, nullable=False)
     duracion_minutos = Column(Integer, nullable=False)
+    # [inicio, fin) calculado por la base, usado por la restricción de no solapamiento
+    periodo = Column(TSRANGE, Computed("tsrange(fecha_hora_inicio, fecha_hora_fin, '[)')", persisted=True))
+    
+    # Reservas recurrentes (Ej: todos los martes 20:00) comparten el mismo serie_id
+    serie_id = Column(String(36), nullable=True, index=True)
     
     # Estado de la reserva
     estado = Column(String(50), nullable=False, default='pendiente', index=True)
@@ -40,6 +67,10 @@ class ReservaModel(Base):
     motivo_cancelacion = Column(String(500), nullable=True)
     fecha_cancelacion = Column(DateTime, nullable=True)
     
+    # Concurrencia optimista: cada cambio de estado o de pago la incrementa
+    # (UPDATE ... WHERE id = ? AND version = ?)
+    version = Column(Integer, nullable=False, default=1, server_default=text('1'))
+    
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -47,3 +78,5 @@ class ReservaModel(Base):
     cliente = relationship("ClienteModel", back_populates="reservas")
     recurso = relationship("RecursoModel", back_populates="reservas")
 
+    __mapper_args__ = {'version_id_col': version}
+
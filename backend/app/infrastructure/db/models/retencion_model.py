@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.infrastructure.db.base import Base
+
+
+class RetencionModel(Base):
+    """
+    Retención temporal de un horario mientras el cliente completa el pago.
+    Ocupa el horario hasta `expira_en`; al confirmarla se convierte en reserva.
+    """
+    __tablename__ = 'retenciones'
+    __table_args__ = (
+        Index('ix_retenciones_recurso_inicio', 'recurso_id', 'fecha_hora_inicio'),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cliente_id = Column(Integer, ForeignKey('clientes.id', ondelete='CASCADE'), nullable=False, index=True)
+    recurso_id = Column(Integer, ForeignKey('recursos.id', ondelete='CASCADE'), nullable=False)
+    
+    fecha_hora_inicio = Column(DateTime, nullable=False)
+    fecha_hora_fin = Column(DateTime, nullable=False)
+    duracion_minutos = Column(Integer, nullable=False)
+    precio_total = Column(Float, nullable=False)
+    
+    # Las vencidas se ignoran al leer y se borran con un barrido por este índice
+    expira_en = Column(DateTime, nullable=False, index=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Relaciones
+    cliente = relationship("ClienteModel")
+    recurso = relationship("RecursoModel")
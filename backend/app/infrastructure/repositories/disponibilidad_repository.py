@@ -0,0 +1,259 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy import and_, delete, func, null, or_, select, text, true, union_all
+from sqlalchemy.orm import Session
+
+from app.domain.repositories.disponibilidad_repository import DisponibilidadRepository
+from app.domain.services.disponibilidad import Franja, Intervalo
+from app.infrastructure.db.models.horario_disponible_model import HorarioDisponibleModel
+from app.infrastructure.db.models.recurso_model import RecursoModel
+from app.infrastructure.db.models.reserva_model import ReservaModel
+from app.infrastructure.db.models.servicio_model import ServicioModel
+from app.infrastructure.db.models.bloqueo_recurso_model import BloqueoRecursoModel
+from app.infrastructure.db.models.bloqueo_model import BloqueoModel
+from app.infrastructure.db.models.retencion_model import RetencionModel
+
+# Primer argumento de pg_advisory_xact_lock, para no chocar con otros advisory locks
+LOCK_ESPACIO_RESERVAS = 7301
+
+
+class SQLAlchemyDisponibilidadRepository(DisponibilidadRepository):
+    """
+    Implementación de lectura de disponibilidad usando SQLAlchemy
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_franjas_semana(self, recurso_id: int) -> Dict[int, List[Franja]]:
+        return self.get_franjas_semana_recursos([recurso_id]).get(recurso_id, {})
+
+    def get_franjas_semana_recursos(self, recurso_ids: List[int]) -> Dict[int, Dict[int, List[Franja]]]:
+        rows = self.session.query(
+            HorarioDisponibleModel.recurso_id,
+            HorarioDisponibleModel.dia_semana,
+            HorarioDisponibleModel.hora_inicio,
+            HorarioDisponibleModel.hora_fin,
+            HorarioDisponibleModel.precio,
+            HorarioDisponibleModel.duracion_minutos
+        ).filter(
+            HorarioDisponibleModel.recurso_id.in_(recurso_ids),
+            HorarioDisponibleModel.is_active == True
+        ).all()
+
+        franjas: Dict[int, Dict[int, List[Franja]]] = {}
+        for r in rows:
+            franjas.setdefault(r.recurso_id, {}).setdefault(r.dia_semana, []).append(Franja(
+                hora_inicio=r.hora_inicio,
+                hora_fin=r.hora_fin,
+                precio=r.precio,
+                duracion_minutos=r.duracion_minutos
+            ))
+        return franjas
+
+    def get_reservas_en_rango(self, recurso_id: int, desde: datetime, hasta: datetime) -> List[Intervalo]:
+        return self.get_reservas_en_rango_recursos([recurso_id], desde, hasta).get(recurso_id, [])
+
+    def get_reservas_en_rango_recursos(
+        self,
+        recurso_ids: List[int],
+        desde: datetime,
+        hasta: datetime
+    ) -> Dict[int, List[Intervalo]]:
+        reservas = select(
+            ReservaModel.id,
+            ReservaModel.recurso_id,
+            ReservaModel.fecha_hora_inicio,
+            ReservaModel.fecha_hora_fin
+        ).where(
+            ReservaModel.recurso_id.in_(recurso_ids),
+            ReservaModel.estado.in_(['pendiente', 'confirmada']),
+            ReservaModel.fecha_hora_inicio < hasta,
+            ReservaModel.fecha_hora_fin > desde
+        )
+
+        # Las retenciones vigentes ocupan el horario igual que una reserva (sin reserva_id)
+        retenciones = select(
+            null().label('id'),
+            RetencionModel.recurso_id,
+            RetencionModel.fecha_hora_inicio,
+            RetencionModel.fecha_hora_fin
+        ).where(
+            RetencionModel.recurso_id.in_(recurso_ids),
+            RetencionModel.expira_en > datetime.utcnow(),
+            RetencionModel.fecha_hora_inicio < hasta,
+            RetencionModel.fecha_hora_fin > desde
+        )
+
+        ocupados: Dict[int, List[Intervalo]] = {}
+        for r in self.session.execute(union_all(reservas, retenciones)):
+            ocupados.setdefault(r.recurso_id, []).append(
+                Intervalo(inicio=r.fecha_hora_inicio, fin=r.fecha_hora_fin, reserva_id=r.id)
+            )
+        return ocupados
+
+    def get_conflictos(
+        self,
+        rangos: List[Tuple[int, datetime, datetime]],
+        excluir_cliente_id: Optional[int] = None
+    ) -> Dict[int, List[Intervalo]]:
+        condiciones_reservas = or_(*[
+            and_(
+                ReservaModel.recurso_id == recurso_id,
+                ReservaModel.fecha_hora_inicio < fin,
+                ReservaModel.fecha_hora_fin > inicio
+            )
+            for recurso_id, inicio, fin in rangos
+        ])
+        condiciones_retenciones = or_(*[
+            and_(
+                RetencionModel.recurso_id == recurso_id,
+                RetencionModel.fecha_hora_inicio < fin,
+                RetencionModel.fecha_hora_fin > inicio
+            )
+            for recurso_id, inicio, fin in rangos
+        ])
+
+        reservas = select(
+            ReservaModel.id,
+            ReservaModel.recurso_id,
+            ReservaModel.fecha_hora_inicio,
+            ReservaModel.fecha_hora_fin
+        ).where(
+            ReservaModel.estado.in_(['pendiente', 'confirmada']),
+            condiciones_reservas
+        )
+        retenciones = select(
+            null().label('id'),
+            RetencionModel.recurso_id,
+            RetencionModel.fecha_hora_inicio,
+            RetencionModel.fecha_hora_fin
+        ).where(
+            RetencionModel.expira_en > datetime.utcnow(),
+            RetencionModel.cliente_id != excluir_cliente_id if excluir_cliente_id is not None else true(),
+            condiciones_retenciones
+        )
+
+        conflictos: Dict[int, List[Intervalo]] = {}
+        for r in self.session.execute(union_all(reservas, retenciones)):
+            conflictos.setdefault(r.recurso_id, []).append(
+                Intervalo(inicio=r.fecha_hora_inicio, fin=r.fecha_hora_fin, reserva_id=r.id)
+            )
+        return conflictos
+
+    def get_bloqueos_recursos(
+        self,
+        recurso_ids: List[int],
+        desde: datetime,
+        hasta: datetime
+    ) -> Dict[int, List[Intervalo]]:
+        propios = self.session.query(
+            BloqueoRecursoModel.recurso_id,
+            BloqueoRecursoModel.fecha_hora_inicio,
+            BloqueoRecursoModel.fecha_hora_fin
+        ).filter(
+            BloqueoRecursoModel.recurso_id.in_(recurso_ids),
+            BloqueoRecursoModel.fecha_hora_inicio < hasta,
+            BloqueoRecursoModel.fecha_hora_fin > desde
+        ).all()
+
+        # Los bloqueos del proveedor (vacaciones, feriados) aplican a todos sus recursos
+        del_proveedor = self.session.query(
+            RecursoModel.id,
+            BloqueoModel.fecha_inicio,
+            BloqueoModel.fecha_fin
+        ).join(
+            ServicioModel, RecursoModel.servicio_id == ServicioModel.id
+        ).join(
+            BloqueoModel, BloqueoModel.proveedor_id == ServicioModel.proveedor_id
+        ).filter(
+            RecursoModel.id.in_(recurso_ids),
+            BloqueoModel.fecha_inicio < hasta,
+            BloqueoModel.fecha_fin > desde
+        ).all()
+
+        bloqueos: Dict[int, List[Intervalo]] = {}
+        for b in propios:
+            bloqueos.setdefault(b.recurso_id, []).append(
+                Intervalo(inicio=b.fecha_hora_inicio, fin=b.fecha_hora_fin)
+            )
+        for b in del_proveedor:
+            bloqueos.setdefault(b.id, []).append(
+                Intervalo(inicio=b.fecha_inicio, fin=b.fecha_fin)
+            )
+        return bloqueos
+
+    def get_reservas_activas(self, recurso_id: int, desde: datetime) -> List[Intervalo]:
+        rows = self.session.query(
+            ReservaModel.id,
+            ReservaModel.fecha_hora_inicio,
+            ReservaModel.fecha_hora_fin
+        ).filter(
+            ReservaModel.recurso_id == recurso_id,
+            ReservaModel.estado.in_(['pendiente', 'confirmada']),
+            ReservaModel.fecha_hora_fin > desde
+        ).all()
+
+        return [
+            Intervalo(inicio=r.fecha_hora_inicio, fin=r.fecha_hora_fin, reserva_id=r.id)
+            for r in rows
+        ]
+
+    def recurso_activo(self, recurso_id: int) -> bool:
+        return self.session.query(RecursoModel.id).filter(
+            RecursoModel.id == recurso_id,
+            RecursoModel.is_active == True
+        ).first() is not None
+
+    def get_version(self, recurso_id: int) -> Optional[int]:
+        return self.session.query(RecursoModel.version_disponibilidad).filter(
+            RecursoModel.id == recurso_id
+        ).scalar()
+
+    def get_proximos_vencimientos(self, recurso_ids: List[int]) -> Dict[int, datetime]:
+        rows = self.session.query(
+            RetencionModel.recurso_id,
+            func.min(RetencionModel.expira_en)
+        ).filter(
+            RetencionModel.recurso_id.in_(recurso_ids),
+            RetencionModel.expira_en > datetime.utcnow()
+        ).group_by(RetencionModel.recurso_id).all()
+
+        return {recurso_id: expira_en for recurso_id, expira_en in rows}
+
+    def incrementar_version(self, recurso_id: int) -> None:
+        self.session.query(RecursoModel).filter(
+            RecursoModel.id == recurso_id
+        ).update(
+            {RecursoModel.version_disponibilidad: RecursoModel.version_disponibilidad + 1},
+            synchronize_session=False
+        )
+
+    def bloquear_recurso(self, recurso_id: int, modo: str) -> None:
+        if modo == 'advisory':
+            self.session.execute(
+                text('SELECT pg_advisory_xact_lock(:espacio, :recurso_id)'),
+                {'espacio': LOCK_ESPACIO_RESERVAS, 'recurso_id': recurso_id}
+            )
+        elif modo == 'for_update':
+            self.session.query(RecursoModel.id).filter(
+                RecursoModel.id == recurso_id
+            ).with_for_update().first()
+
+    def purgar_retenciones_vencidas(self, ahora: datetime) -> Dict[int, List[Intervalo]]:
+        rows = self.session.execute(
+            delete(RetencionModel).where(
+                RetencionModel.expira_en <= ahora
+            ).returning(
+                RetencionModel.recurso_id,
+                RetencionModel.fecha_hora_inicio,
+                RetencionModel.fecha_hora_fin
+            )
+        ).all()
+
+        vencidas: Dict[int, List[Intervalo]] = {}
+        for r in rows:
+            vencidas.setdefault(r.recurso_id, []).append(
+                Intervalo(inicio=r.fecha_hora_inicio, fin=r.fecha_hora_fin)
+            )
+        return vencidas
@@ -1,13 +1,16 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import Integer, and_, column, delete, exists, insert, literal, select, true, update, values
 
 from app.domain.entities.reserva import Reserva
 from app.domain.repositories.reserva_repository import ReservaRepository
 from app.infrastructure.db.models.reserva_model import ReservaModel
 from app.infrastructure.db.models.recurso_model import RecursoModel
 from app.infrastructure.db.models.servicio_model import ServicioModel
+from app.infrastructure.db.models.cliente_model import ClienteModel
+from app.infrastructure.db.models.proveedor_model import ProveedorModel
+from app.infrastructure.db.models.retencion_model import RetencionModel
 from app.infrastructure.db.mappers.reserva_mapper import ReservaMapper
 
 
@@ -82,4 +85,318 @@ class SQLAlchemyReservaRepository(ReservaRepository):
         ).first()
         if model:
             self.session.delete(model)
-            self.session.commit()
\ No newline at end of file
+            self.session.commit()
+
+    def crear_si_disponible(self, user_id: int, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Un único round trip (CTEs de PostgreSQL):
+
+            cliente   -> id del cliente del usuario
+            recurso   -> el recurso existe y está activo
+            solapada  -> alguna reserva activa se solapa
+            retenida  -> otro cliente tiene una retención vigente que se solapa
+            nueva     -> INSERT ... SELECT (solo si todo lo anterior da bien) RETURNING
+            version   -> incrementa version_disponibilidad si se insertó
+
+        No hace commit. Las CTEs ven la misma foto de la base, así que dos
+        inserciones concurrentes pueden pasar el chequeo: la restricción de
+        exclusión es la que decide en ese caso.
+
+        El UPDATE de `version` toma el lock de la fila del recurso hasta el
+        commit: dos altas del mismo recurso nunca avanzan en paralelo, aunque
+        RESERVA_LOCK_MODE sea none (recursos distintos sí).
+        """
+        recurso_id = datos['recurso_id']
+        inicio, fin = datos['fecha_hora_inicio'], datos['fecha_hora_fin']
+
+        cliente = select(ClienteModel.id).where(ClienteModel.user_id == user_id).cte('cliente')
+        recurso = select(RecursoModel.id).where(
+            RecursoModel.id == recurso_id,
+            RecursoModel.is_active == True
+        ).cte('recurso')
+        solapada = select(ReservaModel.id).where(
+            ReservaModel.recurso_id == recurso_id,
+            ReservaModel.estado.in_(['pendiente', 'confirmada']),
+            ReservaModel.fecha_hora_inicio < fin,
+            ReservaModel.fecha_hora_fin > inicio
+        ).limit(1).cte('solapada')
+
+        ahora = datetime.utcnow()
+        retenida = select(RetencionModel.id).where(
+            RetencionModel.recurso_id == recurso_id,
+            RetencionModel.expira_en > ahora,
+            RetencionModel.fecha_hora_inicio < fin,
+            RetencionModel.fecha_hora_fin > inicio,
+            RetencionModel.cliente_id.is_distinct_from(select(cliente.c.id).scalar_subquery())
+        ).limit(1).cte('retenida')
+
+        # Valores explícitos: los defaults de Python del modelo no se completan
+        # en un INSERT anidado en un CTE
+        valores = dict(datos, estado='pendiente', version=1, created_at=ahora, updated_at=ahora)
+        columnas = [c for c in ReservaModel.__table__.c if c.name != 'periodo']
+
+        nueva = insert(ReservaModel).from_select(
+            ['cliente_id', *valores],
+            select(cliente.c.id, *[literal(v, ReservaModel.__table__.c[k].type) for k, v in valores.items()]).where(
+                exists(select(recurso.c.id)),
+                ~exists(select(solapada.c.id)),
+                ~exists(select(retenida.c.id))
+            )
+        ).returning(*columnas).cte('nueva')
+
+        version = update(RecursoModel).where(
+            RecursoModel.id.in_(select(nueva.c.recurso_id))
+        ).values(
+            version_disponibilidad=RecursoModel.version_disponibilidad + 1,
+            updated_at=ahora
+        ).cte('version')
+
+        uno = select(literal(1).label('uno')).subquery('uno')
+        consulta = select(
+            select(cliente.c.id).scalar_subquery().label('cliente_encontrado'),
+            exists(select(recurso.c.id)).label('recurso_activo'),
+            exists(select(solapada.c.id)).label('hay_solapamiento'),
+            exists(select(retenida.c.id)).label('hay_retencion'),
+            *[nueva.c[c.name] for c in columnas]
+        ).select_from(
+            uno.outerjoin(nueva, true())
+        ).add_cte(version)
+
+        return dict(self.session.execute(consulta).mappings().one())
+
+    def confirmar_retencion(self, retencion_id: int, user_id: int, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convierte una retención vigente del usuario en reserva en un solo round
+        trip: DELETE ... RETURNING de la retención e INSERT ... SELECT de la
+        reserva con su horario y precio. No repite la verificación de
+        disponibilidad (la retención ya la reservó).
+
+        Devuelve `precio_retencion` (None si la retención no existe, no es del
+        usuario o venció) y la fila insertada (id None si la seña supera el
+        precio). No hace commit: si no se insertó hay que hacer rollback para
+        no perder la retención.
+        """
+        ahora = datetime.utcnow()
+
+        retencion = delete(RetencionModel).where(
+            RetencionModel.id == retencion_id,
+            RetencionModel.expira_en > ahora,
+            RetencionModel.cliente_id.in_(select(ClienteModel.id).where(ClienteModel.user_id == user_id))
+        ).returning(
+            RetencionModel.cliente_id,
+            RetencionModel.recurso_id,
+            RetencionModel.fecha_hora_inicio,
+            RetencionModel.fecha_hora_fin,
+            RetencionModel.duracion_minutos,
+            RetencionModel.precio_total
+        ).cte('retencion')
+
+        seña = datos.get('seña') or 0
+        valores = dict(datos, estado='pendiente', version=1, created_at=ahora, updated_at=ahora)
+        columnas = [c for c in ReservaModel.__table__.c if c.name != 'periodo']
+
+        nueva = insert(ReservaModel).from_select(
+            [
+                'cliente_id', 'recurso_id', 'fecha_hora_inicio', 'fecha_hora_fin', 'duracion_minutos',
+                'precio_total', 'saldo_pendiente', 'pago_completo', *valores
+            ],
+            select(
+                retencion.c.cliente_id,
+                retencion.c.recurso_id,
+                retencion.c.fecha_hora_inicio,
+                retencion.c.fecha_hora_fin,
+                retencion.c.duracion_minutos,
+                retencion.c.precio_total,
+                retencion.c.precio_total - seña,
+                retencion.c.precio_total == seña,
+                *[literal(v, ReservaModel.__table__.c[k].type) for k, v in valores.items()]
+            ).where(
+                retencion.c.precio_total >= seña
+            )
+        ).returning(*columnas).cte('nueva')
+
+        version = update(RecursoModel).where(
+            RecursoModel.id.in_(select(nueva.c.recurso_id))
+        ).values(
+            version_disponibilidad=RecursoModel.version_disponibilidad + 1,
+            updated_at=ahora
+        ).cte('version')
+
+        uno = select(literal(1).label('uno')).subquery('uno')
+        consulta = select(
+            select(retencion.c.precio_total).scalar_subquery().label('precio_retencion'),
+            *[nueva.c[c.name] for c in columnas]
+        ).select_from(
+            uno.outerjoin(nueva, true())
+        ).add_cte(version)
+
+        return dict(self.session.execute(consulta).mappings().one())
+
+    def _del_usuario(self, user_id: int, rol: str, reservas=None):
+        """
+        Condición de pertenencia: reservas del cliente o de los recursos del
+        proveedor del usuario (sobre `reservas`, por defecto la tabla misma)
+        """
+        reservas = reservas if reservas is not None else ReservaModel.__table__
+        if rol == 'cliente':
+            return reservas.c.cliente_id.in_(
+                select(ClienteModel.id).where(ClienteModel.user_id == user_id)
+            )
+        return reservas.c.recurso_id.in_(
+            select(RecursoModel.id).join(
+                ServicioModel, RecursoModel.servicio_id == ServicioModel.id
+            ).join(
+                ProveedorModel, ServicioModel.proveedor_id == ProveedorModel.id
+            ).where(ProveedorModel.user_id == user_id)
+        )
+
+    def get_del_usuario(self, reserva_id: int, user_id: int, rol: str) -> Optional[ReservaModel]:
+        return self.session.query(ReservaModel).filter(
+            ReservaModel.id == reserva_id,
+            self._del_usuario(user_id, rol)
+        ).first()
+
+    def actualizar_si(
+        self,
+        reserva_id: int,
+        user_id: int,
+        rol: str,
+        condiciones: List[Any],
+        valores: Dict[str, Any],
+        version: Optional[int] = None,
+        incrementar_version_recurso: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Compare-and-swap en un solo round trip, sin SELECT previo ni refresh:
+
+            UPDATE reservas SET ..., version = version + 1
+            WHERE id = ? AND <es del usuario> AND <condiciones> [AND version = ?]
+            RETURNING ...
+
+        Con `incrementar_version_recurso` también incrementa la
+        version_disponibilidad del recurso en la misma sentencia (CTE).
+        Devuelve la fila actualizada, o None si alguna condición no se cumplió.
+        No hace commit.
+        """
+        ahora = datetime.utcnow()
+        columnas = [c for c in ReservaModel.__table__.c if c.name != 'periodo']
+
+        filtros = [ReservaModel.id == reserva_id, self._del_usuario(user_id, rol), *condiciones]
+        if version is not None:
+            filtros.append(ReservaModel.version == version)
+
+        actualizada = update(ReservaModel.__table__).where(*filtros).values(
+            **valores,
+            version=ReservaModel.version + 1,
+            updated_at=ahora
+        ).returning(*columnas)
+
+        if not incrementar_version_recurso:
+            fila = self.session.execute(actualizada).mappings().first()
+            return dict(fila) if fila else None
+
+        actualizada = actualizada.cte('actualizada')
+        version_recurso = update(RecursoModel).where(
+            RecursoModel.id.in_(select(actualizada.c.recurso_id))
+        ).values(
+            version_disponibilidad=RecursoModel.version_disponibilidad + 1,
+            updated_at=ahora
+        ).cte('version_recurso')
+
+        fila = self.session.execute(
+            select(*[actualizada.c[c.name] for c in columnas]).add_cte(version_recurso)
+        ).mappings().first()
+        return dict(fila) if fila else None
+
+    def transicionar_lote(
+        self,
+        user_id: int,
+        condiciones: List[Any],
+        valores: Dict[str, Any],
+        reserva_ids: Optional[List[int]] = None,
+        filtros: Optional[List[Any]] = None,
+        limite: int = 200
+    ) -> List[Dict[str, Any]]:
+        """
+        Cambia de estado muchas reservas del proveedor del usuario en un solo
+        round trip (CTEs de PostgreSQL):
+
+            actualizadas -> UPDATE ... WHERE <del proveedor> AND <condiciones> RETURNING
+            version      -> incrementa version_disponibilidad de los recursos tocados
+            pedidas      -> (solo con reserva_ids) VALUES de los ids pedidos
+
+        Con `reserva_ids` devuelve una fila por id pedido, con `actualizada` y
+        el estado previo (`estado_previo` None si no existe o no es del
+        proveedor) para explicar las que no cambiaron: todas las CTEs ven la
+        misma foto, así que la lectura de `previa` es la de antes del UPDATE.
+        Con `filtros` devuelve solo las actualizadas (como mucho `limite`).
+        No hace commit.
+        """
+        ahora = datetime.utcnow()
+        tabla = ReservaModel.__table__
+        del_proveedor = self._del_usuario(user_id, 'proveedor')
+
+        if reserva_ids is not None:
+            objetivo = tabla.c.id.in_(reserva_ids)
+        else:
+            objetivo = tabla.c.id.in_(
+                select(tabla.c.id).where(
+                    del_proveedor, *condiciones, *filtros
+                ).order_by(tabla.c.fecha_hora_inicio, tabla.c.id).limit(limite)
+            )
+
+        actualizadas = update(tabla).where(
+            objetivo, del_proveedor, *condiciones
+        ).values(
+            **valores,
+            version=tabla.c.version + 1,
+            updated_at=ahora
+        ).returning(
+            tabla.c.id,
+            tabla.c.recurso_id,
+            tabla.c.estado,
+            tabla.c.version,
+            tabla.c.fecha_hora_inicio,
+            tabla.c.fecha_hora_fin
+        ).cte('actualizadas')
+
+        version = update(RecursoModel).where(
+            RecursoModel.id.in_(select(actualizadas.c.recurso_id))
+        ).values(
+            version_disponibilidad=RecursoModel.version_disponibilidad + 1,
+            updated_at=ahora
+        ).cte('version')
+
+        if reserva_ids is None:
+            consulta = select(
+                actualizadas.c.id,
+                true().label('actualizada'),
+                actualizadas.c.estado,
+                actualizadas.c.version,
+                actualizadas.c.recurso_id,
+                actualizadas.c.fecha_hora_inicio,
+                actualizadas.c.fecha_hora_fin,
+                literal(None).label('estado_previo')
+            ).order_by(actualizadas.c.fecha_hora_inicio, actualizadas.c.id).add_cte(version)
+            return [dict(r) for r in self.session.execute(consulta).mappings()]
+
+        pedidas = values(column('id', Integer), name='pedidas').data([(i,) for i in reserva_ids])
+        previa = tabla.alias('previa')
+        consulta = select(
+            pedidas.c.id,
+            actualizadas.c.id.is_not(None).label('actualizada'),
+            actualizadas.c.estado,
+            actualizadas.c.version,
+            previa.c.recurso_id,
+            previa.c.fecha_hora_inicio,
+            previa.c.fecha_hora_fin,
+            previa.c.estado.label('estado_previo')
+        ).select_from(
+            pedidas.outerjoin(
+                actualizadas, actualizadas.c.id == pedidas.c.id
+            ).outerjoin(
+                previa, and_(previa.c.id == pedidas.c.id, self._del_usuario(user_id, 'proveedor', previa))
+            )
+        ).add_cte(version)
+
+        return [dict(r) for r in self.session.execute(consulta).mappings()]
@@ -13,6 +13,7 @@ from app.api.v1.routers.auth_router import router as auth_router
 from app.api.v1.routers.servicio_router import router as servicio_router
 from app.api.v1.routers.recurso_router import router as recurso_router
 from app.api.v1.routers.reserva_router import router as reserva_router
+from app.api.v1.routers.bloqueo_router import router as bloqueo_router
 
 app = FastAPI(
     title=settings.project_name,
@@ -27,6 +28,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 # Incluir routers
@@ -35,6 +37,7 @@ app.include_router(servicio_router, prefix=settings.api_v1)
 app.include_router(recurso_router, prefix=settings.api_v1)
 app.include_router(reserva_router, prefix=settings.api_v1)
 app.include_router(horario_router, prefix=settings.api_v1)
+app.include_router(bloqueo_router, prefix=settings.api_v1)
 
 
 @app.on_event("startup")
@@ -0,0 +1,106 @@
+"""
+Benchmark: throughput de la sección crítica de crear_reserva (lock, verificación
+de solapamiento, INSERT e incremento de version_disponibilidad) según el modo
+de lock y la cantidad de clientes concurrentes sobre el mismo recurso.
+
+El incremento de versión bloquea la fila del recurso hasta el fin de la
+transacción, así que también con el modo none los clientes se serializan.
+
+Necesita una base PostgreSQL real (DATABASE_URL) con un recurso y un cliente
+existentes. Cada transacción termina en ROLLBACK, así que no deja reservas:
+el lock se mantiene igual hasta el fin de la transacción, que es lo que se mide.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_contencion --recurso-id 1 --cliente-id 1
+    python -m benchmarks.bench_contencion --recurso-id 1 --cliente-id 1 --clientes 1 4 16 --segundos 5
+"""
+import argparse
+import threading
+import time as _time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.infrastructure.db.models.reserva_model import ReservaModel
+from app.infrastructure.repositories.disponibilidad_repository import SQLAlchemyDisponibilidadRepository
+
+MODOS = ["none", "advisory", "for_update"]
+# Lejos en el futuro para no chocar con reservas reales
+BASE = datetime(2099, 1, 1, 10)
+
+
+def seccion_critica(fabrica: sessionmaker, recurso_id: int, cliente_id: int, modo: str, inicio: datetime) -> None:
+    session = fabrica()
+    try:
+        fin = inicio + timedelta(hours=1)
+        disponibilidad_repo = SQLAlchemyDisponibilidadRepository(session)
+        disponibilidad_repo.bloquear_recurso(recurso_id, modo)
+
+        existentes = session.query(ReservaModel).filter(
+            ReservaModel.recurso_id == recurso_id,
+            ReservaModel.estado.in_(['pendiente', 'confirmada']),
+            ReservaModel.fecha_hora_inicio < fin,
+            ReservaModel.fecha_hora_fin > inicio
+        ).count()
+
+        if existentes == 0:
+            session.add(ReservaModel(
+                cliente_id=cliente_id,
+                recurso_id=recurso_id,
+                fecha_hora_inicio=inicio,
+                fecha_hora_fin=fin,
+                duracion_minutos=60,
+                estado='pendiente',
+                precio_total=0
+            ))
+            session.flush()
+            disponibilidad_repo.incrementar_version(recurso_id)
+    except IntegrityError:
+        pass
+    finally:
+        session.rollback()
+        session.close()
+
+
+def medir(fabrica: sessionmaker, recurso_id: int, cliente_id: int, modo: str, clientes: int, segundos: float) -> float:
+    """Transacciones por segundo con `clientes` hilos compitiendo por el mismo recurso"""
+    fin = _time.perf_counter() + segundos
+    contador = [0] * clientes
+
+    def trabajador(n: int) -> None:
+        while _time.perf_counter() < fin:
+            # Cada hilo usa su propio horario: la contención es solo por el lock
+            seccion_critica(fabrica, recurso_id, cliente_id, modo, BASE + timedelta(hours=n))
+            contador[n] += 1
+
+    hilos = [threading.Thread(target=trabajador, args=(n,)) for n in range(clientes)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    return sum(contador) / segundos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recurso-id", type=int, required=True)
+    parser.add_argument("--cliente-id", type=int, required=True)
+    parser.add_argument("--clientes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--segundos", type=float, default=3.0)
+    args = parser.parse_args()
+
+    # Una conexión por cliente, para que la espera sea por el lock y no por el pool
+    engine = create_engine(settings.DATABASE_URL, pool_size=max(args.clientes), max_overflow=0)
+    fabrica = sessionmaker(bind=engine, autoflush=False)
+
+    print(f"{'modo':<12}" + "".join(f"{c:>10}" for c in args.clientes) + "   (transacciones/s por cantidad de clientes)")
+    for modo in MODOS:
+        fila = [medir(fabrica, args.recurso_id, args.cliente_id, modo, c, args.segundos) for c in args.clientes]
+        print(f"{modo:<12}" + "".join(f"{tps:>10.0f}" for tps in fila))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: latencia de la parte de base de datos de crear_reserva, comparando
+el flujo anterior (cliente, recurso, COUNT de solapamiento, INSERT, versión y
+refresh por separado) contra la sentencia única con CTEs
+(`SQLAlchemyReservaRepository.crear_si_disponible`).
+
+Necesita una base PostgreSQL real (DATABASE_URL) con un cliente y un recurso
+existentes. Cada iteración termina en ROLLBACK, así que no deja reservas. El
+precio no entra en la medición: en los dos casos sale de la plantilla en memoria.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_crear_reserva --user-id 2 --recurso-id 1
+    python -m benchmarks.bench_crear_reserva --user-id 2 --recurso-id 1 --iteraciones 2000
+"""
+import argparse
+import statistics
+import time as _time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.infrastructure.db.database import SessionLocal, engine
+from app.infrastructure.db.models.recurso_model import RecursoModel
+from app.infrastructure.db.models.reserva_model import ReservaModel
+from app.infrastructure.repositories.cliente_repository import SQLAlchemyClienteRepository
+from app.infrastructure.repositories.disponibilidad_repository import SQLAlchemyDisponibilidadRepository
+from app.infrastructure.repositories.reserva_repository import SQLAlchemyReservaRepository
+
+# Lejos en el futuro para no chocar con reservas reales
+INICIO = datetime(2099, 1, 1, 10)
+
+
+def datos_reserva(recurso_id: int) -> dict:
+    return {
+        'recurso_id': recurso_id,
+        'fecha_hora_inicio': INICIO,
+        'fecha_hora_fin': INICIO + timedelta(hours=1),
+        'duracion_minutos': 60,
+        'precio_total': 5000.0,
+        'seña': None,
+        'saldo_pendiente': 5000.0,
+        'metodo_pago': None,
+        'pago_completo': False,
+        'pago_confirmado': False,
+        'notas_cliente': None
+    }
+
+
+def flujo_anterior(session, user_id: int, recurso_id: int) -> None:
+    datos = datos_reserva(recurso_id)
+    cliente = SQLAlchemyClienteRepository(session).get_by_user_id(user_id)
+    session.query(RecursoModel).filter(
+        RecursoModel.id == recurso_id,
+        RecursoModel.is_active == True
+    ).first()
+    session.query(ReservaModel).filter(
+        ReservaModel.recurso_id == recurso_id,
+        ReservaModel.estado.in_(['pendiente', 'confirmada']),
+        ReservaModel.fecha_hora_inicio < datos['fecha_hora_fin'],
+        ReservaModel.fecha_hora_fin > datos['fecha_hora_inicio']
+    ).count()
+
+    reserva = ReservaModel(cliente_id=cliente.id, **datos)
+    session.add(reserva)
+    SQLAlchemyDisponibilidadRepository(session).incrementar_version(recurso_id)
+    session.flush()
+    session.refresh(reserva)
+
+
+def flujo_cte(session, user_id: int, recurso_id: int) -> None:
+    SQLAlchemyReservaRepository(session).crear_si_disponible(user_id, datos_reserva(recurso_id))
+
+
+def medir(flujo, user_id: int, recurso_id: int, iteraciones: int):
+    sentencias = [0]
+
+    def contar(*args):
+        sentencias[0] += 1
+
+    tiempos = []
+    event.listen(engine, 'before_cursor_execute', contar)
+    try:
+        for _ in range(iteraciones):
+            session = SessionLocal()
+            try:
+                inicio = _time.perf_counter()
+                flujo(session, user_id, recurso_id)
+                tiempos.append((_time.perf_counter() - inicio) * 1000)
+            finally:
+                session.rollback()
+                session.close()
+    finally:
+        event.remove(engine, 'before_cursor_execute', contar)
+
+    tiempos.sort()
+    return (
+        statistics.median(tiempos),
+        tiempos[int(len(tiempos) * 0.95) - 1],
+        sentencias[0] / iteraciones
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--user-id", type=int, required=True, help="Usuario con perfil de cliente")
+    parser.add_argument("--recurso-id", type=int, required=True)
+    parser.add_argument("--iteraciones", type=int, default=500)
+    args = parser.parse_args()
+
+    # Calentar el pool y el cache de sentencias
+    medir(flujo_anterior, args.user_id, args.recurso_id, 20)
+    medir(flujo_cte, args.user_id, args.recurso_id, 20)
+
+    print(f"{'flujo':<16}{'p50 (ms)':>10}{'p95 (ms)':>10}{'sentencias':>12}")
+    for nombre, flujo in [("anterior", flujo_anterior), ("cte", flujo_cte)]:
+        p50, p95, sentencias = medir(flujo, args.user_id, args.recurso_id, args.iteraciones)
+        print(f"{nombre:<16}{p50:>10.2f}{p95:>10.2f}{sentencias:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
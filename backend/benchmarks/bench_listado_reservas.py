@@ -0,0 +1,149 @@
+"""
+Benchmark: armar un listado de ReservaDetailResponse cargando entidades
+ReservaModel completas (y copiando campo por campo) contra la consulta por
+columnas de los listados (`_consulta_detalle` + `_detalles`).
+
+Necesita una base PostgreSQL real (DATABASE_URL) con un cliente y un recurso
+existentes. Inserta las reservas de prueba en una transacción que termina en
+ROLLBACK, así que no deja nada. Las reservas llevan notas internas y motivo
+de cancelación, que el listado no muestra pero la entidad completa sí carga.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_listado_reservas --cliente-id 1 --recurso-id 1
+    python -m benchmarks.bench_listado_reservas --cliente-id 1 --recurso-id 1 --filas 1000 10000 50000
+"""
+import argparse
+import statistics
+import time as _time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.api.v1.routers.reserva_router import _consulta_detalle, _detalles
+from app.application.schemas.reserva_schemas import ReservaDetailResponse
+from app.infrastructure.db.database import SessionLocal
+from app.infrastructure.db.models.cliente_model import ClienteModel
+from app.infrastructure.db.models.recurso_model import RecursoModel
+from app.infrastructure.db.models.reserva_model import ReservaModel
+from app.infrastructure.db.models.servicio_model import ServicioModel
+
+# Lejos en el futuro para no mezclarse con reservas reales
+BASE = datetime(2099, 1, 1)
+
+
+def insertar(session, cliente_id: int, recurso_id: int, filas: int) -> None:
+    session.execute(insert(ReservaModel), [
+        {
+            'cliente_id': cliente_id,
+            'recurso_id': recurso_id,
+            'fecha_hora_inicio': BASE + timedelta(hours=i),
+            'fecha_hora_fin': BASE + timedelta(hours=i, minutes=60),
+            'duracion_minutos': 60,
+            # Canceladas: no entran en la restricción de no solapamiento
+            'estado': 'cancelada',
+            'precio_total': 5000.0,
+            'saldo_pendiente': 5000.0,
+            'notas_cliente': 'Traigo pelota',
+            'notas_internas': 'Cliente frecuente, cobrar en efectivo. ' * 10,
+            'motivo_cancelacion': 'Lluvia',
+            'created_at': BASE,
+            'updated_at': BASE
+        }
+        for i in range(filas)
+    ])
+
+
+def por_entidades(session, cliente_id: int):
+    resultados = session.query(
+        ReservaModel,
+        RecursoModel.nombre.label('recurso_nombre'),
+        ServicioModel.nombre.label('servicio_nombre'),
+        ClienteModel.nombre.label('cliente_nombre')
+    ).join(
+        RecursoModel, ReservaModel.recurso_id == RecursoModel.id
+    ).join(
+        ServicioModel, RecursoModel.servicio_id == ServicioModel.id
+    ).join(
+        ClienteModel, ReservaModel.cliente_id == ClienteModel.id
+    ).filter(
+        ReservaModel.cliente_id == cliente_id,
+        ReservaModel.fecha_hora_inicio >= BASE
+    ).order_by(ReservaModel.fecha_hora_inicio).all()
+
+    return [
+        ReservaDetailResponse(
+            id=r.ReservaModel.id,
+            cliente_id=r.ReservaModel.cliente_id,
+            recurso_id=r.ReservaModel.recurso_id,
+            fecha_hora_inicio=r.ReservaModel.fecha_hora_inicio,
+            fecha_hora_fin=r.ReservaModel.fecha_hora_fin,
+            duracion_minutos=r.ReservaModel.duracion_minutos,
+            estado=r.ReservaModel.estado,
+            precio_total=r.ReservaModel.precio_total,
+            seña=r.ReservaModel.seña,
+            saldo_pendiente=r.ReservaModel.saldo_pendiente,
+            pago_completo=r.ReservaModel.pago_completo,
+            notas_cliente=r.ReservaModel.notas_cliente,
+            version=r.ReservaModel.version,
+            created_at=r.ReservaModel.created_at,
+            recurso_nombre=r.recurso_nombre,
+            servicio_nombre=r.servicio_nombre,
+            cliente_nombre=r.cliente_nombre
+        )
+        for r in resultados
+    ]
+
+
+def por_columnas(session, cliente_id: int):
+    return _detalles(_consulta_detalle(session).filter(
+        ReservaModel.cliente_id == cliente_id,
+        ReservaModel.fecha_hora_inicio >= BASE
+    ).order_by(ReservaModel.fecha_hora_inicio).all())
+
+
+def medir(session, camino, cliente_id: int, repeticiones: int):
+    """Mediana en ms y pico de memoria en MB (medido aparte, con tracemalloc)"""
+    tiempos = []
+    for _ in range(repeticiones):
+        # Mapa de identidad vacío, como en una request nueva
+        session.expunge_all()
+        inicio = _time.perf_counter()
+        respuesta = camino(session, cliente_id)
+        tiempos.append((_time.perf_counter() - inicio) * 1000)
+        del respuesta
+
+    session.expunge_all()
+    tracemalloc.start()
+    respuesta = camino(session, cliente_id)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return statistics.median(tiempos), pico / 1e6, len(respuesta)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cliente-id", type=int, required=True)
+    parser.add_argument("--recurso-id", type=int, required=True)
+    parser.add_argument("--filas", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'filas':>7} {'camino':<10} {'p50 (ms)':>10} {'pico (MB)':>10}")
+    for filas in args.filas:
+        session = SessionLocal()
+        try:
+            insertar(session, args.cliente_id, args.recurso_id, filas)
+            assert por_entidades(session, args.cliente_id) == por_columnas(session, args.cliente_id)
+
+            for nombre, camino in [("entidades", por_entidades), ("columnas", por_columnas)]:
+                p50, pico, cantidad = medir(session, camino, args.cliente_id, args.repeticiones)
+                print(f"{cantidad:>7} {nombre:<10} {p50:>10.1f} {pico:>10.1f}")
+        finally:
+            session.rollback()
+            session.close()
+
+
+if __name__ == "__main__":
+    main()
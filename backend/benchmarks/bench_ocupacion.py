@@ -0,0 +1,76 @@
+"""
+Benchmark: búsqueda de huecos libres con el mapa de ocupación (bitmaps)
+contra el enfoque de "una verificación de solapamiento por candidato".
+
+El enfoque actual hace un COUNT con el predicado de solapamiento por cada
+horario candidato; acá se simula ese predicado en memoria recorriendo las
+reservas, sin contar el round trip a la base (que solo lo empeora).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_ocupacion
+"""
+import random
+import timeit
+from datetime import date, datetime, time, timedelta
+
+from app.domain.services.disponibilidad import Franja, Intervalo
+from app.domain.services.ocupacion import MapaOcupacion
+from app.domain.services.plantilla_semanal import PlantillaSemanal
+
+DESDE = date(2026, 1, 5)
+HASTA = DESDE + timedelta(days=6)
+DURACION = 90
+QUANTUM = 15
+
+
+def generar_datos(reservas_por_dia: int):
+    plantilla = PlantillaSemanal({
+        dia: [Franja(time(8), time(19), 5000, 60), Franja(time(19), time(23, 59), 8000, 60)]
+        for dia in range(7)
+    })
+    rnd = random.Random(42)
+    ocupados = []
+    for d in range(7):
+        base = datetime.combine(DESDE + timedelta(days=d), time(8))
+        for h in rnd.sample(range(15), min(reservas_por_dia, 15)):
+            inicio = base + timedelta(hours=h)
+            ocupados.append(Intervalo(inicio, inicio + timedelta(hours=1)))
+    return plantilla, ocupados
+
+
+def huecos_por_candidato(plantilla: PlantillaSemanal, ocupados):
+    duracion = timedelta(minutes=DURACION)
+    huecos = []
+    dia = DESDE
+    while dia <= HASTA:
+        inicio = datetime.combine(dia, time.min)
+        for _ in range(24 * 60 // QUANTUM):
+            fin = inicio + duracion
+            if plantilla.abierto_entre(inicio, fin) and not any(
+                o.inicio < fin and o.fin > inicio for o in ocupados
+            ):
+                huecos.append(inicio)
+            inicio += timedelta(minutes=QUANTUM)
+        dia += timedelta(days=1)
+    return huecos
+
+
+def huecos_bitmap(plantilla: PlantillaSemanal, ocupados):
+    mapa = MapaOcupacion.construir(DESDE, HASTA, plantilla, ocupados, QUANTUM)
+    return mapa.huecos_libres(DURACION)
+
+
+def main():
+    print(f"{'reservas/día':>13} {'por candidato (ms)':>19} {'bitmap (ms)':>12} {'speedup':>8}")
+    for reservas_por_dia in (2, 8, 15):
+        plantilla, ocupados = generar_datos(reservas_por_dia)
+        assert huecos_por_candidato(plantilla, ocupados) == huecos_bitmap(plantilla, ocupados)
+
+        n = 20
+        t_loop = timeit.timeit(lambda: huecos_por_candidato(plantilla, ocupados), number=n) / n
+        t_bits = timeit.timeit(lambda: huecos_bitmap(plantilla, ocupados), number=n) / n
+        print(f"{reservas_por_dia:>13} {t_loop * 1000:>19.2f} {t_bits * 1000:>12.3f} {t_loop / t_bits:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
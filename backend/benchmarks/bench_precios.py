@@ -0,0 +1,61 @@
+"""
+Benchmark: tarifar muchos horarios candidatos de una vez con
+`PlantillaSemanal.precios_entre` contra una llamada a `precio_entre` por
+candidato (que valida el horario rotando el bitmap de la semana cada vez).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_precios
+"""
+import timeit
+from datetime import datetime, time, timedelta
+
+from app.domain.services.disponibilidad import Franja
+from app.domain.services.plantilla_semanal import PlantillaSemanal
+
+DESDE = datetime(2026, 1, 5)
+QUANTUM = 15
+
+
+def generar_plantilla() -> PlantillaSemanal:
+    return PlantillaSemanal({
+        dia: [
+            Franja(time(8), time(12), 4000, 60),
+            Franja(time(12), time(19), 5000, 60),
+            Franja(time(19), time(23, 59), 8000, 90)
+        ]
+        for dia in range(7)
+    })
+
+
+def candidatos(dias: int):
+    return [DESDE + timedelta(minutes=QUANTUM * i) for i in range(dias * 24 * 60 // QUANTUM)]
+
+
+def por_candidato(plantilla: PlantillaSemanal, inicios, duracion_minutos: int):
+    duracion = timedelta(minutes=duracion_minutos)
+    return [plantilla.precio_entre(inicio, inicio + duracion) for inicio in inicios]
+
+
+def vectorizado(plantilla: PlantillaSemanal, inicios, duracion_minutos: int):
+    return plantilla.precios_entre(inicios, duracion_minutos)
+
+
+def main():
+    plantilla = generar_plantilla()
+    print(f"{'días':>5} {'duración':>9} {'candidatos':>11} {'por candidato (ms)':>19} {'vectorizado (ms)':>17} {'speedup':>8}")
+    for dias in (1, 7, 31):
+        inicios = candidatos(dias)
+        for duracion_minutos in (60, 120):
+            assert por_candidato(plantilla, inicios, duracion_minutos) == vectorizado(plantilla, inicios, duracion_minutos)
+
+            n = 20
+            t_loop = timeit.timeit(lambda: por_candidato(plantilla, inicios, duracion_minutos), number=n) / n
+            t_vec = timeit.timeit(lambda: vectorizado(plantilla, inicios, duracion_minutos), number=n) / n
+            print(
+                f"{dias:>5} {duracion_minutos:>9} {len(inicios):>11} "
+                f"{t_loop * 1000:>19.2f} {t_vec * 1000:>17.3f} {t_loop / t_vec:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: latencia de un endpoint que devuelve una lista de
+ReservaDetailResponse, con el camino normal de FastAPI (re-validación contra
+response_model y serialización estándar) contra el modo RESPUESTAS_RAPIDAS
+(`respuestas.lista`: adaptador cacheado y orjson).
+
+No toca la base, pero importa la configuración: DATABASE_URL tiene que
+estar definida (en el entorno o en .env).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_respuestas
+    python -m benchmarks.bench_respuestas --items 1000 10000 --repeticiones 50
+"""
+import argparse
+import statistics
+import time as _time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import respuestas
+from app.application.schemas.reserva_schemas import ReservaDetailResponse
+from app.core.config import settings
+
+INICIO = datetime(2026, 1, 5, 8)
+
+
+def generar(cantidad: int) -> List[ReservaDetailResponse]:
+    return [
+        ReservaDetailResponse(
+            id=i,
+            cliente_id=i % 300,
+            recurso_id=i % 12,
+            fecha_hora_inicio=INICIO + timedelta(hours=i),
+            fecha_hora_fin=INICIO + timedelta(hours=i + 1),
+            duracion_minutos=60,
+            estado='confirmada',
+            precio_total=5000.0,
+            seña=1000.0,
+            saldo_pendiente=4000.0,
+            pago_completo=False,
+            notas_cliente=None,
+            version=1,
+            created_at=INICIO,
+            recurso_nombre=f"Cancha {i % 12}",
+            servicio_nombre="Fútbol 5",
+            cliente_nombre="Juan Pérez"
+        )
+        for i in range(cantidad)
+    ]
+
+
+def armar_app(items: List[ReservaDetailResponse]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/normal', response_model=List[ReservaDetailResponse])
+    def normal():
+        return items
+
+    @app.get('/rapida', response_model=List[ReservaDetailResponse])
+    def rapida():
+        return respuestas.lista(ReservaDetailResponse, items)
+
+    return app
+
+
+def medir(client: TestClient, url: str, repeticiones: int):
+    client.get(url)
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = _time.perf_counter()
+        respuesta = client.get(url)
+        tiempos.append((_time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos), respuesta.json()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    if not respuestas.orjson:
+        raise SystemExit("orjson no está instalado")
+
+    # Solo la ruta /rapida pasa por respuestas.lista
+    settings.respuestas_rapidas = True
+
+    print(f"{'items':>7} {'normal (ms)':>12} {'rápida (ms)':>12} {'speedup':>8}")
+    for cantidad in args.items:
+        client = TestClient(armar_app(generar(cantidad)))
+        t_normal, normal = medir(client, '/normal', args.repeticiones)
+        t_rapida, rapida = medir(client, '/rapida', args.repeticiones)
+        assert normal == rapida
+        print(f"{cantidad:>7} {t_normal:>12.1f} {t_rapida:>12.1f} {t_normal / t_rapida:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+import os
+
+# Los módulos de app leen la configuración al importarse; los tests no usan la base real
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta, timezone
+
+from app.domain.services.bloqueos import BloqueosRecurso
+from app.domain.services.disponibilidad import Intervalo
+from app.infrastructure.cache import bloqueos as modulo
+from app.infrastructure.cache.bloqueos import BloqueosCache
+
+ENERO = datetime(2026, 1, 1)
+
+
+def _d(dia: int, hora: int = 0) -> datetime:
+    return ENERO + timedelta(days=dia - 1, hours=hora)
+
+
+def _cargador(bloqueos):
+    """Simula get_bloqueos_recursos y registra cada ventana pedida"""
+    llamadas = []
+
+    def cargar(recurso_ids, desde, hasta):
+        llamadas.append((sorted(recurso_ids), desde, hasta))
+        return {
+            recurso_id: [b for b in bloqueos.get(recurso_id, []) if b.inicio < hasta and b.fin > desde]
+            for recurso_id in recurso_ids
+        }
+
+    return cargar, llamadas
+
+
+def test_fusiona_bloqueos_que_se_pisan():
+    bloqueos = BloqueosRecurso([
+        Intervalo(_d(5), _d(12)),
+        Intervalo(_d(1), _d(10)),
+        Intervalo(_d(20), _d(21)),
+    ])
+
+    assert [(b.inicio, b.fin) for b in bloqueos.bloques] == [(_d(1), _d(12)), (_d(20), _d(21))]
+
+
+def test_bloquea_con_intervalos_semiabiertos():
+    bloqueos = BloqueosRecurso([Intervalo(_d(1), _d(10)), Intervalo(_d(20), _d(21))])
+
+    assert bloqueos.bloquea(_d(9), _d(11))
+    assert bloqueos.bloquea(_d(10) - timedelta(minutes=1), _d(10))
+    assert not bloqueos.bloquea(_d(10), _d(20))
+    assert not bloqueos.bloquea(_d(0), _d(1))
+    assert bloqueos.bloquea(_d(9).replace(tzinfo=timezone.utc), _d(11).replace(tzinfo=timezone.utc))
+
+
+def test_en_rango():
+    bloqueos = BloqueosRecurso([Intervalo(_d(1), _d(10)), Intervalo(_d(20), _d(21))])
+
+    assert len(bloqueos.en_rango(_d(10), _d(20))) == 0
+    assert len(bloqueos.en_rango(_d(9), _d(20))) == 1
+    assert len(bloqueos.en_rango(_d(9), _d(20, 1))) == 2
+    assert len(bloqueos.en_rango(_d(21), _d(30))) == 0
+
+
+def test_cache_solo_responde_dentro_de_la_ventana_cargada():
+    cargar, llamadas = _cargador({1: [Intervalo(_d(2, 10), _d(2, 12)), Intervalo(_d(40, 10), _d(40, 12))]})
+    cache = BloqueosCache(horizonte_dias=7)
+
+    # Una fecha lejos de hoy se carga tal cual se pidió
+    assert cache.obtener(1, _d(2), _d(3), cargar).bloquea(_d(2, 11), _d(2, 12))
+    assert cache.obtener(1, _d(2, 8), _d(2, 20), cargar).bloquea(_d(2, 11), _d(2, 12))
+    assert len(llamadas) == 1
+
+    # Fuera de la ventana se vuelve a cargar
+    assert cache.obtener(1, _d(40), _d(41), cargar).bloquea(_d(40, 11), _d(40, 12))
+    assert llamadas[-1] == ([1], _d(40), _d(41))
+
+
+def test_cache_amplia_la_ventana_al_horizonte():
+    hoy = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    cargar, llamadas = _cargador({})
+    cache = BloqueosCache(horizonte_dias=7)
+
+    cache.obtener(1, hoy + timedelta(days=2), hoy + timedelta(days=3), cargar)
+    assert llamadas == [([1], hoy - timedelta(days=1), hoy + timedelta(days=8))]
+
+    # El resto del horizonte ya está cargado
+    cache.obtener(1, hoy - timedelta(hours=3), hoy + timedelta(days=7), cargar)
+    assert len(llamadas) == 1
+
+
+def test_cache_obtener_varias_carga_solo_los_faltantes():
+    cargar, llamadas = _cargador({2: [Intervalo(_d(2, 10), _d(2, 12))]})
+    cache = BloqueosCache()
+    cache.obtener(1, _d(2), _d(3), cargar)
+
+    bloqueos = cache.obtener_varias([1, 2], _d(2), _d(3), cargar)
+
+    assert llamadas[-1] == ([2], _d(2), _d(3))
+    assert not bloqueos[1].bloques
+    assert bloqueos[2].bloquea(_d(2, 10), _d(2, 11))
+
+
+def test_cache_version_invalidacion_y_ttl(monkeypatch):
+    reloj = [100.0]
+    monkeypatch.setattr(modulo._time, 'monotonic', lambda: reloj[0])
+    cargar, llamadas = _cargador({})
+    cache = BloqueosCache(ttl_segundos=60)
+
+    cache.obtener(1, _d(2), _d(3), cargar, version=1)
+    cache.obtener(1, _d(2), _d(3), cargar, version=1)
+    assert len(llamadas) == 1
+
+    cache.obtener(1, _d(2), _d(3), cargar, version=2)
+    assert len(llamadas) == 2
+
+    cache.invalidar(1)
+    cache.obtener(1, _d(2), _d(3), cargar, version=2)
+    assert len(llamadas) == 3
+
+    reloj[0] += 61
+    cache.obtener(1, _d(2), _d(3), cargar, version=2)
+    assert len(llamadas) == 4
+
+
+def test_cache_no_guarda_una_carga_anterior_a_una_invalidacion():
+    cache = BloqueosCache()
+
+    def cargar_e_invalidar(recurso_ids, desde, hasta):
+        # Un bloqueo nuevo llega mientras se está cargando
+        cache.invalidar(1)
+        return {}
+
+    cache.obtener(1, _d(2), _d(3), cargar_e_invalidar)
+    cargar, llamadas = _cargador({1: [Intervalo(_d(2, 10), _d(2, 12))]})
+
+    assert cache.obtener(1, _d(2), _d(3), cargar).bloquea(_d(2, 10), _d(2, 11))
+    assert len(llamadas) == 1
@@ -0,0 +1,102 @@
+from datetime import date, datetime, timedelta
+
+from app.domain.services.disponibilidad import Slot
+from app.infrastructure.cache import disponibilidad_cache as modulo
+from app.infrastructure.cache.disponibilidad_cache import DisponibilidadCache
+
+LUNES = date(2026, 10, 19)
+
+
+def _slots(dia: date):
+    inicio = datetime(dia.year, dia.month, dia.day, 10)
+    return [Slot(inicio=inicio, fin=inicio + timedelta(hours=1), precio=5000, disponible=True)]
+
+
+def _guardar(cache: DisponibilidadCache, recurso_id: int, dia: date) -> None:
+    cache.guardar(recurso_id, dia, _slots(dia), cache.generacion(recurso_id))
+
+
+def test_guarda_y_devuelve():
+    cache = DisponibilidadCache()
+    _guardar(cache, 1, LUNES)
+
+    assert cache.obtener(1, LUNES) == _slots(LUNES)
+    assert cache.obtener(1, LUNES + timedelta(days=1)) is None
+    assert cache.obtener(2, LUNES) is None
+
+
+def test_no_guarda_un_calculo_anterior_a_una_invalidacion():
+    cache = DisponibilidadCache()
+    generacion = cache.generacion(1)
+
+    cache.invalidar_recurso(1)
+    cache.guardar(1, LUNES, _slots(LUNES), generacion)
+
+    assert cache.obtener(1, LUNES) is None
+
+
+def test_invalidar_intervalo_solo_toca_las_fechas_del_intervalo():
+    cache = DisponibilidadCache()
+    for i in range(4):
+        _guardar(cache, 1, LUNES + timedelta(days=i))
+    _guardar(cache, 2, LUNES)
+
+    # [lunes 23:00, miércoles 00:00) toca lunes y martes, no el miércoles
+    inicio = datetime(2026, 10, 19, 23)
+    cache.invalidar_intervalo(1, inicio, inicio + timedelta(hours=1, days=1))
+
+    assert cache.obtener(1, LUNES) is None
+    assert cache.obtener(1, LUNES + timedelta(days=1)) is None
+    assert cache.obtener(1, LUNES + timedelta(days=2)) is not None
+    assert cache.obtener(2, LUNES) is not None
+
+
+def test_invalidar_recurso():
+    cache = DisponibilidadCache()
+    _guardar(cache, 1, LUNES)
+    _guardar(cache, 1, LUNES + timedelta(days=1))
+    _guardar(cache, 2, LUNES)
+
+    cache.invalidar_recurso(1)
+
+    assert cache.obtener(1, LUNES) is None
+    assert cache.obtener(1, LUNES + timedelta(days=1)) is None
+    assert cache.obtener(2, LUNES) is not None
+
+
+def test_lru_y_ttl(monkeypatch):
+    reloj = [100.0]
+    monkeypatch.setattr(modulo._time, 'monotonic', lambda: reloj[0])
+
+    cache = DisponibilidadCache(max_entradas=2, ttl_segundos=60)
+    _guardar(cache, 1, LUNES)
+    _guardar(cache, 2, LUNES)
+    cache.obtener(1, LUNES)
+    _guardar(cache, 3, LUNES)
+
+    # Se descarta la menos usada (recurso 2)
+    assert cache.obtener(2, LUNES) is None
+    assert cache.obtener(1, LUNES) is not None
+
+    reloj[0] += 61
+    assert cache.obtener(1, LUNES) is None
+
+
+def test_descarta_entradas_de_otra_version():
+    cache = DisponibilidadCache()
+    cache.guardar(1, LUNES, _slots(LUNES), cache.generacion(1), version=3)
+
+    assert cache.obtener(1, LUNES, version=3) == _slots(LUNES)
+    assert cache.obtener(1, LUNES, version=4) is None
+    # La entrada obsoleta ya no está
+    assert cache.obtener(1, LUNES) is None
+
+
+def test_descarta_entradas_con_otro_vencimiento_de_retenciones():
+    vence = datetime(2026, 10, 19, 20, 10)
+    cache = DisponibilidadCache()
+    cache.guardar(1, LUNES, _slots(LUNES), cache.generacion(1), version=3, vence=vence)
+
+    assert cache.obtener(1, LUNES, version=3, vence=vence) == _slots(LUNES)
+    # La retención venció: misma versión, otro próximo vencimiento
+    assert cache.obtener(1, LUNES, version=3) is None
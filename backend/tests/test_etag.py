@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+from app.api.v1.etag import coincide, etag_recurso
+
+
+def test_etag_recurso_cambia_con_la_version():
+    assert etag_recurso(7, 3) == 'W/"recurso-7-v3"'
+    assert etag_recurso(7, 3) != etag_recurso(7, 4)
+    assert etag_recurso(7, 3) != etag_recurso(8, 3)
+
+
+def test_coincide_sin_header():
+    assert not coincide(None, etag_recurso(1, 1))
+    assert not coincide('', etag_recurso(1, 1))
+
+
+def test_coincide_comparacion_debil():
+    etag = etag_recurso(1, 2)
+
+    assert coincide(etag, etag)
+    assert coincide('"recurso-1-v2"', etag)
+    assert not coincide(etag_recurso(1, 1), etag)
+
+
+def test_coincide_lista_y_comodin():
+    etag = etag_recurso(1, 2)
+
+    assert coincide(f'{etag_recurso(1, 1)}, {etag}', etag)
+    assert not coincide(f'{etag_recurso(1, 1)}, {etag_recurso(2, 2)}', etag)
+    assert coincide(' * ', etag)
+
+
+def test_etag_recurso_cambia_con_el_vencimiento_de_retenciones():
+    vence = datetime(2026, 10, 19, 20, 10)
+
+    assert etag_recurso(1, 2, vence) != etag_recurso(1, 2)
+    assert etag_recurso(1, 2, vence) != etag_recurso(1, 2, vence + timedelta(seconds=1))
+    assert coincide(etag_recurso(1, 2, vence), etag_recurso(1, 2, vence))
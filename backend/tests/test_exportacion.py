@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1 import exportacion as modulo
+from app.api.v1.exportacion import _celda_csv, exportar_filas
+
+metadata = MetaData()
+reservas = Table(
+    'reservas_export',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('cliente', String),
+    Column('fecha_hora_inicio', DateTime),
+)
+
+
+@pytest.fixture
+def base(monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    metadata.create_all(engine)
+    with engine.begin() as conexion:
+        conexion.execute(insert(reservas), [
+            {'id': 1, 'cliente': '=HYPERLINK("http://x")', 'fecha_hora_inicio': datetime(2026, 10, 19, 20)},
+            {'id': 2, 'cliente': 'Ana', 'fecha_hora_inicio': datetime(2026, 10, 19, 21)},
+            {'id': 3, 'cliente': '-1+2', 'fecha_hora_inicio': datetime(2026, 10, 19, 22)},
+        ])
+    monkeypatch.setattr(modulo, 'SessionLocal', sessionmaker(bind=engine))
+    monkeypatch.setattr(modulo, 'FILAS_POR_LOTE', 2)
+    yield
+    engine.dispose()
+
+
+@pytest.mark.parametrize('valor', ['=1+1', '+54 11', '-3', '@SUM(A1)', '\tx', '\rx'])
+def test_celda_csv_neutraliza_formulas(valor):
+    assert _celda_csv(valor) == "'" + valor
+
+
+@pytest.mark.parametrize('valor', ['Ana', 'a=b', '', 5, -3, None, datetime(2026, 10, 19)])
+def test_celda_csv_deja_el_resto_igual(valor):
+    assert _celda_csv(valor) == valor
+
+
+def test_exportar_csv(base):
+    partes = list(exportar_filas(select(reservas).order_by(reservas.c.id), 'csv'))
+
+    # Encabezado y luego un trozo por lote
+    assert len(partes) == 3
+    filas = list(csv.reader(io.StringIO(''.join(partes))))
+    assert filas[0] == ['id', 'cliente', 'fecha_hora_inicio']
+    assert [f[1] for f in filas[1:]] == ["'=HYPERLINK(\"http://x\")", 'Ana', "'-1+2"]
+
+
+def test_exportar_ndjson_no_escapa(base):
+    lineas = ''.join(exportar_filas(select(reservas).order_by(reservas.c.id), 'ndjson')).splitlines()
+
+    assert [json.loads(l) for l in lineas][0] == {
+        'id': 1,
+        'cliente': '=HYPERLINK("http://x")',
+        'fecha_hora_inicio': '2026-10-19T20:00:00',
+    }
+    assert len(lineas) == 3
@@ -0,0 +1,108 @@
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from app.api.v1 import idempotencia as api
+from app.infrastructure.cache import idempotencia as modulo
+from app.infrastructure.cache.idempotencia import ClaveEnCurso, ClaveReutilizada, IdempotenciaStore
+
+
+class _Pedido(BaseModel):
+    recurso_id: int
+    duracion_minutos: int = 60
+
+
+def test_reintento_devuelve_la_respuesta_guardada():
+    store = IdempotenciaStore()
+
+    assert store.iniciar('k', 'h1') is None
+    store.completar('k', 201, {'id': 7})
+
+    previa = store.iniciar('k', 'h1')
+    assert (previa.status_code, previa.cuerpo) == (201, {'id': 7})
+
+
+def test_clave_en_curso_y_reutilizada():
+    store = IdempotenciaStore()
+    store.iniciar('k', 'h1')
+
+    with pytest.raises(ClaveEnCurso):
+        store.iniciar('k', 'h1')
+    with pytest.raises(ClaveReutilizada):
+        store.iniciar('k', 'h2')
+
+    store.completar('k', 201, {})
+    with pytest.raises(ClaveReutilizada):
+        store.iniciar('k', 'h2')
+
+
+def test_liberar_solo_olvida_claves_en_curso():
+    store = IdempotenciaStore()
+    store.iniciar('falla', 'h1')
+    store.iniciar('ok', 'h1')
+    store.completar('ok', 201, {'id': 1})
+
+    store.liberar('falla')
+    store.liberar('ok')
+
+    assert store.iniciar('falla', 'h2') is None
+    assert store.iniciar('ok', 'h1').status_code == 201
+
+
+def test_acotado_y_vencimiento(monkeypatch):
+    reloj = [100.0]
+    monkeypatch.setattr(modulo._time, 'monotonic', lambda: reloj[0])
+    store = IdempotenciaStore(max_entradas=2, ttl_segundos=60)
+
+    for clave in ('a', 'b', 'c'):
+        store.iniciar(clave, 'h')
+        store.completar(clave, 201, clave)
+
+    # Se descartó la más vieja
+    assert store.iniciar('a', 'h') is None
+    assert store.iniciar('c', 'h').cuerpo == 'c'
+
+    reloj[0] += 61
+    assert store.iniciar('c', 'otra') is None
+
+
+def test_iniciar_sin_header():
+    assert api.iniciar(None, 1, 'crear', _Pedido(recurso_id=1)) == (None, None)
+
+
+def test_iniciar_mapea_errores_y_reproduce_la_respuesta():
+    pedido = _Pedido(recurso_id=1)
+    clave, respuesta = api.iniciar('test-1', 1001, 'crear', pedido)
+    assert clave == (1001, 'crear', 'test-1') and respuesta is None
+
+    with pytest.raises(HTTPException) as error:
+        api.iniciar('test-1', 1001, 'crear', pedido)
+    assert error.value.status_code == 409
+
+    api.completar(clave, 201, {'id': 5})
+
+    _, respuesta = api.iniciar('test-1', 1001, 'crear', pedido)
+    assert respuesta.status_code == 201
+    assert respuesta.body == b'{"id":5}'
+    assert respuesta.headers['Idempotent-Replayed'] == 'true'
+
+    with pytest.raises(HTTPException) as error:
+        api.iniciar('test-1', 1001, 'crear', _Pedido(recurso_id=2))
+    assert error.value.status_code == 422
+
+    # La clave es por usuario y operación
+    assert api.iniciar('test-1', 1002, 'crear', pedido)[1] is None
+    assert api.iniciar('test-1', 1001, 'serie', pedido)[1] is None
+
+
+def test_los_extras_forman_parte_de_la_huella():
+    pedido = _Pedido(recurso_id=1)
+    clave, _ = api.iniciar('test-2', 1001, 'cancelar', pedido, 10)
+    api.liberar(clave)
+
+    clave, _ = api.iniciar('test-2', 1001, 'cancelar', pedido, 10)
+    api.completar(clave, 200, {'ok': True})
+
+    with pytest.raises(HTTPException) as error:
+        api.iniciar('test-2', 1001, 'cancelar', pedido, 11)
+    assert error.value.status_code == 422
@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+
+from app.domain.services.disponibilidad import Intervalo
+from app.infrastructure.cache import indice_reservas as modulo
+from app.infrastructure.cache.indice_reservas import IndiceReservas
+
+LUNES = datetime(2026, 10, 19)
+
+
+def _h(hora: int, minuto: int = 0) -> datetime:
+    return LUNES.replace(hour=hora, minute=minuto)
+
+
+def _indice() -> IndiceReservas:
+    indice = IndiceReservas()
+    indice.cargar(1, [
+        Intervalo(_h(14), _h(15), reserva_id=2),
+        Intervalo(_h(10), _h(11), reserva_id=1),
+    ])
+    return indice
+
+
+def test_sin_cargar_devuelve_none():
+    indice = IndiceReservas()
+
+    assert not indice.esta_cargado(1)
+    assert indice.hay_conflicto(1, _h(10), _h(11)) is None
+
+
+def test_conflictos_con_intervalos_semiabiertos():
+    indice = _indice()
+
+    assert indice.hay_conflicto(1, _h(10, 30), _h(11, 30))
+    assert indice.hay_conflicto(1, _h(9), _h(16))
+    assert not indice.hay_conflicto(1, _h(11), _h(14))
+    assert not indice.hay_conflicto(1, _h(9), _h(10))
+    assert not indice.hay_conflicto(1, _h(15), _h(16))
+
+
+def test_normaliza_datetimes_con_zona():
+    indice = _indice()
+
+    inicio = _h(10, 30).replace(tzinfo=timezone.utc)
+    assert indice.hay_conflicto(1, inicio, _h(11, 30).replace(tzinfo=timezone.utc))
+
+
+def test_agregar_y_quitar():
+    indice = _indice()
+
+    indice.agregar(1, Intervalo(_h(12), _h(13), reserva_id=3))
+    assert indice.hay_conflicto(1, _h(12, 30), _h(13, 30))
+
+    indice.quitar(1, 3)
+    assert not indice.hay_conflicto(1, _h(12, 30), _h(13, 30))
+
+    # En un recurso que no está cargado no se agrega nada
+    indice.agregar(2, Intervalo(_h(12), _h(13), reserva_id=4))
+    assert not indice.esta_cargado(2)
+
+
+def test_invalidar_y_vencimiento(monkeypatch):
+    reloj = [100.0]
+    monkeypatch.setattr(modulo._time, 'monotonic', lambda: reloj[0])
+
+    indice = IndiceReservas(ttl_segundos=60)
+    indice.cargar(1, [Intervalo(_h(10), _h(11), reserva_id=1)])
+    indice.cargar(2, [Intervalo(_h(10), _h(11), reserva_id=2)])
+
+    indice.invalidar(1)
+    assert indice.hay_conflicto(1, _h(10), _h(11)) is None
+    assert indice.hay_conflicto(2, _h(10), _h(11))
+
+    reloj[0] += 61
+    assert not indice.esta_cargado(2)
+    assert indice.hay_conflicto(2, _h(10), _h(11)) is None
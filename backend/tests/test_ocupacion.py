@@ -0,0 +1,80 @@
+from datetime import date, datetime, time, timedelta
+
+from app.domain.services.disponibilidad import Franja, Intervalo
+from app.domain.services.ocupacion import MapaOcupacion
+from app.domain.services.plantilla_semanal import PlantillaSemanal
+
+LUNES = date(2026, 10, 19)
+
+
+def _en(dia: date, hora: int, minuto: int = 0) -> datetime:
+    return datetime.combine(dia, time(hora, minuto))
+
+
+def _plantilla(franjas_por_dia):
+    return PlantillaSemanal({
+        dia: [Franja(time(hi), time(hf), precio, duracion) for hi, hf, precio, duracion in franjas]
+        for dia, franjas in franjas_por_dia.items()
+    })
+
+
+def test_minutos_abiertos_y_libres():
+    plantilla = _plantilla({0: [(10, 12, 5000, 60)], 1: [(10, 11, 5000, 60)]})
+    ocupados = [Intervalo(_en(LUNES, 10), _en(LUNES, 11))]
+
+    mapa = MapaOcupacion.construir(LUNES, LUNES + timedelta(days=1), plantilla, ocupados)
+
+    assert mapa.minutos_abiertos() == 180
+    assert mapa.minutos_libres() == 120
+
+
+def test_franjas_que_se_pisan_no_cuentan_doble():
+    plantilla = _plantilla({0: [(10, 14, 6000, 60), (12, 16, 3000, 60)]})
+
+    mapa = MapaOcupacion.construir(LUNES, LUNES, plantilla, [])
+
+    assert mapa.minutos_abiertos() == 6 * 60
+    assert mapa.esta_libre(_en(LUNES, 13), _en(LUNES, 15))
+
+
+def test_ocupado_redondea_hacia_afuera():
+    plantilla = _plantilla({0: [(10, 14, 5000, 60)]})
+    ocupados = [Intervalo(_en(LUNES, 11, 5), _en(LUNES, 11, 50))]
+
+    mapa = MapaOcupacion.construir(LUNES, LUNES, plantilla, ocupados)
+
+    assert not mapa.esta_libre(_en(LUNES, 11), _en(LUNES, 11, 15))
+    assert not mapa.esta_libre(_en(LUNES, 11, 45), _en(LUNES, 12))
+    assert mapa.esta_libre(_en(LUNES, 12), _en(LUNES, 13))
+    assert mapa.primer_hueco_libre(90, despues_de=_en(LUNES, 10)) == _en(LUNES, 12)
+
+
+def test_intervalo_parcialmente_cerrado():
+    plantilla = _plantilla({0: [(10, 12, 5000, 60), (13, 15, 5000, 60)]})
+
+    mapa = MapaOcupacion.construir(LUNES, LUNES, plantilla, [])
+
+    assert not mapa.esta_libre(_en(LUNES, 11), _en(LUNES, 14))
+    assert mapa.huecos_libres(120) == [
+        _en(LUNES, 10),
+        _en(LUNES, 13),
+    ]
+
+
+def test_huecos_en_grilla_a_traves_de_dias():
+    # Domingo 21-23 y lunes 10-12: la ventana cruza el cambio de semana
+    domingo = LUNES - timedelta(days=1)
+    plantilla = _plantilla({6: [(21, 23, 6000, 60)], 0: [(10, 12, 5000, 60)]})
+    ocupados = [Intervalo(_en(domingo, 22), _en(domingo, 23))]
+
+    mapa = MapaOcupacion.construir(domingo, LUNES, plantilla, ocupados)
+
+    assert mapa.huecos_libres(60, en_grilla=True) == [
+        _en(domingo, 21),
+        _en(LUNES, 10),
+        _en(LUNES, 11),
+    ]
+    assert mapa.huecos_libres(60, despues_de=_en(domingo, 21, 1), en_grilla=True) == [
+        _en(LUNES, 10),
+        _en(LUNES, 11),
+    ]
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+import pytest
+
+from app.api.v1.paginacion import codificar_cursor, decodificar_cursor
+
+
+def test_ida_y_vuelta():
+    for fecha in (datetime(2026, 10, 19, 20), datetime(2026, 10, 19, 20, 30, 15, 123456)):
+        for reserva_id in (1, 987654):
+            assert decodificar_cursor(codificar_cursor(fecha, reserva_id)) == (fecha, reserva_id)
+
+
+def test_cursor_seguro_para_urls():
+    cursor = codificar_cursor(datetime(2026, 10, 19, 20), 42)
+
+    assert '=' not in cursor
+    assert all(c.isalnum() or c in '-_' for c in cursor)
+
+
+@pytest.mark.parametrize('cursor', [
+    '',
+    'no-es-un-cursor',
+    codificar_cursor(datetime(2026, 10, 19), 1)[:-3],
+    'MjAyNi0xMC0xOVQyMDowMDowMHxhYmM',  # id no numérico
+    'MjAyNi0xMC0xOVQyMDowMDowMA',  # sin id
+])
+def test_cursor_invalido(cursor):
+    with pytest.raises(ValueError):
+        decodificar_cursor(cursor)
@@ -0,0 +1,82 @@
+from datetime import datetime, time, timedelta
+
+from app.domain.services.disponibilidad import Franja
+from app.domain.services.plantilla_semanal import PlantillaSemanal
+
+LUNES = datetime(2026, 10, 19)
+DOMINGO = datetime(2026, 10, 25)
+
+
+def _plantilla(franjas_por_dia):
+    return PlantillaSemanal({
+        dia: [Franja(time(hi), time(hf), precio, duracion) for hi, hf, precio, duracion in franjas]
+        for dia, franjas in franjas_por_dia.items()
+    })
+
+
+def test_precio_entre_prorratea_entre_franjas():
+    plantilla = _plantilla({0: [(10, 19, 5000, 60), (19, 23, 8000, 60)]})
+
+    assert plantilla.precio_entre(LUNES.replace(hour=18), LUNES.replace(hour=20)) == 13000
+    assert plantilla.precio_entre(LUNES.replace(hour=18, minute=30), LUNES.replace(hour=19, minute=30)) == 6500
+    assert plantilla.precio_entre(LUNES.replace(hour=10), LUNES.replace(hour=11)) == 5000
+
+
+def test_franjas_que_se_pisan_gana_la_que_empieza_antes():
+    plantilla = _plantilla({0: [(12, 16, 3000, 60), (10, 14, 6000, 60)]})
+
+    assert plantilla.precio_en(LUNES.replace(hour=13)) == 6000
+    assert plantilla.precio_en(LUNES.replace(hour=15)) == 3000
+    assert plantilla.precio_entre(LUNES.replace(hour=13), LUNES.replace(hour=15)) == 9000
+
+    # Los slots de ambas franjas se tarifan con la misma tabla
+    precios = {s.inicio.hour: s.precio for s in plantilla.slots_del_dia(LUNES.date())}
+    assert precios[13] == 6000
+    assert precios[14] == 3000
+
+
+def test_intervalo_parcialmente_cerrado():
+    plantilla = _plantilla({0: [(10, 12, 5000, 60), (13, 15, 5000, 60)]})
+
+    assert plantilla.precio_entre(LUNES.replace(hour=11), LUNES.replace(hour=14)) is None
+    assert not plantilla.abierto_entre(LUNES.replace(hour=11), LUNES.replace(hour=14))
+    assert plantilla.precio_en(LUNES.replace(hour=12, minute=30)) is None
+    assert plantilla.precio_entre(LUNES.replace(hour=13), LUNES.replace(hour=15)) == 10000
+
+
+def test_vuelta_de_semana():
+    # Domingo abre hasta las 23:00 y lunes desde las 00:00: el domingo de 23:00 a 00:00 está cerrado
+    plantilla = _plantilla({6: [(20, 23, 6000, 60)], 0: [(0, 2, 3000, 60)]})
+
+    assert plantilla.precio_entre(DOMINGO.replace(hour=22), DOMINGO.replace(hour=23)) == 6000
+    assert plantilla.precio_entre(DOMINGO + timedelta(days=1), DOMINGO + timedelta(days=1, hours=1)) == 3000
+    assert plantilla.precio_entre(DOMINGO.replace(hour=22), DOMINGO + timedelta(days=1, hours=1)) is None
+
+    # El lunes siguiente usa la misma plantilla que el primero
+    assert plantilla.precio_en(LUNES + timedelta(days=7, hours=1)) == 3000
+
+
+def test_franja_invertida_se_ignora():
+    plantilla = _plantilla({0: [(20, 10, 5000, 60), (10, 12, 4000, 60)]})
+
+    assert plantilla.precio_en(LUNES.replace(hour=21)) is None
+    assert [s.inicio.hour for s in plantilla.slots_del_dia(LUNES.date())] == [10, 11]
+
+
+def test_precios_entre_coincide_con_precio_entre():
+    plantilla = _plantilla({
+        0: [(10, 19, 5000, 60), (19, 23, 8000, 60)],
+        1: [(10, 14, 6000, 60), (12, 16, 3000, 60)],
+        6: [(20, 23, 6000, 60)],
+    })
+    inicios = [LUNES + timedelta(minutes=30 * i) for i in range(7 * 48)]
+
+    for duracion in (30, 60, 90, 240):
+        esperados = [plantilla.precio_entre(i, i + timedelta(minutes=duracion)) for i in inicios]
+        assert plantilla.precios_entre(inicios, duracion) == esperados
+
+
+def test_precios_entre_duracion_invalida():
+    plantilla = _plantilla({0: [(10, 19, 5000, 60)]})
+
+    assert plantilla.precios_entre([LUNES.replace(hour=10)], 0) == [None]
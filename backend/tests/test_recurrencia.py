@@ -0,0 +1,37 @@
+from datetime import date, datetime, time
+
+from app.domain.services.recurrencia import MAX_OCURRENCIAS_SERIE, expandir_semanal
+
+LUNES = date(2026, 10, 19)
+
+
+def test_empieza_en_el_primer_dia_de_la_regla():
+    # Martes 20:00 a partir de un lunes
+    inicios = expandir_semanal(1, time(20), LUNES, cantidad=3)
+
+    assert inicios == [
+        datetime(2026, 10, 20, 20),
+        datetime(2026, 10, 27, 20),
+        datetime(2026, 11, 3, 20),
+    ]
+
+
+def test_desde_cae_en_el_dia_de_la_regla():
+    assert expandir_semanal(0, time(9), LUNES, cantidad=1) == [datetime(2026, 10, 19, 9)]
+
+
+def test_hasta_es_inclusivo():
+    inicios = expandir_semanal(0, time(9), LUNES, hasta=date(2026, 11, 2))
+
+    assert inicios == [datetime(2026, 10, 19, 9), datetime(2026, 10, 26, 9), datetime(2026, 11, 2, 9)]
+
+
+def test_gana_el_limite_que_llega_primero():
+    assert len(expandir_semanal(0, time(9), LUNES, cantidad=2, hasta=date(2026, 12, 31))) == 2
+    assert len(expandir_semanal(0, time(9), LUNES, cantidad=10, hasta=date(2026, 10, 26))) == 2
+    assert expandir_semanal(0, time(9), LUNES, hasta=date(2026, 10, 18)) == []
+
+
+def test_nunca_supera_el_maximo():
+    assert len(expandir_semanal(0, time(9), LUNES)) == MAX_OCURRENCIAS_SERIE
+    assert len(expandir_semanal(0, time(9), LUNES, cantidad=MAX_OCURRENCIAS_SERIE + 10)) == MAX_OCURRENCIAS_SERIE
@@ -69,8 +69,10 @@ export const CrearReservaPage: React.FC = () => {
         params: { fecha }
       });
       
-      // Extraer las horas ocupadas
-      const ocupados = response.data.map((r: any) => r.hora_inicio);
+      // Extraer las horas ocupadas de la grilla de slots
+      const ocupados = response.data
+        .filter((s: any) => !s.disponible)
+        .map((s: any) => s.hora_inicio.slice(0, 5));
       setHorariosOcupados(ocupados);
     } catch (error) {
       console.error('Error al cargar disponibilidad:', error);
@@ -12,7 +12,9 @@ import { Calendar, DollarSign, CheckCircle, AlertCircle, X } from 'lucide-react'
 
 export const MisReservasPage: React.FC = () => {
   const [reservas, setReservas] = useState<ReservaDetail[]>([]);
+  const [siguienteCursor, setSiguienteCursor] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isCargandoMas, setIsCargandoMas] = useState(false);
   
   // Modal de pago
   const [showPagoModal, setShowPagoModal] = useState(false);
@@ -27,8 +29,9 @@ export const MisReservasPage: React.FC = () => {
 
   const cargarReservas = async () => {
     try {
-      const data = await reservasApi.getMisReservas();
-      setReservas(data);
+      const pagina = await reservasApi.getMisReservas();
+      setReservas(pagina.reservas);
+      setSiguienteCursor(pagina.siguienteCursor);
     } catch (error) {
       console.error('Error:', error);
     } finally {
@@ -36,6 +39,21 @@ export const MisReservasPage: React.FC = () => {
     }
   };
 
+  const cargarMas = async () => {
+    if (!siguienteCursor) return;
+
+    setIsCargandoMas(true);
+    try {
+      const pagina = await reservasApi.getMisReservas(undefined, siguienteCursor);
+      setReservas((actuales) => [...actuales, ...pagina.reservas]);
+      setSiguienteCursor(pagina.siguienteCursor);
+    } catch (error) {
+      console.error('Error:', error);
+    } finally {
+      setIsCargandoMas(false);
+    }
+  };
+
   const handleCancelar = async (id: number) => {
     if (!confirm('¿Seguro que quieres cancelar esta reserva?')) return;
     
@@ -208,6 +226,14 @@ export const MisReservasPage: React.FC = () => {
                 </div>
               </Card>
             ))}
+
+            {siguienteCursor && (
+              <div className="text-center">
+                <Button onClick={cargarMas} variant="secondary" isLoading={isCargandoMas}>
+                  Cargar más
+                </Button>
+              </div>
+            )}
           </div>
         )}
 
@@ -11,8 +11,10 @@ import { Check, X, Calendar } from 'lucide-react';
 
 export const ReservasProveedorPage: React.FC = () => {
   const [reservas, setReservas] = useState<ReservaDetail[]>([]);
+  const [siguienteCursor, setSiguienteCursor] = useState<string | null>(null);
   const [filtroEstado, setFiltroEstado] = useState<string>('');
   const [isLoading, setIsLoading] = useState(true);
+  const [isCargandoMas, setIsCargandoMas] = useState(false);
 
   useEffect(() => {
     cargarReservas();
@@ -20,8 +22,9 @@ export const ReservasProveedorPage: React.FC = () => {
 
   const cargarReservas = async () => {
     try {
-      const data = await proveedorApi.getReservasProveedor(filtroEstado || undefined);
-      setReservas(data);
+      const pagina = await proveedorApi.getReservasProveedor(filtroEstado || undefined);
+      setReservas(pagina.reservas);
+      setSiguienteCursor(pagina.siguienteCursor);
     } catch (error) {
       console.error('Error:', error);
     } finally {
@@ -29,6 +32,22 @@ export const ReservasProveedorPage: React.FC = () => {
     }
   };
 
+  const cargarMas = async () => {
+    if (!siguienteCursor) return;
+
+    setIsCargandoMas(true);
+    try {
+      // El cursor solo vale con los mismos filtros de la primera página
+      const pagina = await proveedorApi.getReservasProveedor(filtroEstado || undefined, siguienteCursor);
+      setReservas((actuales) => [...actuales, ...pagina.reservas]);
+      setSiguienteCursor(pagina.siguienteCursor);
+    } catch (error) {
+      console.error('Error:', error);
+    } finally {
+      setIsCargandoMas(false);
+    }
+  };
+
   const handleConfirmar = async (id: number) => {
     try {
       await proveedorApi.confirmarReserva(id);
@@ -157,6 +176,14 @@ export const ReservasProveedorPage: React.FC = () => {
                 </div>
               </Card>
             ))}
+
+            {siguienteCursor && (
+              <div className="text-center">
+                <Button onClick={cargarMas} variant="secondary" isLoading={isCargandoMas}>
+                  Cargar más
+                </Button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -1,4 +1,4 @@
-import axios, { AxiosError } from 'axios';
+import axios, { AxiosError, type AxiosResponse } from 'axios';
 import type {
   LoginRequest,
   RegisterClienteRequest,
@@ -9,11 +9,20 @@ import type {
   HorarioDisponible,
   Reserva,
   ReservaDetail,
+  PaginaReservas,
   Proveedor,
 } from '../types';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api/v1';
 
+// Los listados paginados devuelven el cursor de la página siguiente en este header
+const HEADER_CURSOR = 'x-next-cursor';
+
+const leerCursor = (response: AxiosResponse): string | null => {
+  const cursor = response.headers[HEADER_CURSOR];
+  return typeof cursor === 'string' && cursor ? cursor : null;
+};
+
 const api = axios.create({
   baseURL: API_URL,
   headers: {
@@ -181,10 +190,12 @@ export const reservasApi = {
     return response.data;
   },
 
-  getMisReservas: async (estado?: string): Promise<ReservaDetail[]> => {
-    const params = estado ? { estado } : {};
+  getMisReservas: async (estado?: string, cursor?: string): Promise<PaginaReservas> => {
+    const params: Record<string, string> = {};
+    if (estado) params.estado = estado;
+    if (cursor) params.cursor = cursor;
     const response = await api.get<ReservaDetail[]>('/reservas/mis-reservas', { params });
-    return response.data;
+    return { reservas: response.data, siguienteCursor: leerCursor(response) };
   },
 
   getById: async (id: number): Promise<ReservaDetail> => {
@@ -263,10 +274,12 @@ export const proveedorApi = {
   },
 
   // Reservas
-  getReservasProveedor: async (estado?: string) => {
-    const params = estado ? { estado } : {};
-    const response = await api.get('/reservas/proveedor/todas', { params });
-    return response.data;
+  getReservasProveedor: async (estado?: string, cursor?: string): Promise<PaginaReservas> => {
+    const params: Record<string, string> = {};
+    if (estado) params.estado = estado;
+    if (cursor) params.cursor = cursor;
+    const response = await api.get<ReservaDetail[]>('/reservas/proveedor/todas', { params });
+    return { reservas: response.data, siguienteCursor: leerCursor(response) };
   },
 
   getReservasPorRecurso: async (recursoId: number, fecha?: string): Promise<ReservaDetail[]> => {
@@ -97,4 +97,10 @@ export interface ReservaDetail extends Reserva {
   recurso_nombre: string;
   servicio_nombre: string;
   cliente_nombre: string;
+}
+
+// Página de un listado paginado por cursor (header X-Next-Cursor)
+export interface PaginaReservas {
+  reservas: ReservaDetail[];
+  siguienteCursor: string | null;
 }
\ No newline at end of file